@@ -1,5 +1,36 @@
-from app.services.openai_client import OpenAIClient
+import functools
+import time
+
+from app.orchestration.tracing import current_patient_id, current_trace_id, new_trace_id, traced_agent
+from app.services.audit_log_service import AuditLogService, audit_sink
+from app.services.openai_client import get_llm_client
 
 class BaseAgent:
     def __init__(self) -> None:
-        self.client = OpenAIClient()
+        self.client = get_llm_client()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if 'run' in cls.__dict__:
+            cls.run = traced_agent(cls.__name__)(_audited(cls.__name__, cls.run))
+
+
+def _audited(name: str, run):
+    @functools.wraps(run)
+    def wrapper(self, input_text: str, *args, **kwargs):
+        started = time.perf_counter()
+        status = 'error'
+        try:
+            result = run(self, input_text, *args, **kwargs)
+            status = 'ok'
+            return result
+        finally:
+            audit_sink.emit_nowait(AuditLogService().build(
+                current_trace_id() or new_trace_id(),
+                current_patient_id(),
+                f'agent:{name}',
+                'run',
+                {'input_chars': len(input_text or '')},
+                {'status': status, 'duration_ms': round((time.perf_counter() - started) * 1000, 1)},
+            ))
+    return wrapper
@@ -1,4 +1,6 @@
 from app.agents.base import BaseAgent
+from app.orchestration.tracing import record_cache
+from app.services.medication_normalizer_service import MedicationNormalizerService
 from pydantic import BaseModel, Field
 
 class MedReconOut(BaseModel):
@@ -8,4 +10,10 @@ class MedReconAgent(BaseAgent):
     PROMPT = """Normalize medication list to generic names, dedupe, include dose/frequency/route."""
 
     def run(self, input_text: str) -> MedReconOut:
-        return self.client.generate_json(MedReconOut, self.PROMPT, input_text)
+        normalizer = MedicationNormalizerService()
+        medications, unresolved = normalizer.extract(input_text)
+        record_cache('medication_dictionary', not unresolved)
+        if not unresolved:
+            return MedReconOut(medications=medications)
+        llm = self.client.generate_json(MedReconOut, self.PROMPT, '\n'.join(unresolved))
+        return MedReconOut(medications=normalizer.merge(medications, llm.medications))
@@ -1,8 +1,23 @@
 from app.agents.base import BaseAgent
+from app.orchestration.tracing import record_cache
 from app.schemas.prescription import StructuredPrescription
+from app.services.prescription_parser_service import PrescriptionParserService
 
 class PrescriptionStructurerAgent(BaseAgent):
     PROMPT = """Convert doctor prescription text to strict JSON schedule + clarifications needed."""
 
     def run(self, input_text: str) -> StructuredPrescription:
-        return self.client.generate_json(StructuredPrescription, self.PROMPT, input_text)
+        medications, clarifications, unparsed = PrescriptionParserService().parse(input_text)
+        fast_path = bool(medications) and not unparsed
+        record_cache('prescription_sig_parser', fast_path)
+        if fast_path:
+            return StructuredPrescription(
+                medications=medications,
+                clarifications=clarifications,
+                confidence=min(med['confidence'] for med in medications),
+            )
+        llm = self.client.generate_json(StructuredPrescription, self.PROMPT, '\n'.join(unparsed) if medications else input_text)
+        return StructuredPrescription(
+            medications=[*medications, *llm.medications],
+            clarifications=[*clarifications, *llm.clarifications],
+        )
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.routes import patients, ingestion, profiling, questionnaire, intelligence, hospitals, medications, coach, feedback, auth
+from app.api.v1.routes import patients, ingestion, profiling, questionnaire, intelligence, hospitals, medications, coach, feedback, auth, search
 
 api_router = APIRouter()
 api_router.include_router(patients.router, prefix='/patients', tags=['patients'])
@@ -12,3 +12,4 @@ api_router.include_router(medications.router, prefix='/patients', tags=['medicat
 api_router.include_router(coach.router, prefix='/patients', tags=['coach'])
 api_router.include_router(feedback.router, prefix='/patients', tags=['feedback'])
 api_router.include_router(auth.router, prefix='/auth', tags=['auth'])
+api_router.include_router(search.router, tags=['search'])
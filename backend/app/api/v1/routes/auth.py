@@ -6,7 +6,7 @@ from app.models.account import Account
 from app.schemas.auth import LoginRequest, LoginResponse, SignupRequest
 from app.schemas.patient import PatientCreate
 from app.services.patient_service import create_patient_with_optional_account
-from app.utils.passwords import hash_password, normalize_mobile, verify_password
+from app.utils.passwords import hash_password_async, needs_rehash, normalize_mobile, verify_password_async
 
 router = APIRouter()
 
@@ -16,8 +16,11 @@ async def _login(role: str, payload: LoginRequest, session: AsyncSession) -> Log
         select(Account).where(Account.role == role, Account.mobile == mobile)
     )
     account = result.scalar_one_or_none()
-    if account is None or not verify_password(payload.password, account.password_hash):
+    if account is None or not await verify_password_async(payload.password, account.password_hash):
         raise HTTPException(status_code=401, detail='Invalid credentials')
+    if needs_rehash(account.password_hash):
+        account.password_hash = await hash_password_async(payload.password)
+        await session.commit()
     return LoginResponse(role=role, account_id=account.id, patient_id=account.patient_id)
 
 @router.post('/patients/login', response_model=LoginResponse)
@@ -59,7 +62,7 @@ async def _signup(role: str, payload: SignupRequest, session: AsyncSession) -> L
     account = Account(
         role=role,
         mobile=mobile,
-        password_hash=hash_password(payload.password),
+        password_hash=await hash_password_async(payload.password),
         patient_id=None,
     )
     session.add(account)
@@ -1,23 +1,35 @@
-from fastapi import APIRouter, Depends
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from datetime import datetime, timezone
 
 from app.schemas.coach import CoachGenerateOut
-from app.agents.recovery_coach_agent import RecoveryCoachAgent
-from app.services.tts_service import TTSService
-from app.utils.safety import safety_footer_text
+from app.orchestration.pipeline import coach_input_text, coach_script
+from app.services.tts_service import (
+    DEFAULT_VOICE, TTSService, TTSAudioCacheService, audio_etag, audio_key, audio_path_for, etag_matches, synthesis_flights,
+)
+from app.services.adherence_service import AdherenceService
+from app.utils.time import as_utc, utc_day_range, utc_now
 from app.db.session import get_session
 from app.models.coach import CoachMessage, DoctorAdvicePack
 from app.models.profile import PatientProfile
 from app.models.patient import Patient
-from app.models.medication import MedicationPlan, DoseSchedule, DoseLog
+from app.models.medication import MedicationPlan, DoseSchedule
 
 router = APIRouter()
 
 @router.post('/{patient_id}/recovery-coach/generate', response_model=CoachGenerateOut)
-async def generate_coach(patient_id: int, session: AsyncSession = Depends(get_session)):
-    """Generate a daily recovery coach message + TTS audio."""
+async def generate_coach(
+    patient_id: int,
+    defer_audio: bool = Query(default=False),
+    session: AsyncSession = Depends(get_session),
+):
+    """Generate a daily recovery coach message + TTS audio.
+
+    With `defer_audio=true` the script is returned immediately and audio is
+    synthesized while streaming on the first request to `audio_url`.
+    """
     result = await session.execute(
         select(PatientProfile)
         .where(PatientProfile.patient_id == patient_id)
@@ -35,28 +47,23 @@ async def generate_coach(patient_id: int, session: AsyncSession = Depends(get_se
         .order_by(MedicationPlan.created_at.desc())
     )
     plan = plan_result.scalars().first()
-    today = datetime.now(timezone.utc).date().isoformat()
+    day_start, day_end = utc_day_range(utc_now().date())
     today_doses: list[dict] = []
     adherence = {"taken": 0, "missed": 0, "skipped": 0}
     if plan:
         dose_result = await session.execute(
-            select(DoseSchedule).where(DoseSchedule.plan_id == plan.id, DoseSchedule.due_at.startswith(today))
+            select(DoseSchedule).where(
+                DoseSchedule.plan_id == plan.id,
+                DoseSchedule.due_at >= day_start,
+                DoseSchedule.due_at < day_end,
+            )
         )
         doses = dose_result.scalars().all()
         today_doses = [
-            {"med_name": d.med_name, "dose": d.dose, "due_at": d.due_at, "status": d.status}
+            {"med_name": d.med_name, "dose": d.dose, "due_at": as_utc(d.due_at).isoformat(), "status": d.status}
             for d in doses
         ]
-        if doses:
-            dose_ids = [d.id for d in doses]
-            logs = (await session.execute(select(DoseLog).where(DoseLog.dose_id.in_(dose_ids)))).scalars().all()
-            for log in logs:
-                if log.action == "taken":
-                    adherence["taken"] += 1
-                elif log.action == "missed":
-                    adherence["missed"] += 1
-                elif log.action == "skipped":
-                    adherence["skipped"] += 1
+        adherence = await AdherenceService().counts_for_doses(session, [d.id for d in doses])
 
     advice_result = await session.execute(
         select(DoctorAdvicePack)
@@ -66,21 +73,32 @@ async def generate_coach(patient_id: int, session: AsyncSession = Depends(get_se
     advice = advice_result.scalars().first()
     advice_payload = advice.advice_json if advice else {}
 
-    input_text = (
-        f"Patient name: {patient_name}\\n"
-        f"Patient profile JSON:\\n{profile_payload}\\n\\n"
-        f"Active medication plan:\\n{plan.plan_json if plan else {}}\\n\\n"
-        f"Today's doses:\\n{today_doses}\\n\\n"
-        f"Adherence today:\\n{adherence}\\n\\n"
-        f"Doctor advice pack:\\n{advice_payload}"
+    input_text = coach_input_text(
+        patient_name,
+        profile_payload,
+        plan.plan_json if plan else {},
+        today_doses,
+        adherence,
+        advice_payload,
+    )
+    script = coach_script(input_text)
+    if defer_audio:
+        audio_path = audio_path_for(audio_key(script, DEFAULT_VOICE))
+    else:
+        audio_path = TTSService().synthesize(script)
+    previous = await session.execute(
+        select(CoachMessage.audio_path)
+        .where(CoachMessage.patient_id == patient_id)
+        .order_by(CoachMessage.id.desc())
+        .limit(1)
     )
-    script = RecoveryCoachAgent().run(input_text)
-    script = f"{script}\\n\\nSafety: {safety_footer_text()}"
-    audio_path = TTSService().synthesize(script)
+    audio_cache = TTSAudioCacheService()
+    await audio_cache.release(session, list(previous.scalars().all()))
+    await audio_cache.retain(session, [audio_path])
     record = CoachMessage(patient_id=patient_id, script_text=script, audio_path=audio_path)
     session.add(record)
     await session.commit()
-    return CoachGenerateOut(script_text=script, audio_path=audio_path)
+    return _coach_out(record)
 
 @router.get('/{patient_id}/recovery-coach/latest', response_model=CoachGenerateOut)
 async def get_latest(patient_id: int, session: AsyncSession = Depends(get_session)):
@@ -93,4 +111,41 @@ async def get_latest(patient_id: int, session: AsyncSession = Depends(get_sessio
     record = result.scalars().first()
     if record is None:
         return CoachGenerateOut(script_text='', audio_path='')
-    return CoachGenerateOut(script_text=record.script_text, audio_path=record.audio_path)
+    return _coach_out(record)
+
+@router.get('/{patient_id}/recovery-coach/{message_id}/audio')
+async def get_coach_audio(patient_id: int, message_id: int, request: Request, session: AsyncSession = Depends(get_session)):
+    """Serve coach audio with Range and ETag support, synthesizing on first play if needed."""
+    result = await session.execute(
+        select(CoachMessage).where(CoachMessage.id == message_id, CoachMessage.patient_id == patient_id)
+    )
+    record = result.scalar_one_or_none()
+    if record is None or not record.audio_path:
+        raise HTTPException(status_code=404, detail='Coach audio not found')
+    key = audio_key(record.script_text, DEFAULT_VOICE)
+    path = audio_path_for(key)
+    if os.path.exists(path):
+        return _cached_audio(path, request)
+    if not synthesis_flights.claim(key):
+        # Another request is synthesizing this audio; serve its file once written.
+        await synthesis_flights.wait(key)
+        if os.path.exists(path):
+            return _cached_audio(path, request)
+        if not synthesis_flights.claim(key):
+            raise HTTPException(status_code=503, detail='Coach audio is being generated', headers={'Retry-After': '5'})
+    # First play: no validators or caching until the file is complete, so a failed stream isn't cached.
+    return StreamingResponse(TTSService().stream_claimed(record.script_text), media_type='audio/mpeg', headers={'Cache-Control': 'no-store'})
+
+def _cached_audio(path: str, request: Request) -> Response:
+    headers = {'ETag': audio_etag(path), 'Cache-Control': 'private, max-age=86400'}
+    if etag_matches(request.headers.get('if-none-match', ''), headers['ETag']):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type='audio/mpeg', headers=headers)
+
+def _coach_out(record: CoachMessage) -> CoachGenerateOut:
+    return CoachGenerateOut(
+        script_text=record.script_text,
+        audio_path=record.audio_path,
+        message_id=record.id,
+        audio_url=f"/api/v1/patients/{record.patient_id}/recovery-coach/{record.id}/audio",
+    )
@@ -1,14 +1,43 @@
-from fastapi import APIRouter
-from app.schemas.feedback import FeedbackIn
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_session
+from app.models.audit import AuditLog
+from app.schemas.audit import AuditOut, AuditPageOut
+from app.schemas.feedback import FeedbackIn, FeedbackOut
 
 router = APIRouter()
 
-@router.post('/{patient_id}/feedback')
+@router.post('/{patient_id}/feedback', response_model=FeedbackOut)
 async def feedback(patient_id: int, payload: FeedbackIn):
     """Submit clinician feedback on summaries or recommendations."""
-    return {'status': 'received'}
+    return FeedbackOut(status='received')
 
-@router.get('/{patient_id}/audit')
-async def audit(patient_id: int, limit: int = 50):
-    """Return audit log entries (stub)."""
-    return {'items': []}
+@router.get('/{patient_id}/audit', response_model=AuditPageOut)
+async def audit(
+    patient_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    before_id: int | None = Query(None, description='Cursor from the previous page (next_cursor).'),
+    session: AsyncSession = Depends(get_session),
+):
+    """Return audit log entries, newest first, keyset-paginated on (patient_id, id)."""
+    stmt = select(AuditLog).where(AuditLog.patient_id == patient_id)
+    if before_id is not None:
+        stmt = stmt.where(AuditLog.id < before_id)
+    rows = (await session.execute(stmt.order_by(AuditLog.id.desc()).limit(limit + 1))).scalars().all()
+    page = rows[:limit]
+    return AuditPageOut(
+        items=[
+            AuditOut(
+                id=row.id,
+                trace_id=row.trace_id,
+                actor=row.actor,
+                action=row.action,
+                input_meta=row.input_meta_json,
+                output_meta=row.output_meta_json,
+                created_at=row.created_at.isoformat(),
+            )
+            for row in page
+        ],
+        next_cursor=page[-1].id if len(rows) > limit else None,
+    )
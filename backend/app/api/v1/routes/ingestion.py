@@ -1,12 +1,15 @@
-from fastapi import APIRouter, UploadFile, File, Depends
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.db.session import get_session
+from app.core.exceptions import AudioTooLargeError
 from app.services.ingestion_service import DocumentIngestionService
+from app.services.context_store_service import ContextStore
+from app.services.search_service import SearchService
 from app.services.transcription_service import TranscriptionService
 from app.models.document import Document
 from app.models.transcript import Transcript
-from app.schemas.ingestion import DocumentOut, TranscriptOut, DocumentDetailOut
+from app.schemas.ingestion import DocumentOut, TranscriptOut, DocumentDetailOut, DocumentTextOut
 from app.utils.files import save_upload
 
 router = APIRouter()
@@ -18,57 +21,92 @@ async def upload_document(patient_id: int, file: UploadFile = File(...), session
     path, extracted = DocumentIngestionService().save_and_extract(file.filename, content, file.content_type or 'application/octet-stream')
     doc = Document(patient_id=patient_id, file_path=path, mime_type=file.content_type or 'application/octet-stream', extracted_text=extracted)
     session.add(doc)
+    await session.flush()
+    await SearchService().index(session, 'document', doc.id, patient_id, extracted)
+    await ContextStore().index(session, 'document', doc.id, patient_id, extracted)
     await session.commit()
-    await session.refresh(doc)
-    return DocumentOut(document_id=doc.id, extracted_text=doc.extracted_text)
+    return DocumentOut(document_id=doc.id, extracted_text=extracted)
 
-@router.get('/{patient_id}/uploads', response_model=list[DocumentOut])
+DETAIL_COLUMNS = (Document.id, Document.mime_type, Document.has_text, Document.char_count, Document.preview)
+
+def _detail(row) -> DocumentDetailOut:
+    return DocumentDetailOut(
+        document_id=row.id,
+        mime_type=row.mime_type,
+        has_text=bool(row.has_text),
+        char_count=row.char_count or 0,
+        text_preview=row.preview,
+    )
+
+@router.get('/{patient_id}/uploads', response_model=list[DocumentDetailOut])
 async def list_documents(patient_id: int, session: AsyncSession = Depends(get_session)):
-    """List uploaded documents for a patient."""
-    docs = (await session.execute(select(Document).where(Document.patient_id == patient_id))).scalars().all()
-    return [DocumentOut(document_id=d.id, extracted_text=d.extracted_text) for d in docs]
+    """List uploaded documents with text availability and a short preview; full text is per document."""
+    rows = (await session.execute(select(*DETAIL_COLUMNS).where(Document.patient_id == patient_id).order_by(Document.id))).all()
+    return [_detail(row) for row in rows]
 
 @router.get('/{patient_id}/uploads/detail', response_model=list[DocumentDetailOut])
 async def list_documents_detail(patient_id: int, session: AsyncSession = Depends(get_session)):
     """List uploaded documents with text availability and a short preview."""
-    docs = (await session.execute(select(Document).where(Document.patient_id == patient_id))).scalars().all()
-    items: list[DocumentDetailOut] = []
-    for d in docs:
-        text = d.extracted_text or ''
-        items.append(DocumentDetailOut(
-            document_id=d.id,
-            mime_type=d.mime_type,
-            has_text=bool(text.strip()),
-            text_preview=text[:300] if text else None,
-        ))
-    return items
+    return await list_documents(patient_id, session)
+
+@router.get('/{patient_id}/uploads/{document_id}/text', response_model=DocumentTextOut)
+async def get_document_text(patient_id: int, document_id: int, session: AsyncSession = Depends(get_session)):
+    """Fetch the full extracted text of one document."""
+    row = (await session.execute(
+        select(Document.id, Document.mime_type, Document.char_count, Document.extracted_text)
+        .where(Document.id == document_id, Document.patient_id == patient_id)
+    )).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail='Document not found')
+    return DocumentTextOut(document_id=row.id, mime_type=row.mime_type, char_count=row.char_count or 0, extracted_text=row.extracted_text)
 
 @router.post('/{patient_id}/audio', response_model=TranscriptOut)
 async def upload_audio(patient_id: int, file: UploadFile = File(...), session: AsyncSession = Depends(get_session)):
-    """Upload audio and transcribe via Whisper."""
+    """Upload audio and transcribe via Whisper.
+
+    Long recordings are transcribed in parallel chunks; the transcript row is
+    created up front and its text grows as leading chunks finish.
+    """
     content = await file.read()
     audio_path = save_upload(content, file.filename)
-    text = TranscriptionService().transcribe(audio_path)
-    tr = Transcript(patient_id=patient_id, audio_path=audio_path, text=text)
+    tr = Transcript(patient_id=patient_id, audio_path=audio_path, text='')
     session.add(tr)
     await session.commit()
+
+    async def save_partial(text: str, segments: list[dict]) -> None:
+        tr.text, tr.segments_json = text, segments
+        await session.commit()
+
+    try:
+        tr.text, tr.segments_json = await TranscriptionService().transcribe_long(audio_path, on_progress=save_partial)
+    except Exception as exc:
+        await session.delete(tr)
+        await session.commit()
+        if isinstance(exc, AudioTooLargeError):
+            raise HTTPException(status_code=413, detail=str(exc)) from exc
+        raise
+    await SearchService().index(session, 'transcript', tr.id, patient_id, tr.text)
+    await ContextStore().index(session, 'transcript', tr.id, patient_id, tr.text)
+    await session.commit()
     await session.refresh(tr)
     return TranscriptOut(transcript_id=tr.id, text=tr.text)
 
-@router.post('/{patient_id}/uploads/reprocess', response_model=list[DocumentOut])
+@router.post('/{patient_id}/uploads/reprocess', response_model=list[DocumentDetailOut])
 async def reprocess_documents(patient_id: int, session: AsyncSession = Depends(get_session)):
     """Re-run extraction for documents that have no extracted text."""
-    docs = (await session.execute(select(Document).where(Document.patient_id == patient_id))).scalars().all()
+    docs = (await session.execute(
+        select(Document).where(Document.patient_id == patient_id, Document.has_text.is_(False))
+    )).scalars().all()
     svc = DocumentIngestionService()
-    updated: list[DocumentOut] = []
+    search = SearchService()
+    context = ContextStore()
     for doc in docs:
-        if doc.extracted_text and doc.extracted_text.strip():
-            updated.append(DocumentOut(document_id=doc.id, extracted_text=doc.extracted_text))
-            continue
         extracted = svc.extract_from_path(doc.file_path, doc.mime_type)
         if extracted and extracted.strip():
             doc.extracted_text = extracted
             session.add(doc)
-        updated.append(DocumentOut(document_id=doc.id, extracted_text=doc.extracted_text))
+            await search.index(session, 'document', doc.id, patient_id, extracted)
+            await context.index(session, 'document', doc.id, patient_id, extracted)
     await session.commit()
-    return updated
+    rows = (await session.execute(select(*DETAIL_COLUMNS).where(Document.patient_id == patient_id).order_by(Document.id))).all()
+    return [_detail(row) for row in rows]
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
 from app.schemas.intelligence import SBAROut, PreIntelligenceOut, SBARStoredOut
 from app.agents.summary_agent import SummaryAgent
 from app.agents.preintelligence_agent import PreIntelligenceAgent
@@ -11,12 +11,14 @@ from app.models.profile import PatientProfile
 from app.models.triage import TriageResult
 from app.models.document import Document
 from app.models.summary import SbarSummary
+from app.services.context_store_service import ContextStore
 
 router = APIRouter()
 
-@router.get('/{patient_id}/summary', response_model=SBAROut)
-async def get_summary(patient_id: int, session: AsyncSession = Depends(get_session)):
-    """Generate SBAR summary with safety footer."""
+QUERY_FIELDS = ('conditions', 'medications', 'allergies')
+
+async def _agent_context(session: AsyncSession, patient_id: int) -> str:
+    """Latest profile + triage, plus the document/transcript chunks most relevant to them."""
     prof = await session.execute(
         select(PatientProfile)
         .where(PatientProfile.patient_id == patient_id)
@@ -35,21 +37,38 @@ async def get_summary(patient_id: int, session: AsyncSession = Depends(get_sessi
         "red_flags": triage.red_flags_json,
         "specialty_needed": triage.specialty_needed,
     } if triage else {}
-    doc_result = await session.execute(
-        select(Document)
-        .where(Document.patient_id == patient_id)
-        .order_by(Document.created_at.desc())
-        .limit(3)
+    query = ' '.join(
+        _strings([profile_payload.get(field) for field in QUERY_FIELDS])
+        + _strings([triage_payload.get('red_flags'), triage_payload.get('specialty_needed')])
     )
-    docs = doc_result.scalars().all()
-    doc_snippets = [
-        (d.extracted_text or "")[:500] for d in docs if d.extracted_text and d.extracted_text.strip()
-    ]
-    input_text = (
+    doc_snippets = await ContextStore().retrieve(session, patient_id, query)
+    if not doc_snippets:
+        doc_result = await session.execute(
+            select(func.substr(Document.extracted_text, 1, 500))
+            .where(Document.patient_id == patient_id, Document.has_text.is_(True))
+            .order_by(Document.created_at.desc())
+            .limit(3)
+        )
+        doc_snippets = list(doc_result.scalars().all())
+    return (
         f"Patient profile JSON:\n{profile_payload}\n\n"
         f"Latest triage:\n{triage_payload}\n\n"
-        f"Recent document snippets:\n{doc_snippets}"
+        f"Relevant document snippets:\n{doc_snippets}"
     )
+
+def _strings(value) -> list[str]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [s for v in value.values() for s in _strings(v)]
+    if isinstance(value, (list, tuple)):
+        return [s for v in value for s in _strings(v)]
+    return []
+
+@router.get('/{patient_id}/summary', response_model=SBAROut)
+async def get_summary(patient_id: int, session: AsyncSession = Depends(get_session)):
+    """Generate SBAR summary with safety footer."""
+    input_text = await _agent_context(session, patient_id)
     result = SummaryAgent().run(input_text)
     result.safety = ensure_safety(result.safety)
     record = SbarSummary(patient_id=patient_id, sbar_json=result.model_dump())
@@ -88,39 +107,7 @@ async def get_latest_summary(patient_id: int, session: AsyncSession = Depends(ge
 @router.get('/{patient_id}/preintelligence', response_model=PreIntelligenceOut)
 async def get_preintelligence(patient_id: int, session: AsyncSession = Depends(get_session)):
     """Generate pre-intelligence (risks, interactions, tests) with safety footer."""
-    prof = await session.execute(
-        select(PatientProfile)
-        .where(PatientProfile.patient_id == patient_id)
-        .order_by(PatientProfile.created_at.desc())
-    )
-    profile = prof.scalars().first()
-    profile_payload = profile.profile_json if profile else {}
-    triage_result = await session.execute(
-        select(TriageResult)
-        .where(TriageResult.patient_id == patient_id)
-        .order_by(TriageResult.created_at.desc())
-    )
-    triage = triage_result.scalars().first()
-    triage_payload = {
-        "level": triage.level,
-        "red_flags": triage.red_flags_json,
-        "specialty_needed": triage.specialty_needed,
-    } if triage else {}
-    doc_result = await session.execute(
-        select(Document)
-        .where(Document.patient_id == patient_id)
-        .order_by(Document.created_at.desc())
-        .limit(3)
-    )
-    docs = doc_result.scalars().all()
-    doc_snippets = [
-        (d.extracted_text or "")[:500] for d in docs if d.extracted_text and d.extracted_text.strip()
-    ]
-    input_text = (
-        f"Patient profile JSON:\n{profile_payload}\n\n"
-        f"Latest triage:\n{triage_payload}\n\n"
-        f"Recent document snippets:\n{doc_snippets}"
-    )
+    input_text = await _agent_context(session, patient_id)
     result = PreIntelligenceAgent().run(input_text)
     result.interactions.extend(InteractionRulesService().check([]))
     result.safety = ensure_safety(result.safety)
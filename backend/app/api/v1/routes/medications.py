@@ -1,38 +1,117 @@
-from fastapi import APIRouter
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from app.db.session import get_session
+from app.models.medication import MedicationPlan, DoseSchedule, DoseLog
 from app.schemas.prescription import PrescriptionIn, StructuredPrescription
-from app.schemas.medication import MedicationPlanIn, DoseLogIn, AdherenceOut
+from app.schemas.medication import (
+    MedicationPlanIn, MedicationPlanOut, ActivePlanOut, DoseOut, DosesTodayOut, DoseLogIn, DoseLogOut, AdherenceOut,
+)
+from app.utils.time import as_utc, utc_day_range, utc_now
 from app.agents.prescription_structurer_agent import PrescriptionStructurerAgent
 from app.services.medication_tracker_service import MedicationTrackerService
+from app.services.adherence_service import ACTIONS, AdherenceService
+from app.services.reminder_scheduler_service import reminder_scheduler
 
 router = APIRouter()
 
+LOG_DOSE_ATTEMPTS = 5
+
 @router.post('/{patient_id}/prescriptions/structure', response_model=StructuredPrescription)
 async def structure_prescription(patient_id: int, payload: PrescriptionIn):
     """Structure doctor prescription text into JSON with clarifications."""
     return PrescriptionStructurerAgent().run(payload.raw_text)
 
-@router.post('/{patient_id}/medication-plans')
-async def create_medication_plan(patient_id: int, payload: MedicationPlanIn):
-    """Create a medication plan and generate a dose schedule."""
-    schedule = MedicationTrackerService().build_schedule(payload.plan, days=1)
-    return {'plan': payload.plan, 'schedule': schedule}
+@router.post('/{patient_id}/medication-plans', response_model=MedicationPlanOut)
+async def create_medication_plan(patient_id: int, payload: MedicationPlanIn, session: AsyncSession = Depends(get_session)):
+    """Create a medication plan and materialize its dose schedule."""
+    plan, scheduled = await MedicationTrackerService().create_plan(session, patient_id, payload.plan)
+    reminder_scheduler.schedule_dose_reminders(scheduled)
+    reminder_scheduler.schedule_daily_coach(patient_id)
+    return MedicationPlanOut(
+        plan_id=plan.id,
+        plan=plan.plan_json,
+        start_date=plan.start_date,
+        materialized_until=plan.materialized_until,
+        doses_scheduled=len(scheduled),
+    )
 
-@router.get('/{patient_id}/medication-plans/active')
-async def get_active_plan(patient_id: int):
-    """Fetch the active medication plan (stub)."""
-    return {'active': None}
+@router.get('/{patient_id}/medication-plans/active', response_model=ActivePlanOut)
+async def get_active_plan(patient_id: int, session: AsyncSession = Depends(get_session)):
+    """Fetch the active medication plan."""
+    result = await session.execute(
+        select(MedicationPlan)
+        .where(MedicationPlan.patient_id == patient_id, MedicationPlan.active == True)  # noqa: E712
+        .order_by(MedicationPlan.created_at.desc())
+    )
+    plan = result.scalars().first()
+    if plan is None:
+        return ActivePlanOut(active=None)
+    return ActivePlanOut(active=MedicationPlanOut(
+        plan_id=plan.id,
+        plan=plan.plan_json,
+        start_date=plan.start_date,
+        materialized_until=plan.materialized_until,
+    ))
 
-@router.get('/{patient_id}/doses/today')
-async def get_doses_today(patient_id: int):
-    """Get today's scheduled doses (stub)."""
-    return {'doses': []}
+@router.get('/{patient_id}/doses/today', response_model=DosesTodayOut)
+async def get_doses_today(patient_id: int, session: AsyncSession = Depends(get_session)):
+    """Get today's scheduled doses."""
+    start, end = utc_day_range(utc_now().date())
+    result = await session.execute(
+        select(DoseSchedule)
+        .join(MedicationPlan, MedicationPlan.id == DoseSchedule.plan_id)
+        .where(
+            MedicationPlan.patient_id == patient_id,
+            MedicationPlan.active == True,  # noqa: E712
+            DoseSchedule.due_at >= start,
+            DoseSchedule.due_at < end,
+        )
+        .order_by(DoseSchedule.due_at)
+    )
+    return DosesTodayOut(doses=[
+        DoseOut(dose_id=d.id, med_name=d.med_name, dose=d.dose, due_at=as_utc(d.due_at), status=d.status)
+        for d in result.scalars().all()
+    ])
 
-@router.post('/{patient_id}/doses/{dose_id}/log')
-async def log_dose(patient_id: int, dose_id: int, payload: DoseLogIn):
+@router.post('/{patient_id}/doses/{dose_id}/log', response_model=DoseLogOut)
+async def log_dose(patient_id: int, dose_id: int, payload: DoseLogIn, session: AsyncSession = Depends(get_session)):
     """Log a dose as taken/skipped/missed."""
-    return {'status': 'logged'}
+    if payload.action not in ACTIONS:
+        raise HTTPException(status_code=400, detail=f"action must be one of {list(ACTIONS)}")
+    # Compare-and-swap on status so a concurrent missed sweep can't be counted twice in the rollup.
+    for _ in range(LOG_DOSE_ATTEMPTS):
+        dose = await _load_dose(session, patient_id, dose_id)
+        if dose is None:
+            raise HTTPException(status_code=404, detail='Dose not found')
+        previous, due_at = dose
+        swapped = await session.execute(
+            update(DoseSchedule)
+            .where(DoseSchedule.id == dose_id, DoseSchedule.status == previous)
+            .values(status=payload.action)
+            .returning(DoseSchedule.id)
+            .execution_options(synchronize_session=False)
+        )
+        if swapped.first() is None:
+            await session.rollback()
+            continue
+        await AdherenceService().record(session, patient_id, as_utc(due_at).date(), payload.action, previous)
+        session.add(DoseLog(dose_id=dose_id, action=payload.action, timestamp=as_utc(payload.timestamp), note=payload.note))
+        await session.commit()
+        return DoseLogOut(status='logged')
+    raise HTTPException(status_code=409, detail='Dose status changed concurrently; retry')
+
+async def _load_dose(session: AsyncSession, patient_id: int, dose_id: int) -> tuple[str, datetime] | None:
+    result = await session.execute(
+        select(DoseSchedule.status, DoseSchedule.due_at)
+        .join(MedicationPlan, MedicationPlan.id == DoseSchedule.plan_id)
+        .where(DoseSchedule.id == dose_id, MedicationPlan.patient_id == patient_id)
+    )
+    row = result.first()
+    return (row.status, row.due_at) if row else None
 
 @router.get('/{patient_id}/adherence', response_model=AdherenceOut)
-async def adherence(patient_id: int, days: int = 7):
-    """Return adherence stats for the last N days (stub)."""
-    return AdherenceOut(taken=0, missed=0, skipped=0)
+async def adherence(patient_id: int, days: int = 7, session: AsyncSession = Depends(get_session)):
+    """Return adherence stats for the last N days from the daily rollup."""
+    return AdherenceOut(**await AdherenceService().stats(session, patient_id, days))
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.db.session import get_session
@@ -8,21 +8,40 @@ from app.services.patient_service import create_patient_with_optional_account
 
 router = APIRouter()
 
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
 @router.get('', response_model=list[PatientOut])
-async def list_patients(session: AsyncSession = Depends(get_session)):
-    """List all patient records."""
-    result = await session.execute(select(Patient).order_by(Patient.id))
-    patients = result.scalars().all()
-    return [
-        PatientOut(
-            id=patient.id,
-            name=patient.name,
-            age=patient.age,
-            sex=patient.sex,
-            contact_masked=patient.contact_masked,
-        )
-        for patient in patients
-    ]
+async def list_patients(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    after_id: int | None = Query(None, description=f'Cursor from the previous page ({NEXT_CURSOR_HEADER} header).'),
+    name_prefix: str | None = None,
+    min_age: int | None = None,
+    max_age: int | None = None,
+    triage_level: str | None = Query(None, description='Latest triage level: RED, AMBER or GREEN.'),
+    session: AsyncSession = Depends(get_session),
+):
+    """List patient records by id, one page at a time.
+
+    The body stays a plain array; when more rows exist the id to pass as
+    `after_id` is returned in the X-Next-Cursor header.
+    """
+    stmt = select(Patient.id, Patient.name, Patient.age, Patient.sex, Patient.contact_masked)
+    if after_id is not None:
+        stmt = stmt.where(Patient.id > after_id)
+    if name_prefix:
+        stmt = stmt.where(Patient.name.startswith(name_prefix, autoescape=True))
+    if min_age is not None:
+        stmt = stmt.where(Patient.age >= min_age)
+    if max_age is not None:
+        stmt = stmt.where(Patient.age <= max_age)
+    if triage_level:
+        stmt = stmt.where(Patient.latest_triage_level == triage_level.upper())
+    rows = (await session.execute(stmt.order_by(Patient.id).limit(limit + 1))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = str(rows[-1].id)
+    return [PatientOut(**row._mapping) for row in rows]
 
 @router.post('', response_model=PatientOut)
 async def create_patient(payload: PatientCreate, session: AsyncSession = Depends(get_session)):
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from app.db.session import get_session
 from app.models.document import Document
+from app.models.patient import Patient
 from app.models.transcript import Transcript
 from app.models.profile import PatientProfile
 from app.models.triage import TriageResult
@@ -11,6 +12,7 @@ from app.agents.triage_gate_agent import TriageGateAgent
 from app.schemas.triage import TriageOut
 from app.utils.safety import ensure_safety
 from app.schemas.patient import PatientProfileOut
+from app.services.questionnaire_service import QuestionnaireService, carry_forward
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -20,9 +22,9 @@ router = APIRouter()
 @router.post('/{patient_id}/profile/build', response_model=PatientProfileOut)
 async def build_profile(patient_id: int, session: AsyncSession = Depends(get_session)):
     """Build a structured patient profile from uploaded docs and transcripts."""
-    docs = (await session.execute(select(Document).where(Document.patient_id == patient_id))).scalars().all()
+    docs = (await session.execute(select(Document.extracted_text).where(Document.patient_id == patient_id))).scalars().all()
     transcripts = (await session.execute(select(Transcript).where(Transcript.patient_id == patient_id))).scalars().all()
-    texts = [d.extracted_text or '' for d in docs] + [t.text for t in transcripts]
+    texts = [d or '' for d in docs] + [t.text for t in transcripts]
     non_empty = [t for t in texts if t and t.strip()]
     input_text = '\\n'.join(non_empty)
     logger.info(
@@ -44,11 +46,15 @@ async def build_profile(patient_id: int, session: AsyncSession = Depends(get_ses
             created_at=None,
         )
     profile, extras = await build_patient_profile(input_text)
-    record = PatientProfile(patient_id=patient_id, profile_json=profile, version=1)
+    latest = await QuestionnaireService().latest_profile(session, patient_id)
+    if latest is not None:
+        profile = carry_forward(latest.profile_json, profile)
+    record = PatientProfile(patient_id=patient_id, profile_json=profile, version=(latest.version if latest else 0) + 1)
     session.add(record)
     triage = extras.get('triage')
     triage_rec = TriageResult(patient_id=patient_id, level=triage['level'], red_flags_json={'red_flags': triage['red_flags']}, specialty_needed=triage.get('specialty_needed'))
     session.add(triage_rec)
+    await session.execute(update(Patient).where(Patient.id == patient_id).values(latest_triage_level=triage['level']))
     await session.commit()
     await session.refresh(record)
     return PatientProfileOut(
@@ -91,9 +97,9 @@ async def get_latest_profile(patient_id: int, session: AsyncSession = Depends(ge
 @router.post('/{patient_id}/triage', response_model=TriageOut)
 async def run_triage(patient_id: int, session: AsyncSession = Depends(get_session)):
     """Run triage (RED/AMBER/GREEN) with red-flag detection and safety footer."""
-    docs = (await session.execute(select(Document).where(Document.patient_id == patient_id))).scalars().all()
+    docs = (await session.execute(select(Document.extracted_text).where(Document.patient_id == patient_id))).scalars().all()
     transcripts = (await session.execute(select(Transcript).where(Transcript.patient_id == patient_id))).scalars().all()
-    texts = [d.extracted_text or '' for d in docs] + [t.text for t in transcripts]
+    texts = [d or '' for d in docs] + [t.text for t in transcripts]
     input_text = '\\n'.join(texts)
     triage = TriageGateAgent().run(input_text)
     triage.safety = ensure_safety(triage.safety)
@@ -1,27 +1,31 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.agents.questionnaire_agent import QuestionnaireAgent
-from app.schemas.questionnaire import QuestionnaireNext, QuestionnaireAnswer
+from app.schemas.questionnaire import QuestionnaireNext, QuestionnaireAnswer, QuestionnaireAnswerOut
 from app.db.session import get_session
-from app.models.profile import PatientProfile
+from app.services.questionnaire_service import QuestionnaireService
 
 router = APIRouter()
 
 @router.post('/{patient_id}/questionnaire/next', response_model=QuestionnaireNext)
 async def next_questions(patient_id: int, session: AsyncSession = Depends(get_session)):
-    """Return next adaptive questions for missing fields."""
-    result = await session.execute(
-        select(PatientProfile)
-        .where(PatientProfile.patient_id == patient_id)
-        .order_by(PatientProfile.created_at.desc())
-    )
-    profile = result.scalars().first()
-    profile_payload = profile.profile_json if profile else {}
-    input_text = f"Patient profile JSON:\n{profile_payload}"
-    return QuestionnaireAgent().run(input_text)
+    """Return next adaptive questions for missing fields.
+
+    Known fields use fixed questions; the LLM is only asked about unfamiliar gaps.
+    """
+    questions, fields = await QuestionnaireService().next_questions(session, patient_id)
+    return QuestionnaireNext(questions=questions, fields=fields)
 
-@router.post('/{patient_id}/questionnaire/answer')
-async def answer_questions(patient_id: int, payload: QuestionnaireAnswer):
-    """Submit questionnaire answers and update profile state."""
-    return {'status': 'received', 'answers': payload.answers}
+@router.post('/{patient_id}/questionnaire/answer', response_model=QuestionnaireAnswerOut)
+async def answer_questions(patient_id: int, payload: QuestionnaireAnswer, session: AsyncSession = Depends(get_session)):
+    """Merge answers into a new profile version and return the field-level diff."""
+    try:
+        record, changes, missing = await QuestionnaireService().answer(session, patient_id, payload.answers)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=exc.args[0])
+    return QuestionnaireAnswerOut(
+        patient_id=patient_id,
+        version=record.version,
+        changes=changes,
+        missing_fields=missing,
+        created_at=record.created_at.isoformat() if record.created_at else None,
+    )
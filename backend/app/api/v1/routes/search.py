@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_session
+from app.schemas.search import SearchHitOut, SearchPageOut
+from app.services.search_service import SearchService
+
+router = APIRouter()
+
+@router.get('/patients/{patient_id}/search', response_model=SearchPageOut)
+async def search_patient(
+    patient_id: int,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10_000),
+    session: AsyncSession = Depends(get_session),
+):
+    """Full-text search over one patient's documents and transcripts, best match first."""
+    hits, next_offset = await SearchService().search(session, q, patient_id=patient_id, limit=limit, offset=offset)
+    return SearchPageOut(items=[SearchHitOut(**hit) for hit in hits], next_offset=next_offset)
+
+@router.get('/search', response_model=SearchPageOut)
+async def search_cohort(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10_000),
+    session: AsyncSession = Depends(get_session),
+):
+    """Full-text search across all patients' documents and transcripts."""
+    hits, next_offset = await SearchService().search(session, q, limit=limit, offset=offset)
+    return SearchPageOut(items=[SearchHitOut(**hit) for hit in hits], next_offset=next_offset)
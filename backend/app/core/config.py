@@ -6,10 +6,42 @@ class Settings(BaseSettings):
     OPENAI_MODEL_REASONING: str | None = None
     OPENAI_MODEL_TTS: str = 'gpt-4o-mini-tts'
     OPENAI_MODEL_STT: str = 'whisper-1'
+    LLM_BACKEND: str = 'openai'
+    FAKE_BACKEND_SEED: int = 0
+    FAKE_BACKEND_LATENCY_MS: float = 0.0
+    FAKE_BACKEND_LATENCY_JITTER_MS: float = 0.0
+    FAKE_BACKEND_ERROR_RATE: float = 0.0
     DATABASE_URL: str = 'sqlite+aiosqlite:///./app.db'
+    DB_AUTO_CREATE: bool = True
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_SQLITE_JOURNAL_MODE: str = 'WAL'
+    DB_SQLITE_SYNCHRONOUS: str = 'NORMAL'
+    DB_SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    DB_SQLITE_MMAP_MB: int = 256
+    DB_SQLITE_CACHE_MB: int = 64
     REDIS_URL: str | None = None
+    METRICS_SHARED_DIR: str | None = None
+    METRICS_FLUSH_SECONDS: float = 5.0
     MCP_HOSPITAL_BASE_URL: str = 'http://localhost:9001'
     UPLOAD_DIR: str = './data/uploads'
+    TTS_CACHE_MAX_MB: int = 2048
+    TRANSCRIBE_CHUNK_SECONDS: int = 600
+    TRANSCRIBE_CONCURRENCY: int = 4
+    COMPRESSION_MINIMUM_BYTES: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    CONTEXT_TOP_K: int = 8
+    CONTEXT_CHAR_BUDGET: int = 4000
+    CONTEXT_INDEX_WORKERS: int = 2
+    PRESCRIPTION_PARSER_MIN_CONFIDENCE: float = 0.6
+    SCHEDULE_WINDOW_DAYS: int = 30
+    SCHEDULE_EXTEND_INTERVAL_SECONDS: int = 3600
+    REMINDER_MISSED_GRACE_MINUTES: int = 120
+    PASSWORD_HASH_WORKERS: int = 4
     NVIDIA_NIM_API_KEY: str | None = None
     NVIDIA_NIM_PAGE_ELEMENTS_URL: str = 'https://ai.api.nvidia.com/v1/cv/nvidia/nemoretriever-ocr-v1'
 
@@ -3,3 +3,6 @@ class ServiceError(Exception):
 
 class ValidationError(ServiceError):
     pass
+
+class AudioTooLargeError(ServiceError):
+    pass
@@ -0,0 +1,155 @@
+"""Create or upgrade the schema once, outside web worker startup.
+
+    cd backend && python -m app.db.migrate
+
+The Gunicorn profile runs this in the master before forking workers, and sets
+DB_AUTO_CREATE=false so workers skip it on startup.
+
+`create_all` only adds missing tables, so databases created by earlier releases
+are also brought up to the current models here. Each step is idempotent and
+keyed on what the inspector finds:
+- missing columns are added (nullable) and backfilled from existing data
+- missing indexes are created
+- dose/log timestamps stored as ISO strings are converted to DateTime values
+- a newly created adherence rollup is rebuilt from dose statuses
+- documents and transcripts without retrieval chunks are chunked and vectorised
+"""
+import asyncio
+from collections import Counter
+
+from sqlalchemy import Connection, exists, inspect, insert, select, text, update
+
+from app.db.base import Base
+from app.db.engine import build_engine
+from app.models.context import ContextChunk
+from app.models.document import PREVIEW_CHARS, Document
+from app.models.medication import AdherenceDaily, DoseSchedule, MedicationPlan
+from app.models.transcript import Transcript
+from app.services.adherence_service import ACTIONS
+from app.services.context_store_service import chunk_text, vectorize, write_vectors
+from app.utils.time import as_utc
+import app.models  # noqa: F401
+
+# Columns that were String(50) ISO timestamps before becoming DateTime(timezone=True).
+DATETIME_COLUMNS = (('dose_schedules', 'due_at'), ('dose_logs', 'timestamp'), ('side_effect_logs', 'timestamp'))
+
+
+async def migrate() -> None:
+    # A private engine, so no pooled connections survive into forked workers.
+    engine = build_engine()
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(upgrade)
+    finally:
+        await engine.dispose()
+
+
+def upgrade(conn: Connection) -> None:
+    existing = set(inspect(conn).get_table_names())
+    Base.metadata.create_all(conn)
+    if not existing:
+        return
+    added = _add_missing_columns(conn, existing)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+    _convert_datetime_columns(conn, existing)
+    if ('documents', 'has_text') in added:
+        conn.execute(text(
+            "UPDATE documents SET "
+            "has_text = (extracted_text IS NOT NULL AND trim(extracted_text) != ''), "
+            "char_count = coalesce(length(extracted_text), 0), "
+            f"preview = nullif(substr(extracted_text, 1, {PREVIEW_CHARS}), '')"
+        ))
+    if ('patients', 'latest_triage_level') in added:
+        conn.execute(text(
+            "UPDATE patients SET latest_triage_level = "
+            "(SELECT t.level FROM triage_results t WHERE t.patient_id = patients.id ORDER BY t.id DESC LIMIT 1)"
+        ))
+    if ('medication_plans', 'materialized_until') in added:
+        _backfill_materialized_until(conn)
+    if 'adherence_daily' not in existing:
+        _backfill_adherence(conn)
+    _backfill_context_chunks(conn)
+
+
+def _add_missing_columns(conn: Connection, existing: set[str]) -> set[tuple[str, str]]:
+    inspector = inspect(conn)
+    preparer = conn.dialect.identifier_preparer
+    added = set()
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        present = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            conn.execute(text(
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=conn.dialect)}"
+            ))
+            added.add((table.name, column.name))
+    return added
+
+
+def _convert_datetime_columns(conn: Connection, existing: set[str]) -> None:
+    inspector = inspect(conn)
+    for table, column in DATETIME_COLUMNS:
+        if table not in existing:
+            continue
+        if conn.dialect.name == 'sqlite':
+            # Rewrite ISO-8601 text ('2026-01-31T08:00:00Z') into the format SQLAlchemy's DateTime reads, in UTC.
+            conn.execute(text(f"UPDATE {table} SET {column} = strftime('%Y-%m-%d %H:%M:%f', {column}) WHERE {column} LIKE '%T%'"))
+        elif conn.dialect.name == 'postgresql':
+            current = next(c['type'] for c in inspector.get_columns(table) if c['name'] == column)
+            if current.python_type is str:
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE timestamptz USING {column}::timestamptz"))
+
+
+def _backfill_materialized_until(conn: Connection) -> None:
+    rows = conn.execute(select(DoseSchedule.plan_id, DoseSchedule.due_at).order_by(DoseSchedule.plan_id, DoseSchedule.due_at))
+    latest = {plan_id: as_utc(due_at).date().isoformat() for plan_id, due_at in rows}
+    for plan_id, until in latest.items():
+        conn.execute(update(MedicationPlan).where(MedicationPlan.id == plan_id).values(materialized_until=until))
+
+
+def _backfill_adherence(conn: Connection) -> None:
+    rows = conn.execute(
+        select(MedicationPlan.patient_id, DoseSchedule.due_at, DoseSchedule.status)
+        .join(MedicationPlan, MedicationPlan.id == DoseSchedule.plan_id)
+        .where(DoseSchedule.status.in_(ACTIONS))
+    )
+    counts = Counter((patient_id, as_utc(due_at).date(), status) for patient_id, due_at, status in rows)
+    days: dict[tuple[int, object], dict] = {}
+    for (patient_id, day, status), count in counts.items():
+        row = days.setdefault((patient_id, day), {'patient_id': patient_id, 'day': day, **{name: 0 for name in ACTIONS}})
+        row[status] = count
+    if days:
+        conn.execute(insert(AdherenceDaily), list(days.values()))
+
+
+
+def _backfill_context_chunks(conn: Connection) -> None:
+    """Chunk records that predate retrieval, so context doesn't narrow to new uploads."""
+    sources = (
+        ('document', Document, Document.extracted_text),
+        ('transcript', Transcript, Transcript.text),
+    )
+    for kind, model, body in sources:
+        indexed = exists().where(ContextChunk.kind == kind, ContextChunk.ref_id == model.id)
+        rows = conn.execute(select(model.id, model.patient_id, body).where(body.is_not(None), ~indexed)).all()
+        for ref_id, patient_id, text_value in rows:
+            pieces = chunk_text(text_value)
+            if not pieces:
+                continue
+            ids = conn.execute(
+                insert(ContextChunk).returning(ContextChunk.id, sort_by_parameter_order=True),
+                [{'patient_id': patient_id, 'kind': kind, 'ref_id': ref_id, 'ordinal': i, 'text': p} for i, p in enumerate(pieces)],
+            ).scalars().all()
+            # Written before the migration commits; if it rolls back, a reused id's
+            # vector is rewritten when that chunk commits.
+            write_vectors([(chunk_id, vectorize(p).tobytes()) for chunk_id, p in zip(ids, pieces)])
+
+
+if __name__ == '__main__':
+    asyncio.run(migrate())
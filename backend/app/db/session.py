@@ -1,7 +1,7 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession
-from app.core.config import settings
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+from app.db.engine import build_engine
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True)
+engine = build_engine()
 SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 async def get_session() -> AsyncSession:
@@ -0,0 +1,10 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+def dialect_insert(session: AsyncSession):
+    """Return the dialect's `insert` so callers can use ON CONFLICT upserts."""
+    # Imported per call so SQLite deployments never load the Postgres dialect.
+    if session.bind.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
@@ -1,13 +1,26 @@
+import asyncio
 import os
-from fastapi import FastAPI
+import re
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.api.router import api_router
-from app.db.base import Base
+from app.db.migrate import upgrade
 from app.db.session import engine
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.orchestration.tracing import (
+    TRACE_HEADER, current_trace_id, render_metrics, reset_patient_id, reset_trace_id, run_metrics_flusher,
+    set_patient_id, set_trace_id, write_snapshot,
+)
+from app.services.audit_log_service import audit_sink
+from app.services.medication_tracker_service import run_schedule_extender
+from app.services.reminder_scheduler_service import reminder_scheduler
 import app.models  # noqa: F401
 
+PATIENT_PATH_RE = re.compile(r'^/api/v1/patients/(\d+)(?:/|$)')
+
 tags_metadata = [
     {"name": "patients", "description": "Create and fetch patient records."},
     {"name": "ingestion", "description": "Upload documents/audio and extract text."},
@@ -19,6 +32,7 @@ tags_metadata = [
     {"name": "coach", "description": "Daily recovery coach scripts and audio."},
     {"name": "feedback", "description": "Doctor feedback and audit views."},
     {"name": "auth", "description": "Login for patients, doctors, and hospitals."},
+    {"name": "search", "description": "Full-text search over documents and transcripts."},
 ]
 
 app = FastAPI(
@@ -36,7 +50,28 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[TRACE_HEADER, "X-Next-Cursor"],
+)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_BYTES,
+    gzip_level=settings.GZIP_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
 )
+
+@app.middleware('http')
+async def trace_requests(request: Request, call_next):
+    token = set_trace_id(request.headers.get(TRACE_HEADER, '')[:64] or None)
+    patient = PATIENT_PATH_RE.match(request.url.path)
+    patient_token = set_patient_id(int(patient.group(1)) if patient else None)
+    try:
+        response = await call_next(request)
+        response.headers[TRACE_HEADER] = current_trace_id()
+        return response
+    finally:
+        reset_patient_id(patient_token)
+        reset_trace_id(token)
+
 app.include_router(api_router, prefix='/api/v1')
 
 upload_dir = os.path.abspath(settings.UPLOAD_DIR)
@@ -45,8 +80,35 @@ app.mount("/data/uploads", StaticFiles(directory=upload_dir), name="uploads")
 
 @app.on_event('startup')
 async def startup() -> None:
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    if settings.DB_AUTO_CREATE:
+        async with engine.begin() as conn:
+            await conn.run_sync(upgrade)
+    if settings.METRICS_SHARED_DIR:
+        app.state.metrics_flusher = asyncio.create_task(
+            run_metrics_flusher(settings.METRICS_SHARED_DIR, settings.METRICS_FLUSH_SECONDS)
+        )
+    app.state.schedule_extender = asyncio.create_task(run_schedule_extender())
+    app.state.reminder_scheduler = asyncio.create_task(reminder_scheduler.run())
+    audit_sink.start()
+
+@app.on_event('shutdown')
+async def shutdown() -> None:
+    background = [app.state.schedule_extender, app.state.reminder_scheduler]
+    if settings.METRICS_SHARED_DIR:
+        background.append(app.state.metrics_flusher)
+    for task in background:
+        task.cancel()
+    # Let cancelled loops unwind before their pooled connections are closed.
+    await asyncio.gather(*background, return_exceptions=True)
+    await reminder_scheduler.release()
+    await audit_sink.close()
+    if settings.METRICS_SHARED_DIR:
+        write_snapshot(settings.METRICS_SHARED_DIR)
+    await engine.dispose()
+
+@app.get('/metrics', include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(render_metrics(settings.METRICS_SHARED_DIR), media_type='text/plain; version=0.0.4')
 
 @app.get('/health')
 async def health():
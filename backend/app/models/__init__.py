@@ -4,12 +4,15 @@ from app.models.transcript import Transcript
 from app.models.profile import PatientProfile
 from app.models.triage import TriageResult
 from app.models.prescription import Prescription
-from app.models.medication import MedicationPlan, DoseSchedule, DoseLog, SideEffectLog
-from app.models.coach import DoctorAdvicePack, CoachMessage
+from app.models.medication import MedicationPlan, DoseSchedule, DoseLog, SideEffectLog, AdherenceDaily
+from app.models.coach import DoctorAdvicePack, CoachMessage, CoachBatchRun, TTSAudio
 from app.models.audit import AuditLog
 from app.models.feedback import Feedback
 from app.models.account import Account
 from app.models.summary import SbarSummary
+from app.models.lease import SchedulerLease
+from app.models.context import ContextChunk
+from app.models import search  # noqa: F401  (registers the full-text index DDL)
 
 __all__ = [
     'Patient',
@@ -22,10 +25,15 @@ __all__ = [
     'DoseSchedule',
     'DoseLog',
     'SideEffectLog',
+    'AdherenceDaily',
     'DoctorAdvicePack',
     'CoachMessage',
+    'CoachBatchRun',
+    'TTSAudio',
     'AuditLog',
     'Feedback',
     'Account',
     'SbarSummary',
+    'SchedulerLease',
+    'ContextChunk',
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, DateTime, ForeignKey, String, JSON
+from sqlalchemy import Integer, DateTime, ForeignKey, Index, String, JSON
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 from app.db.base import Base
@@ -13,3 +13,5 @@ class AuditLog(Base):
     input_meta_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     output_meta_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index('ix_audit_logs_patient_id_id', 'patient_id', 'id'),)
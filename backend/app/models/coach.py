@@ -1,6 +1,6 @@
-from sqlalchemy import Integer, DateTime, ForeignKey, Text, JSON, String
+from sqlalchemy import Integer, Date, DateTime, ForeignKey, Text, JSON, String
 from sqlalchemy.orm import Mapped, mapped_column
-from datetime import datetime
+from datetime import date, datetime
 from app.db.base import Base
 
 class DoctorAdvicePack(Base):
@@ -17,3 +17,25 @@ class CoachMessage(Base):
     script_text: Mapped[str] = mapped_column(Text)
     audio_path: Mapped[str] = mapped_column(String(500))
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+class CoachBatchRun(Base):
+    __tablename__ = 'coach_batch_runs'
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    run_date: Mapped[date] = mapped_column(Date, unique=True)
+    status: Mapped[str] = mapped_column(String(20), default='running')
+    last_patient_id: Mapped[int] = mapped_column(Integer, default=0)
+    generated: Mapped[int] = mapped_column(Integer, default=0)
+    skipped: Mapped[int] = mapped_column(Integer, default=0)
+    failed: Mapped[int] = mapped_column(Integer, default=0)
+    # Patients whose generation failed; retried first when the run is resumed.
+    failed_patient_ids: Mapped[list[int] | None] = mapped_column(JSON, nullable=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+class TTSAudio(Base):
+    __tablename__ = 'tts_audio'
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    path: Mapped[str] = mapped_column(String(500))
+    size_bytes: Mapped[int] = mapped_column(Integer, default=0)
+    ref_count: Mapped[int] = mapped_column(Integer, default=0)
+    last_used_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,20 @@
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Index, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from app.db.base import Base
+
+class ContextChunk(Base):
+    """A retrievable slice of a document or transcript; its vector lives at row `id` of the vector file."""
+    __tablename__ = 'context_chunks'
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    patient_id: Mapped[int] = mapped_column(Integer, ForeignKey('patients.id'))
+    kind: Mapped[str] = mapped_column(String(20))
+    ref_id: Mapped[int] = mapped_column(Integer)
+    ordinal: Mapped[int] = mapped_column(Integer)
+    text: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_context_chunks_patient_id', 'patient_id'),
+        Index('ix_context_chunks_kind_ref', 'kind', 'ref_id'),
+    )
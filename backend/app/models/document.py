@@ -1,13 +1,27 @@
-from sqlalchemy import Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Text, Boolean, event
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 from app.db.base import Base
 
+PREVIEW_CHARS = 300
+
 class Document(Base):
     __tablename__ = 'documents'
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     patient_id: Mapped[int] = mapped_column(Integer, ForeignKey('patients.id'))
     file_path: Mapped[str] = mapped_column(String(500))
     mime_type: Mapped[str] = mapped_column(String(100))
-    extracted_text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # OCR output can run to megabytes; load it explicitly with undefer() or a column select.
+    extracted_text: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True)
+    has_text: Mapped[bool] = mapped_column(Boolean, default=False)
+    char_count: Mapped[int] = mapped_column(Integer, default=0)
+    preview: Mapped[str | None] = mapped_column(String(PREVIEW_CHARS), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+@event.listens_for(Document.extracted_text, 'set')
+def _summarize_text(target: Document, value: str | None, oldvalue, initiator) -> None:
+    """Keep the listing columns in step with extracted_text."""
+    text = value or ''
+    target.has_text = bool(text.strip())
+    target.char_count = len(text)
+    target.preview = text[:PREVIEW_CHARS] or None
@@ -1,6 +1,6 @@
-from sqlalchemy import Integer, DateTime, ForeignKey, JSON, Boolean, String
+from sqlalchemy import Integer, Date, DateTime, ForeignKey, JSON, Boolean, String, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
-from datetime import datetime
+from datetime import date, datetime
 from app.db.base import Base
 
 class MedicationPlan(Base):
@@ -10,13 +10,19 @@ class MedicationPlan(Base):
     plan_json: Mapped[dict] = mapped_column(JSON)
     active: Mapped[bool] = mapped_column(Boolean, default=True)
     start_date: Mapped[str] = mapped_column(String(50))
+    materialized_until: Mapped[str | None] = mapped_column(String(50), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 class DoseSchedule(Base):
     __tablename__ = 'dose_schedules'
+    __table_args__ = (
+        Index('ix_dose_schedules_plan_due', 'plan_id', 'due_at'),
+        Index('ix_dose_schedules_status_due', 'status', 'due_at'),
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     plan_id: Mapped[int] = mapped_column(Integer, ForeignKey('medication_plans.id'))
-    due_at: Mapped[str] = mapped_column(String(50))
+    due_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     med_name: Mapped[str] = mapped_column(String(200))
     dose: Mapped[str] = mapped_column(String(100))
     status: Mapped[str] = mapped_column(String(20), default='pending')
@@ -24,15 +30,28 @@ class DoseSchedule(Base):
 class DoseLog(Base):
     __tablename__ = 'dose_logs'
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    dose_id: Mapped[int] = mapped_column(Integer, ForeignKey('dose_schedules.id'))
+    dose_id: Mapped[int] = mapped_column(Integer, ForeignKey('dose_schedules.id'), index=True)
     action: Mapped[str] = mapped_column(String(20))
-    timestamp: Mapped[str] = mapped_column(String(50))
+    timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     note: Mapped[str | None] = mapped_column(String(500), nullable=True)
 
 class SideEffectLog(Base):
     __tablename__ = 'side_effect_logs'
+    __table_args__ = (Index('ix_side_effect_logs_patient_ts', 'patient_id', 'timestamp'),)
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     patient_id: Mapped[int] = mapped_column(Integer, ForeignKey('patients.id'))
     symptom: Mapped[str] = mapped_column(String(200))
     severity: Mapped[str] = mapped_column(String(20))
-    timestamp: Mapped[str] = mapped_column(String(50))
+    timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+class AdherenceDaily(Base):
+    __tablename__ = 'adherence_daily'
+    __table_args__ = (UniqueConstraint('patient_id', 'day', name='uq_adherence_daily_patient_day'),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    patient_id: Mapped[int] = mapped_column(Integer, ForeignKey('patients.id'))
+    day: Mapped[date] = mapped_column(Date)
+    taken: Mapped[int] = mapped_column(Integer, default=0)
+    missed: Mapped[int] = mapped_column(Integer, default=0)
+    skipped: Mapped[int] = mapped_column(Integer, default=0)
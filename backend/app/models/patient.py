@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, DateTime
+from sqlalchemy import String, Integer, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 from app.db.base import Base
@@ -10,4 +10,10 @@ class Patient(Base):
     age: Mapped[int | None] = mapped_column(Integer, nullable=True)
     sex: Mapped[str | None] = mapped_column(String(50), nullable=True)
     contact_masked: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    latest_triage_level: Mapped[str | None] = mapped_column(String(20), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_patients_name', 'name'),
+        Index('ix_patients_triage_level_id', 'latest_triage_level', 'id'),
+    )
@@ -0,0 +1,47 @@
+"""Full-text index over document and transcript text.
+
+Not a mapped table: SQLite uses an FTS5 virtual table and Postgres a table with a
+generated tsvector column, so the DDL is issued from a metadata `after_create`
+hook. The first time the index is created it is backfilled from existing rows.
+"""
+from sqlalchemy import event, text
+
+from app.db.base import Base
+
+SEARCH_TABLE = 'search_index'
+# FTS5 rows are addressed by rowid, so (kind, ref_id) is packed into it.
+KIND_CODES = {'document': 0, 'transcript': 1}
+
+_SQLITE_DDL = (
+    f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+    "body, kind UNINDEXED, ref_id UNINDEXED, patient_id UNINDEXED, tokenize='porter unicode61')",
+)
+_SQLITE_BACKFILL = (
+    f"INSERT INTO {SEARCH_TABLE}(rowid, body, kind, ref_id, patient_id) "
+    "SELECT id * 2, extracted_text, 'document', id, patient_id FROM documents WHERE trim(coalesce(extracted_text, '')) != ''",
+    f"INSERT INTO {SEARCH_TABLE}(rowid, body, kind, ref_id, patient_id) "
+    "SELECT id * 2 + 1, text, 'transcript', id, patient_id FROM transcripts WHERE trim(coalesce(text, '')) != ''",
+)
+_POSTGRES_DDL = (
+    f"CREATE TABLE {SEARCH_TABLE} ("
+    "kind varchar(20) NOT NULL, ref_id integer NOT NULL, patient_id integer NOT NULL, body text NOT NULL, "
+    "tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', body)) STORED, PRIMARY KEY (kind, ref_id))",
+    f"CREATE INDEX ix_{SEARCH_TABLE}_tsv ON {SEARCH_TABLE} USING gin (tsv)",
+    f"CREATE INDEX ix_{SEARCH_TABLE}_patient_id ON {SEARCH_TABLE} (patient_id)",
+)
+_POSTGRES_BACKFILL = (
+    f"INSERT INTO {SEARCH_TABLE}(kind, ref_id, patient_id, body) "
+    "SELECT 'document', id, patient_id, extracted_text FROM documents WHERE trim(coalesce(extracted_text, '')) != ''",
+    f"INSERT INTO {SEARCH_TABLE}(kind, ref_id, patient_id, body) "
+    "SELECT 'transcript', id, patient_id, text FROM transcripts WHERE trim(coalesce(text, '')) != ''",
+)
+
+
+@event.listens_for(Base.metadata, 'after_create')
+def create_search_index(target, connection, **kw) -> None:
+    dialect = connection.dialect.name
+    if dialect not in ('sqlite', 'postgresql') or connection.dialect.has_table(connection, SEARCH_TABLE):
+        return
+    ddl, backfill = (_SQLITE_DDL, _SQLITE_BACKFILL) if dialect == 'sqlite' else (_POSTGRES_DDL, _POSTGRES_BACKFILL)
+    for statement in (*ddl, *backfill):
+        connection.execute(text(statement))
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Text, JSON
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 from app.db.base import Base
@@ -9,4 +9,5 @@ class Transcript(Base):
     patient_id: Mapped[int] = mapped_column(Integer, ForeignKey('patients.id'))
     audio_path: Mapped[str] = mapped_column(String(500))
     text: Mapped[str] = mapped_column(Text)
+    segments_json: Mapped[list | None] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
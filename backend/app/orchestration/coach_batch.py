@@ -0,0 +1,273 @@
+"""Nightly recovery-coach generation for every patient with an active plan.
+
+Run with `python -m app.orchestration.coach_batch [--date YYYY-MM-DD]`. Progress is
+checkpointed per chunk in `coach_batch_runs`, so re-running the same date resumes
+after the last committed patient and first retries any patients whose generation failed.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from datetime import date, datetime
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.db.migrate import upgrade
+from app.db.session import SessionLocal, engine
+from app.models.coach import CoachBatchRun, CoachMessage, DoctorAdvicePack
+from app.models.medication import DoseLog, DoseSchedule, MedicationPlan
+from app.models.patient import Patient
+from app.models.profile import PatientProfile
+from app.orchestration.pipeline import coach_input_text, coach_script
+from app.orchestration.tracing import queued
+from app.services.adherence_service import ACTIONS
+from app.services.audit_log_service import audit_sink
+from app.services.tts_service import TTSService, TTSAudioCacheService
+from app.utils.time import as_utc, utc_day_range, utc_now
+import app.models  # noqa: F401
+
+logger = get_logger(__name__)
+
+CHUNK_SIZE = 200
+LLM_CONCURRENCY = 8
+TTS_CONCURRENCY = 4
+
+async def run_coach_batch(
+    run_date: date | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    llm_concurrency: int = LLM_CONCURRENCY,
+    tts_concurrency: int = TTS_CONCURRENCY,
+) -> dict:
+    run_date = run_date or utc_now().date()
+    llm_slots = asyncio.Semaphore(llm_concurrency)
+    tts_slots = asyncio.Semaphore(tts_concurrency)
+    async with SessionLocal() as session:
+        run = await _get_or_start_run(session, run_date)
+        if run.status == 'completed' and not run.failed_patient_ids:
+            return _run_stats(run, 0, 0.0)
+        run_id, last_patient_id = run.id, run.last_patient_id
+        retry_ids = sorted(run.failed_patient_ids or [])
+    started = time.monotonic()
+    processed = 0
+    # Patients that failed in an earlier invocation are retried once before moving on.
+    for i in range(0, len(retry_ids), chunk_size):
+        chunk = retry_ids[i:i + chunk_size]
+        await _process_chunk(run_id, chunk, run_date, llm_slots, tts_slots, advance=False)
+        processed += len(chunk)
+    while True:
+        async with SessionLocal() as session:
+            patient_ids = await _next_patient_ids(session, last_patient_id, chunk_size)
+        if not patient_ids:
+            break
+        generated = await _process_chunk(run_id, patient_ids, run_date, llm_slots, tts_slots, advance=True)
+        last_patient_id = patient_ids[-1]
+        processed += len(patient_ids)
+        elapsed = time.monotonic() - started
+        logger.info('coach batch chunk committed', extra={
+            'run_date': run_date.isoformat(),
+            'last_patient_id': last_patient_id,
+            'generated': generated,
+            'patients_per_sec': round(processed / elapsed, 2) if elapsed else None,
+        })
+    async with SessionLocal() as session:
+        run = await session.get(CoachBatchRun, run_id)
+        run.status = 'completed'
+        run.finished_at = datetime.utcnow()
+        await session.commit()
+        stats = _run_stats(run, processed, time.monotonic() - started)
+        await TTSAudioCacheService().evict(session)
+    logger.info('coach batch finished', extra=stats)
+    return stats
+
+
+async def _process_chunk(
+    run_id: int,
+    patient_ids: list[int],
+    run_date: date,
+    llm_slots: asyncio.Semaphore,
+    tts_slots: asyncio.Semaphore,
+    advance: bool,
+) -> int:
+    """Generate and commit one chunk; `advance` moves the resume checkpoint past it."""
+    async with SessionLocal() as session:
+        contexts, already = await _load_contexts(session, patient_ids, run_date)
+    results = await asyncio.gather(*(_generate(ctx, llm_slots, tts_slots) for ctx in contexts))
+    rows = [row for row in results if row is not None]
+    failed_ids = {ctx['patient_id'] for ctx, row in zip(contexts, results) if row is None}
+    async with SessionLocal() as session:
+        if rows:
+            audio_cache = TTSAudioCacheService()
+            await audio_cache.release(session, await _latest_audio_paths(session, [row['patient_id'] for row in rows]))
+            await audio_cache.retain(session, [row['audio_path'] for row in rows])
+            await session.execute(insert(CoachMessage), rows)
+        run = await session.get(CoachBatchRun, run_id)
+        failed = (set(run.failed_patient_ids or []) - set(patient_ids)) | failed_ids
+        run.failed_patient_ids = sorted(failed)
+        run.failed = len(failed)
+        run.generated += len(rows)
+        if advance:
+            run.last_patient_id = patient_ids[-1]
+            run.skipped += len(already)
+        await session.commit()
+    return len(rows)
+
+
+async def _get_or_start_run(session: AsyncSession, run_date: date) -> CoachBatchRun:
+    result = await session.execute(select(CoachBatchRun).where(CoachBatchRun.run_date == run_date))
+    run = result.scalar_one_or_none()
+    if run is None:
+        run = CoachBatchRun(run_date=run_date, status='running', last_patient_id=0, generated=0, skipped=0, failed=0)
+        session.add(run)
+        await session.commit()
+    return run
+
+
+async def _next_patient_ids(session: AsyncSession, after_patient_id: int, limit: int) -> list[int]:
+    result = await session.execute(
+        select(MedicationPlan.patient_id)
+        .where(MedicationPlan.active == True, MedicationPlan.patient_id > after_patient_id)  # noqa: E712
+        .group_by(MedicationPlan.patient_id)
+        .order_by(MedicationPlan.patient_id)
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def _load_contexts(session: AsyncSession, patient_ids: list[int], run_date: date) -> tuple[list[dict], set[int]]:
+    """Build coach inputs for a chunk with one query per table instead of one per patient.
+
+    Also returns the patients that already have a message for `run_date`, which are skipped.
+    """
+    day_start, day_end = utc_day_range(run_date)
+    done = await session.execute(
+        select(CoachMessage.patient_id)
+        .where(
+            CoachMessage.patient_id.in_(patient_ids),
+            CoachMessage.created_at >= day_start.replace(tzinfo=None),
+            CoachMessage.created_at < day_end.replace(tzinfo=None),
+        )
+        .distinct()
+    )
+    already = set(done.scalars().all())
+    pending_ids = [pid for pid in patient_ids if pid not in already]
+    if not pending_ids:
+        return [], already
+
+    names = dict((await session.execute(
+        select(Patient.id, Patient.name).where(Patient.id.in_(pending_ids))
+    )).all())
+    profiles = await _latest_by_patient(session, PatientProfile, PatientProfile.profile_json, pending_ids)
+    advice = await _latest_by_patient(session, DoctorAdvicePack, DoctorAdvicePack.advice_json, pending_ids)
+    latest_plan = (
+        select(func.max(MedicationPlan.id))
+        .where(MedicationPlan.patient_id.in_(pending_ids), MedicationPlan.active == True)  # noqa: E712
+        .group_by(MedicationPlan.patient_id)
+    )
+    plans = {
+        plan.id: plan
+        for plan in (await session.execute(select(MedicationPlan).where(MedicationPlan.id.in_(latest_plan)))).scalars().all()
+    }
+    doses: dict[int, list[dict]] = defaultdict(list)
+    dose_rows = await session.execute(
+        select(DoseSchedule)
+        .where(DoseSchedule.plan_id.in_(plans), DoseSchedule.due_at >= day_start, DoseSchedule.due_at < day_end)
+        .order_by(DoseSchedule.due_at)
+    )
+    for d in dose_rows.scalars().all():
+        doses[d.plan_id].append(
+            {"med_name": d.med_name, "dose": d.dose, "due_at": as_utc(d.due_at).isoformat(), "status": d.status}
+        )
+    adherence: dict[int, dict] = defaultdict(lambda: {name: 0 for name in ACTIONS})
+    log_rows = await session.execute(
+        select(DoseSchedule.plan_id, DoseLog.action, func.count())
+        .join(DoseSchedule, DoseSchedule.id == DoseLog.dose_id)
+        .where(
+            DoseSchedule.plan_id.in_(plans),
+            DoseSchedule.due_at >= day_start,
+            DoseSchedule.due_at < day_end,
+            DoseLog.action.in_(ACTIONS),
+        )
+        .group_by(DoseSchedule.plan_id, DoseLog.action)
+    )
+    for plan_id, action, count in log_rows.all():
+        adherence[plan_id][action] = count
+
+    contexts = []
+    for plan in sorted(plans.values(), key=lambda p: p.patient_id):
+        contexts.append({
+            'patient_id': plan.patient_id,
+            'input_text': coach_input_text(
+                names.get(plan.patient_id, 'Patient'),
+                profiles.get(plan.patient_id, {}),
+                plan.plan_json,
+                doses[plan.id],
+                adherence[plan.id],
+                advice.get(plan.patient_id, {}),
+            ),
+        })
+    return contexts, already
+
+
+async def _latest_by_patient(session: AsyncSession, model, column, patient_ids: list[int]) -> dict[int, dict]:
+    latest = select(func.max(model.id)).where(model.patient_id.in_(patient_ids)).group_by(model.patient_id)
+    result = await session.execute(select(model.patient_id, column).where(model.id.in_(latest)))
+    return dict(result.all())
+
+
+async def _latest_audio_paths(session: AsyncSession, patient_ids: list[int]) -> list[str]:
+    latest = select(func.max(CoachMessage.id)).where(CoachMessage.patient_id.in_(patient_ids)).group_by(CoachMessage.patient_id)
+    result = await session.execute(select(CoachMessage.audio_path).where(CoachMessage.id.in_(latest)))
+    return list(result.scalars().all())
+
+
+async def _generate(context: dict, llm_slots: asyncio.Semaphore, tts_slots: asyncio.Semaphore) -> dict | None:
+    try:
+        async with queued(llm_slots, 'coach_llm'):
+            script = await asyncio.to_thread(coach_script, context['input_text'])
+        async with queued(tts_slots, 'coach_tts'):
+            audio_path = await asyncio.to_thread(TTSService().synthesize, script)
+    except Exception:
+        logger.exception('coach generation failed', extra={'patient_id': context['patient_id']})
+        return None
+    return {'patient_id': context['patient_id'], 'script_text': script, 'audio_path': audio_path}
+
+
+def _run_stats(run: CoachBatchRun, processed: int, elapsed: float) -> dict:
+    return {
+        'run_date': run.run_date.isoformat(),
+        'status': run.status,
+        'generated': run.generated,
+        'skipped': run.skipped,
+        'failed': run.failed,
+        'processed_this_invocation': processed,
+        'elapsed_sec': round(elapsed, 2),
+        'patients_per_sec': round(processed / elapsed, 2) if elapsed else None,
+    }
+
+
+async def _main(args: argparse.Namespace) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(upgrade)
+    audit_sink.start()
+    try:
+        stats = await run_coach_batch(
+            date.fromisoformat(args.date) if args.date else None,
+            chunk_size=args.chunk_size,
+            llm_concurrency=args.llm_concurrency,
+            tts_concurrency=args.tts_concurrency,
+        )
+    finally:
+        await audit_sink.close()
+    print(stats)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate recovery coach messages for all active plans.')
+    parser.add_argument('--date', help='Run date (YYYY-MM-DD, UTC). Defaults to today.')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--llm-concurrency', type=int, default=LLM_CONCURRENCY)
+    parser.add_argument('--tts-concurrency', type=int, default=TTS_CONCURRENCY)
+    asyncio.run(_main(parser.parse_args()))
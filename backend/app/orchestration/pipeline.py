@@ -9,6 +9,7 @@ from app.services.interaction_rules_service import InteractionRulesService
 from app.services.hospital_mcp_service import HospitalMCPService
 from app.services.medication_tracker_service import MedicationTrackerService
 from app.services.tts_service import TTSService
+from app.utils.safety import safety_footer_text
 
 async def build_patient_profile(input_text: str) -> tuple[dict, dict]:
     profile = ProfilerAgent().run(input_text)
@@ -39,7 +40,21 @@ async def activate_med_plan(plan_json: dict) -> list[dict]:
     tracker = MedicationTrackerService()
     return tracker.build_schedule(plan_json, days=1)
 
-async def generate_daily_coach(input_text: str) -> tuple[str, str]:
+def coach_input_text(patient_name: str, profile: dict, plan: dict, today_doses: list[dict], adherence: dict, advice: dict) -> str:
+    return (
+        f"Patient name: {patient_name}\n"
+        f"Patient profile JSON:\n{profile}\n\n"
+        f"Active medication plan:\n{plan}\n\n"
+        f"Today's doses:\n{today_doses}\n\n"
+        f"Adherence today:\n{adherence}\n\n"
+        f"Doctor advice pack:\n{advice}"
+    )
+
+def coach_script(input_text: str) -> str:
     script = RecoveryCoachAgent().run(input_text)
+    return f"{script}\n\nSafety: {safety_footer_text()}"
+
+async def generate_daily_coach(input_text: str) -> tuple[str, str]:
+    script = coach_script(input_text)
     audio_path = TTSService().synthesize(script)
     return script, audio_path
@@ -1,5 +1,281 @@
+"""Per-request trace ids plus in-process metrics for agents and model calls.
+
+The trace id and current agent live in context variables, so they follow requests
+into `asyncio.to_thread` and FastAPI's threadpool. Metrics are rendered in the
+Prometheus text format by `/metrics`. Under several worker processes each one
+periodically writes a snapshot to a shared directory and `/metrics` renders the
+sum, whichever worker serves the scrape.
+"""
+from __future__ import annotations
+import asyncio
+import functools
+import glob
+import json
+import os
+import threading
+import time
 import uuid
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+TRACE_HEADER = 'X-Trace-Id'
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# USD per 1M (input, output) tokens; unknown models are tracked with zero cost.
+MODEL_PRICES = {
+    'gpt-4.1': (2.00, 8.00),
+    'gpt-4.1-mini': (0.40, 1.60),
+    'gpt-4.1-nano': (0.10, 0.40),
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4o-mini': (0.15, 0.60),
+}
+
+_trace_id: ContextVar[str | None] = ContextVar('trace_id', default=None)
+_agent: ContextVar[str] = ContextVar('agent', default='none')
+_patient_id: ContextVar[int | None] = ContextVar('patient_id', default=None)
 
 
 def new_trace_id() -> str:
     return uuid.uuid4().hex
+
+
+def current_trace_id() -> str | None:
+    return _trace_id.get()
+
+
+def set_trace_id(trace_id: str | None = None):
+    return _trace_id.set(trace_id or new_trace_id())
+
+
+def reset_trace_id(token) -> None:
+    _trace_id.reset(token)
+
+
+def current_patient_id() -> int | None:
+    return _patient_id.get()
+
+
+def set_patient_id(patient_id: int | None):
+    return _patient_id.set(patient_id)
+
+
+def reset_patient_id(token) -> None:
+    _patient_id.reset(token)
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, list]] = {}
+        self._help: dict[str, str] = {}
+
+    def inc(self, name: str, labels: dict, value: float = 1.0, help: str = '') -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._help.setdefault(name, help)
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, labels: dict, value: float, help: str = '') -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._help.setdefault(name, help)
+            series = self._histograms.setdefault(name, {})
+            buckets, total = series.setdefault(key, [[0] * (len(LATENCY_BUCKETS) + 1), [0.0, 0]])
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    buckets[i] += 1
+            buckets[-1] += 1
+            total[0] += value
+            total[1] += 1
+
+    def render(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines += [f'# HELP {name} {self._help.get(name, "")}', f'# TYPE {name} counter']
+                lines += [f'{name}{_labels(key)} {value:g}' for key, value in sorted(series.items())]
+            for name, series in sorted(self._histograms.items()):
+                lines += [f'# HELP {name} {self._help.get(name, "")}', f'# TYPE {name} histogram']
+                for key, (buckets, (total, count)) in sorted(series.items()):
+                    for bound, bucket in zip([*LATENCY_BUCKETS, '+Inf'], buckets):
+                        lines.append(f'{name}_bucket{_labels(key, le=bound)} {bucket}')
+                    lines += [f'{name}_sum{_labels(key)} {total:.6f}', f'{name}_count{_labels(key)} {count}']
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> dict:
+        """JSON-serialisable copy of every series."""
+        with self._lock:
+            return {
+                'help': dict(self._help),
+                'counters': {name: [[list(key), value] for key, value in series.items()] for name, series in self._counters.items()},
+                'histograms': {
+                    name: [[list(key), list(buckets), list(total)] for key, (buckets, total) in series.items()]
+                    for name, series in self._histograms.items()
+                },
+            }
+
+    def merge(self, snapshot: dict) -> None:
+        """Add another registry's snapshot into this one."""
+        with self._lock:
+            for name, help in snapshot.get('help', {}).items():
+                self._help.setdefault(name, help)
+            for name, rows in snapshot.get('counters', {}).items():
+                series = self._counters.setdefault(name, {})
+                for key, value in rows:
+                    key = tuple(tuple(item) for item in key)
+                    series[key] = series.get(key, 0.0) + value
+            for name, rows in snapshot.get('histograms', {}).items():
+                series = self._histograms.setdefault(name, {})
+                for key, buckets, (total, count) in rows:
+                    key = tuple(tuple(item) for item in key)
+                    mine, sums = series.setdefault(key, [[0] * (len(LATENCY_BUCKETS) + 1), [0.0, 0]])
+                    for i, bucket in enumerate(buckets):
+                        mine[i] += bucket
+                    sums[0] += total
+                    sums[1] += count
+
+
+metrics = Metrics()
+
+
+def write_snapshot(directory: str) -> None:
+    """Write this process's metrics to `directory/<pid>.json` (atomic rename)."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{os.getpid()}.json')
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(metrics.snapshot(), f)
+    os.replace(tmp_path, path)
+
+
+def render_metrics(directory: str | None = None) -> str:
+    """Prometheus text for this process, or summed over every snapshot in `directory`."""
+    if not directory:
+        return metrics.render()
+    write_snapshot(directory)
+    merged = Metrics()
+    # Snapshots of exited workers stay, so counters never go backwards.
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        try:
+            with open(path) as f:
+                merged.merge(json.load(f))
+        except (OSError, ValueError):
+            logger.warning('unreadable metrics snapshot', extra={'path': path})
+    return merged.render()
+
+
+async def run_metrics_flusher(directory: str, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            write_snapshot(directory)
+        except OSError:
+            logger.exception('metrics snapshot failed')
+
+
+def traced_agent(name: str) -> Callable:
+    """Wrap an agent's run() to time it and attribute nested model calls to `name`."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            token = _agent.set(name)
+            started = time.perf_counter()
+            status = 'ok'
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                status = 'error'
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                _agent.reset(token)
+                metrics.observe('agent_run_seconds', {'agent': name, 'status': status}, elapsed, 'Agent run wall time.')
+                logger.info('agent run', extra={
+                    'trace_id': current_trace_id(), 'agent': name, 'status': status, 'duration_ms': round(elapsed * 1000, 1),
+                })
+        return wrapper
+    return decorator
+
+
+class LLMSpan:
+    def __init__(self, model: str, kind: str) -> None:
+        self.model = model
+        self.kind = kind
+        self.path = 'direct'
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def record_usage(self, response: Any) -> None:
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            self.input_tokens += getattr(usage, 'input_tokens', 0) or 0
+            self.output_tokens += getattr(usage, 'output_tokens', 0) or 0
+
+
+@contextmanager
+def llm_span(model: str, kind: str) -> Iterator[LLMSpan]:
+    """Time one logical model call; retries inside it add tokens and set `span.path`."""
+    span = LLMSpan(model, kind)
+    agent = _agent.get()
+    started = time.perf_counter()
+    status = 'ok'
+    try:
+        yield span
+    except Exception:
+        status = 'error'
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        labels = {'agent': agent, 'model': model, 'kind': kind}
+        metrics.observe('llm_call_seconds', labels, elapsed, 'Model call wall time including retries.')
+        metrics.inc('llm_calls_total', {**labels, 'path': span.path, 'status': status}, help='Model calls by retry path.')
+        if span.input_tokens or span.output_tokens:
+            metrics.inc('llm_tokens_total', {**labels, 'direction': 'input'}, span.input_tokens, 'Model tokens.')
+            metrics.inc('llm_tokens_total', {**labels, 'direction': 'output'}, span.output_tokens, 'Model tokens.')
+            cost = estimate_cost(model, span.input_tokens, span.output_tokens)
+            metrics.inc('llm_cost_usd_total', labels, cost, 'Estimated model spend in USD.')
+        logger.info('llm call', extra={
+            'trace_id': current_trace_id(), 'agent': agent, 'model': model, 'kind': kind, 'path': span.path,
+            'status': status, 'duration_ms': round(elapsed * 1000, 1),
+            'input_tokens': span.input_tokens, 'output_tokens': span.output_tokens,
+        })
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    price_in, price_out = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (input_tokens * price_in + output_tokens * price_out) / 1_000_000
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    metrics.inc('cache_requests_total', {'cache': cache, 'result': 'hit' if hit else 'miss'}, help='Cache lookups.')
+
+
+@asynccontextmanager
+async def queued(slots: asyncio.Semaphore, queue: str):
+    """Acquire a concurrency slot, recording how long the caller waited for it."""
+    started = time.perf_counter()
+    async with slots:
+        metrics.observe('queue_wait_seconds', {'queue': queue}, time.perf_counter() - started, 'Time waiting for a slot.')
+        yield
+
+
+def _labels(key: tuple, **extra) -> str:
+    items = [*key, *extra.items()]
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in items) + '}'
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -1,7 +1,14 @@
 from pydantic import BaseModel
 
 class AuditOut(BaseModel):
+    id: int
     trace_id: str
     actor: str
     action: str
+    input_meta: dict | None = None
+    output_meta: dict | None = None
     created_at: str
+
+class AuditPageOut(BaseModel):
+    items: list[AuditOut]
+    next_cursor: int | None = None
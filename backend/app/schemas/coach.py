@@ -3,3 +3,5 @@ from pydantic import BaseModel
 class CoachGenerateOut(BaseModel):
     script_text: str
     audio_path: str
+    message_id: int | None = None
+    audio_url: str | None = None
@@ -4,3 +4,6 @@ class FeedbackIn(BaseModel):
     trace_id: str
     rating: str
     comment: str | None = None
+
+class FeedbackOut(BaseModel):
+    status: str
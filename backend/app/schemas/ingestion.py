@@ -13,4 +13,11 @@ class DocumentDetailOut(BaseModel):
     document_id: int
     mime_type: str
     has_text: bool
+    char_count: int = 0
     text_preview: str | None = None
+
+class DocumentTextOut(BaseModel):
+    document_id: int
+    mime_type: str
+    char_count: int
+    extracted_text: str | None = None
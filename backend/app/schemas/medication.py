@@ -1,13 +1,58 @@
-from pydantic import BaseModel, Field
+from datetime import datetime, time
+from pydantic import BaseModel, Field, field_validator
 
 class MedicationPlanIn(BaseModel):
     plan: dict
 
+    @field_validator('plan')
+    @classmethod
+    def check_schedule_fields(cls, plan: dict) -> dict:
+        """Reject values build_schedule can't read, so they 422 instead of failing mid-insert."""
+        meds = plan.get('medications') or []
+        if not isinstance(meds, list) or not all(isinstance(med, dict) for med in meds):
+            raise ValueError('medications must be a list of objects')
+        for med in meds:
+            times = med.get('times') or []
+            if not isinstance(times, list):
+                raise ValueError(f"times for {med.get('name')!r} must be a list of HH:MM strings")
+            for value in times:
+                try:
+                    time.fromisoformat(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"invalid time {value!r} for {med.get('name')!r}; use HH:MM (24-hour)") from None
+        duration = plan.get('duration_days')
+        if duration not in (None, '') and not (isinstance(duration, int) or str(duration).isdigit()):
+            raise ValueError('duration_days must be a whole number of days')
+        return plan
+
+class MedicationPlanOut(BaseModel):
+    plan_id: int
+    plan: dict
+    start_date: str
+    materialized_until: str | None = None
+    doses_scheduled: int = 0
+
+class DoseOut(BaseModel):
+    dose_id: int
+    med_name: str
+    dose: str
+    due_at: datetime
+    status: str
+
+class ActivePlanOut(BaseModel):
+    active: MedicationPlanOut | None = None
+
+class DosesTodayOut(BaseModel):
+    doses: list[DoseOut]
+
 class DoseLogIn(BaseModel):
     action: str
-    timestamp: str
+    timestamp: datetime
     note: str | None = None
 
+class DoseLogOut(BaseModel):
+    status: str
+
 class AdherenceOut(BaseModel):
     taken: int
     missed: int
@@ -6,3 +6,5 @@ class PrescriptionIn(BaseModel):
 class StructuredPrescription(BaseModel):
     medications: list[dict]
     clarifications: list[str] = Field(default_factory=list)
+    # Lowest per-line score when the local sig parser read every line; None once the LLM was involved.
+    confidence: float | None = None
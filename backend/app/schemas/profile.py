@@ -6,4 +6,8 @@ class PatientProfile(BaseModel):
     medications: list[dict] = Field(default_factory=list)
     vitals: dict = Field(default_factory=dict)
     timeline: list[str] = Field(default_factory=list)
+    # Questionnaire answers for fields outside this schema (e.g. smoking_status).
+    additional_info: dict = Field(default_factory=dict)
+    # Fields the patient answered in the questionnaire, including explicit "none" answers.
+    answered_fields: list[str] = Field(default_factory=list)
     missing_fields: list[str] = Field(default_factory=list)
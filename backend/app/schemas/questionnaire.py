@@ -1,7 +1,21 @@
+from typing import Any
 from pydantic import BaseModel, Field
 
 class QuestionnaireNext(BaseModel):
     questions: list[str] = Field(default_factory=list)
+    fields: list[str] = Field(default_factory=list)
 
 class QuestionnaireAnswer(BaseModel):
     answers: dict
+
+class ProfileFieldChange(BaseModel):
+    field: str
+    before: Any = None
+    after: Any = None
+
+class QuestionnaireAnswerOut(BaseModel):
+    patient_id: int
+    version: int
+    changes: list[ProfileFieldChange] = Field(default_factory=list)
+    missing_fields: list[str] = Field(default_factory=list)
+    created_at: str | None = None
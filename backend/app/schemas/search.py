@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+class SearchHitOut(BaseModel):
+    kind: str
+    ref_id: int
+    patient_id: int
+    snippet: str
+    score: float
+
+class SearchPageOut(BaseModel):
+    items: list[SearchHitOut]
+    next_offset: int | None = None
@@ -0,0 +1,66 @@
+from __future__ import annotations
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.upsert import dialect_insert
+from app.models.medication import AdherenceDaily, DoseLog, DoseSchedule, MedicationPlan
+from app.utils.time import utc_now
+
+ACTIONS = ('taken', 'missed', 'skipped')
+
+class AdherenceService:
+    async def record(self, session: AsyncSession, patient_id: int, day: date, action: str, previous: str | None = None, count: int = 1) -> None:
+        """Move `count` doses from their previous status bucket to `action` in the daily rollup."""
+        if action == previous:
+            return
+        delta = {name: 0 for name in ACTIONS}
+        if action in delta:
+            delta[action] += count
+        if previous in delta:
+            delta[previous] -= count
+        stmt = dialect_insert(session)(AdherenceDaily).values(patient_id=patient_id, day=day, **delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['patient_id', 'day'],
+            set_={name: getattr(AdherenceDaily, name) + getattr(stmt.excluded, name) for name in ACTIONS},
+        )
+        await session.execute(stmt)
+
+    async def stats(self, session: AsyncSession, patient_id: int, days: int) -> dict:
+        since = utc_now().date() - timedelta(days=max(days, 1) - 1)
+        result = await session.execute(
+            select(*(func.coalesce(func.sum(getattr(AdherenceDaily, name)), 0) for name in ACTIONS))
+            .where(AdherenceDaily.patient_id == patient_id, AdherenceDaily.day >= since)
+        )
+        return dict(zip(ACTIONS, (int(v) for v in result.one())))
+
+    async def counts_for_doses(self, session: AsyncSession, dose_ids: list[int]) -> dict:
+        counts = {name: 0 for name in ACTIONS}
+        if not dose_ids:
+            return counts
+        result = await session.execute(
+            select(DoseLog.action, func.count())
+            .where(DoseLog.dose_id.in_(dose_ids), DoseLog.action.in_(ACTIONS))
+            .group_by(DoseLog.action)
+        )
+        counts.update({action: count for action, count in result.all()})
+        return counts
+
+    async def rebuild(self, session: AsyncSession, patient_id: int) -> None:
+        """Recompute a patient's rollup from dose statuses (backfill/repair)."""
+        day = func.date(DoseSchedule.due_at)
+        result = await session.execute(
+            select(day, DoseSchedule.status, func.count())
+            .join(MedicationPlan, MedicationPlan.id == DoseSchedule.plan_id)
+            .where(MedicationPlan.patient_id == patient_id, DoseSchedule.status.in_(ACTIONS))
+            .group_by(day, DoseSchedule.status)
+        )
+        rows: dict[str, dict] = {}
+        for day_value, status, count in result.all():
+            key = str(day_value)
+            rows.setdefault(key, {'patient_id': patient_id, 'day': date.fromisoformat(key), **{name: 0 for name in ACTIONS}})
+            rows[key][status] = count
+        await session.execute(delete(AdherenceDaily).where(AdherenceDaily.patient_id == patient_id))
+        if rows:
+            await session.execute(insert(AdherenceDaily), list(rows.values()))
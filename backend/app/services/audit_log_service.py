@@ -1,4 +1,21 @@
-from app.utils.masking import mask_phi
+from __future__ import annotations
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from app.core.logging import get_logger
+from app.db.session import SessionLocal
+from app.models.audit import AuditLog
+from app.orchestration.tracing import metrics
+from app.utils.masking import mask_json
+
+logger = get_logger(__name__)
+
+QUEUE_MAX = 10_000
+BATCH_SIZE = 500
+FLUSH_SECONDS = 1.0
+_STOP = object()
 
 class AuditLogService:
     def build(self, trace_id: str, patient_id: int | None, actor: str, action: str, input_meta: dict | None, output_meta: dict | None) -> dict:
@@ -7,6 +24,111 @@ class AuditLogService:
             'patient_id': patient_id,
             'actor': actor,
             'action': action,
-            'input_meta_json': mask_phi(str(input_meta)) if input_meta else None,
-            'output_meta_json': mask_phi(str(output_meta)) if output_meta else None,
+            'input_meta_json': mask_json(input_meta) if input_meta else None,
+            'output_meta_json': mask_json(output_meta) if output_meta else None,
         }
+
+
+class AuditSink:
+    """Bounded in-memory queue of audit rows, batch-inserted by a background task.
+
+    Async callers wait for room when the queue is full. Sync code never waits: on
+    the loop thread, or handed to the loop from worker threads, entries that don't
+    fit are dropped (and counted) instead of stalling requests or pool threads.
+    """
+
+    def __init__(self, session_factory=SessionLocal, maxsize: int = QUEUE_MAX) -> None:
+        self.session_factory = session_factory
+        self.maxsize = maxsize
+        self._queue: asyncio.Queue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._task = asyncio.create_task(self._run())
+
+    async def emit(self, entry: dict) -> None:
+        if self._queue is None:
+            return
+        await self._queue.put(_stamped(entry))
+
+    def emit_nowait(self, entry: dict) -> None:
+        """Queue an entry from sync code on any thread."""
+        if self._queue is None or self._loop is None or not self._loop.is_running():
+            return
+        entry = _stamped(entry)
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._put_or_drop(entry)
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._put_or_drop, entry)
+        except RuntimeError:
+            # The loop closed after the is_running() check.
+            self._dropped(entry)
+
+    async def close(self) -> None:
+        """Let the worker write everything still queued, then stop it."""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        self._queue = None
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _run(self) -> None:
+        while True:
+            first = await self._queue.get()
+            if first is not _STOP and self._queue.qsize() < BATCH_SIZE:
+                await asyncio.sleep(FLUSH_SECONDS)
+            rows = [first, *self._drain(BATCH_SIZE - 1)]
+            stopping = any(row is _STOP for row in rows)
+            await self._flush([row for row in rows if row is not _STOP])
+            if stopping:
+                while not self._queue.empty():
+                    await self._flush(self._drain(BATCH_SIZE))
+                return
+
+    def _drain(self, limit: int) -> list[dict]:
+        rows = []
+        while len(rows) < limit and not self._queue.empty():
+            rows.append(self._queue.get_nowait())
+        return rows
+
+    async def _flush(self, rows: list[dict]) -> None:
+        if not rows:
+            return
+        try:
+            async with self.session_factory() as session:
+                await session.execute(insert(AuditLog), rows)
+                await session.commit()
+        except Exception:
+            metrics.inc('audit_rows_failed_total', {}, len(rows), 'Audit rows that failed to insert.')
+            logger.exception('audit batch insert failed', extra={'rows': len(rows)})
+            return
+        metrics.inc('audit_rows_written_total', {}, len(rows), 'Audit rows inserted.')
+
+    def _put_or_drop(self, entry: dict) -> None:
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self._dropped(entry)
+
+    def _dropped(self, entry: dict) -> None:
+        metrics.inc('audit_rows_dropped_total', {}, help='Audit rows dropped because the queue was full.')
+        logger.warning('audit queue full; dropping entry', extra={'action': entry.get('action')})
+
+
+def _stamped(entry: dict) -> dict:
+    return {**entry, 'created_at': entry.get('created_at') or datetime.utcnow()}
+
+
+audit_sink = AuditSink()
@@ -0,0 +1,206 @@
+"""Chunked retrieval context for the summary and pre-intelligence agents.
+
+Document and transcript text is split into ~800-char chunks at ingestion and
+each chunk gets a hashed TF vector (signed feature hashing over unigrams and
+bigrams, sublinear tf, L2-normalised). Vectors are written once into a flat
+float32 file under UPLOAD_DIR/vectors at row `chunk.id`, after the transaction
+that created the chunk commits, so retrieval is a memory-mapped gather plus one
+matrix-vector product per request.
+
+Writing vectors only needs the stdlib; retrieval needs numpy, imported on first
+use. Without numpy, callers fall back to the newest documents.
+"""
+from __future__ import annotations
+import asyncio
+import functools
+import math
+import os
+import re
+import zlib
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import delete, event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.context import ContextChunk
+
+DIM = 1024
+ROW_BYTES = DIM * 4
+CHUNK_CHARS = 800
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+SENTENCE_RE = re.compile(r'(?<=[.!?])\s+|\n\s*\n')
+# Session.info key for (chunk id, vector bytes) waiting on the transaction to commit.
+PENDING_KEY = 'context_vectors'
+# Vectorising a long document is pure-Python work; keep it off the event loop.
+_executor = ThreadPoolExecutor(max_workers=settings.CONTEXT_INDEX_WORKERS, thread_name_prefix='context-index')
+
+
+def chunk_text(text: str, size: int = CHUNK_CHARS) -> list[str]:
+    """Pack sentences/paragraphs into chunks of at most `size` chars; overlong sentences are hard-split."""
+    chunks: list[str] = []
+    current = ''
+    for piece in SENTENCE_RE.split(text or ''):
+        piece = ' '.join(piece.split())
+        if not piece:
+            continue
+        while len(piece) > size:
+            if current:
+                chunks.append(current)
+                current = ''
+            chunks.append(piece[:size])
+            piece = piece[size:]
+        if current and len(current) + 1 + len(piece) > size:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f'{current} {piece}' if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def vectorize(text: str) -> array:
+    """Signed hashed TF vector (float32, length DIM, unit norm unless empty)."""
+    tokens = TOKEN_RE.findall(text.lower())
+    features = Counter(tokens)
+    features.update(f'{a} {b}' for a, b in zip(tokens, tokens[1:]))
+    vec = array('f', bytes(ROW_BYTES))
+    for feature, tf in features.items():
+        h = zlib.crc32(feature.encode('utf-8'))
+        weight = 1.0 + math.log(tf)
+        vec[h % DIM] += -weight if h & 0x80000000 else weight
+    norm = math.sqrt(sum(v * v for v in vec))
+    if norm:
+        for i, v in enumerate(vec):
+            if v:
+                vec[i] = v / norm
+    return vec
+
+
+@functools.cache
+def _numpy():
+    try:
+        import numpy
+    except Exception:  # pragma: no cover - optional dependency
+        return None
+    return numpy
+
+
+def top_k(matrix, query, k: int) -> list[int]:
+    """Row indexes of the k best cosine matches, best first. Rows and query are unit vectors."""
+    np = _numpy()
+    scores = matrix @ query
+    k = min(k, len(scores))
+    if k <= 0:
+        return []
+    best = np.argpartition(-scores, k - 1)[:k]
+    return [int(i) for i in best[np.argsort(-scores[best], kind='stable')] if scores[i] > 0]
+
+
+def vector_path() -> str:
+    return os.path.join(settings.UPLOAD_DIR, 'vectors', 'chunks.f32')
+
+
+def _vectorize_all(texts: list[str]) -> list[bytes]:
+    return [vectorize(text).tobytes() for text in texts]
+
+
+def _pending_vectors(session: AsyncSession) -> list[tuple[int, bytes]]:
+    sync_session = session.sync_session
+    pending = sync_session.info.get(PENDING_KEY)
+    if pending is None:
+        pending = sync_session.info[PENDING_KEY] = []
+        event.listen(sync_session, 'after_commit', _write_pending)
+        event.listen(sync_session, 'after_rollback', _discard_pending)
+    return pending
+
+
+def write_vectors(vectors: list[tuple[int, bytes]]) -> None:
+    """Write (chunk id, vector bytes) pairs into the vector file."""
+    if not vectors:
+        return
+    path = vector_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        # Rows are addressed by committed chunk id, so concurrent writers never overlap.
+        for chunk_id, vector in vectors:
+            os.pwrite(fd, vector, chunk_id * ROW_BYTES)
+    finally:
+        os.close(fd)
+
+
+def _write_pending(session: Session) -> None:
+    pending = session.info[PENDING_KEY]
+    try:
+        write_vectors(pending)
+    finally:
+        pending.clear()
+
+
+def _discard_pending(session: Session) -> None:
+    session.info[PENDING_KEY].clear()
+
+
+class ContextStore:
+    """Chunk, embed and retrieve patient text."""
+
+    async def index(self, session: AsyncSession, kind: str, ref_id: int, patient_id: int, body: str | None) -> None:
+        """Replace the chunks for one document/transcript. Runs in the caller's transaction.
+
+        Vectors are written when that transaction commits and dropped if it rolls back.
+        """
+        await session.execute(delete(ContextChunk).where(ContextChunk.kind == kind, ContextChunk.ref_id == ref_id))
+        pieces = chunk_text(body or '')
+        if not pieces:
+            return
+        rows = [ContextChunk(patient_id=patient_id, kind=kind, ref_id=ref_id, ordinal=i, text=p) for i, p in enumerate(pieces)]
+        session.add_all(rows)
+        await session.flush()
+        vectors = await asyncio.get_running_loop().run_in_executor(_executor, _vectorize_all, pieces)
+        _pending_vectors(session).extend(zip((row.id for row in rows), vectors))
+
+    async def retrieve(self, session: AsyncSession, patient_id: int, query: str, k: int | None = None, char_budget: int | None = None) -> list[str] | None:
+        """Best-matching chunks for `query`, packed into the char budget.
+
+        Returns None when retrieval isn't possible (no numpy, no chunks or an
+        empty query) so the caller can use its fallback.
+        """
+        np = _numpy()
+        if np is None or not TOKEN_RE.search(query or ''):
+            return None
+        chunks = (await session.execute(
+            select(ContextChunk.id, ContextChunk.text).where(ContextChunk.patient_id == patient_id)
+        )).all()
+        path = vector_path()
+        if not chunks or not os.path.exists(path) or os.path.getsize(path) < ROW_BYTES:
+            return None
+        stored = np.memmap(path, dtype=np.float32, mode='r')
+        stored = stored[:stored.size - stored.size % DIM].reshape(-1, DIM)
+        ids = np.array([c.id for c in chunks])
+        present = ids < len(stored)
+        if not present.any():
+            return None
+        chunks = [c for c, ok in zip(chunks, present) if ok]
+        matrix = np.asarray(stored[ids[present]])
+        # Re-weight by IDF over this patient's chunks so boilerplate repeated across pages counts less.
+        df = np.count_nonzero(matrix, axis=0)
+        idf = np.log((1 + len(matrix)) / (1 + df)) + 1.0
+        matrix = matrix * idf
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        q = np.frombuffer(vectorize(query).tobytes(), dtype=np.float32) * idf
+        q /= max(float(np.linalg.norm(q)), 1e-12)
+        budget = char_budget if char_budget is not None else settings.CONTEXT_CHAR_BUDGET
+        selected: list[str] = []
+        used = 0
+        for i in top_k(matrix, q, k or settings.CONTEXT_TOP_K):
+            text = chunks[i].text
+            if used + len(text) > budget:
+                continue
+            selected.append(text)
+            used += len(text)
+        return selected
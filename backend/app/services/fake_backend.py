@@ -0,0 +1,189 @@
+"""Deterministic stand-ins for OpenAI and NVIDIA NIM OCR, for offline load testing.
+
+Select with LLM_BACKEND=fake. Outputs depend only on FAKE_BACKEND_SEED and the
+request, so repeated runs produce the same data; latency and injected errors are
+drawn from the same per-request generator. Run the OCR stand-in with
+`uvicorn app.services.fake_backend:ocr_app --port 9002` and point
+NVIDIA_NIM_PAGE_ELEMENTS_URL at it.
+"""
+from __future__ import annotations
+import hashlib
+import random
+import time
+from typing import Any, Iterator
+
+from fastapi import Body, FastAPI
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.orchestration.tracing import LLMSpan, llm_span
+
+WORDS = (
+    'patient', 'reports', 'mild', 'chest', 'pain', 'since', 'yesterday', 'no', 'fever',
+    'history', 'of', 'hypertension', 'diabetes', 'takes', 'metformin', 'daily', 'follow', 'up',
+    'advised', 'rest', 'fluids', 'cardiology', 'review', 'stable', 'vitals', 'normal',
+)
+STRING_HINTS = {
+    'level': ('GREEN', 'AMBER', 'RED'),
+    'urgency': ('GREEN', 'AMBER', 'RED'),
+    'specialty_needed': ('cardiology', 'general medicine', 'orthopedics', 'neurology'),
+    'frequency': ('once daily', 'twice daily', 'three times daily', 'at night'),
+    'dose': ('5mg', '10mg', '500mg', '1g'),
+    'route': ('oral',),
+}
+FAKE_MP3_FRAME = b'\xff\xfb\x90\x64' + b'\x00' * 413
+
+
+class FakeBackendError(RuntimeError):
+    pass
+
+
+class FakeOpenAIClient:
+    """Drop-in for OpenAIClient that returns synthetic, schema-valid data."""
+
+    def generate_json(self, schema: type[BaseModel], prompt: str, input_data: str, model: str | None = None) -> BaseModel:
+        with llm_span('fake', 'json') as span:
+            rng = _request_rng('json', schema.__name__, prompt, input_data)
+            json_schema = schema.model_json_schema()
+            data = synthesize(json_schema, rng, json_schema.get('$defs', {}))
+            _estimate_usage(span, prompt + input_data, str(data))
+        return schema.model_validate(data)
+
+    def generate_text(self, prompt: str, input_data: str, model: str | None = None) -> str:
+        with llm_span('fake', 'text') as span:
+            rng = _request_rng('text', prompt, input_data)
+            text = _sentences(rng, rng.randint(3, 6))
+            _estimate_usage(span, prompt + input_data, text)
+        return text
+
+    def transcribe_audio(self, file_path: str) -> str:
+        return ' '.join(seg['text'] for seg in self.transcribe_segments(file_path))
+
+    def transcribe_segments(self, file_path: str) -> list[dict]:
+        with llm_span('fake', 'stt'):
+            rng = _request_rng('stt', _file_digest(file_path))
+        segments, start = [], 0.0
+        for _ in range(rng.randint(2, 5)):
+            end = start + rng.uniform(2.0, 8.0)
+            segments.append({'start': round(start, 3), 'end': round(end, 3), 'text': _sentences(rng, 1)})
+            start = end
+        return segments
+
+    def tts_stream(self, text: str, voice: str) -> Iterator[bytes]:
+        with llm_span('fake', 'tts'):
+            _request_rng('tts', voice, text)
+        # Roughly one 26ms MP3 frame per character keeps file sizes proportional to real output.
+        frames = max(1, len(text))
+        for i in range(0, frames, 64):
+            yield FAKE_MP3_FRAME * min(64, frames - i)
+
+    def tts(self, text: str, voice: str, output_path: str) -> str:
+        with open(output_path, 'wb') as f:
+            for chunk in self.tts_stream(text, voice):
+                f.write(chunk)
+        return output_path
+
+
+def synthesize(schema: dict, rng: random.Random, defs: dict, name: str = '') -> Any:
+    """Build a value satisfying a (pydantic-generated) JSON schema."""
+    if '$ref' in schema:
+        return synthesize(defs[schema['$ref'].rsplit('/', 1)[-1]], rng, defs, name)
+    for key in ('anyOf', 'oneOf'):
+        if key in schema:
+            options = [s for s in schema[key] if s.get('type') != 'null'] or schema[key]
+            return synthesize(options[0], rng, defs, name)
+    if 'allOf' in schema:
+        return synthesize(schema['allOf'][0], rng, defs, name)
+    if 'enum' in schema:
+        return rng.choice(schema['enum'])
+    if 'const' in schema:
+        return schema['const']
+    kind = schema.get('type')
+    if kind == 'object' or 'properties' in schema:
+        props = schema.get('properties', {})
+        if not props:
+            return {w: _sentences(rng, 1) for w in rng.sample(WORDS, 2)} if name != 'vitals' else {'bp': '120/80', 'hr': 72}
+        return {key: synthesize(sub, rng, defs, key) for key, sub in props.items()}
+    if kind == 'array':
+        item = schema.get('items', {'type': 'string'})
+        if name in ('missing_fields', 'answered_fields'):
+            return []
+        if name == 'medications' and not item.get('properties') and '$ref' not in item:
+            return [
+                {'name': rng.choice(('metformin', 'amlodipine', 'atorvastatin')), 'dose': rng.choice(STRING_HINTS['dose']),
+                 'frequency': rng.choice(STRING_HINTS['frequency']), 'route': 'oral'}
+                for _ in range(rng.randint(1, 3))
+            ]
+        return [synthesize(item, rng, defs, name) for _ in range(rng.randint(1, 3))]
+    if kind == 'integer':
+        return rng.randint(schema.get('minimum', 0), schema.get('maximum', 100))
+    if kind == 'number':
+        return round(rng.uniform(schema.get('minimum', 0.0), schema.get('maximum', 1.0)), 3)
+    if kind == 'boolean':
+        return rng.random() < 0.5
+    if schema.get('format') == 'date-time':
+        return f"2026-01-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z"
+    if schema.get('format') == 'date':
+        return f"2026-01-{rng.randint(1, 28):02d}"
+    if name in STRING_HINTS:
+        return rng.choice(STRING_HINTS[name])
+    return _sentences(rng, 1)
+
+
+def fake_ocr_payload(image_url: str) -> dict:
+    rng = _request_rng('ocr', image_url)
+    detections = []
+    for row in range(rng.randint(5, 15)):
+        y = 0.05 + row * 0.06
+        detections.append({
+            'text_prediction': {'text': _sentences(rng, 1), 'confidence': round(rng.uniform(0.8, 1.0), 3)},
+            'bounding_box': {'points': [{'x': 0.1, 'y': y}, {'x': 0.9, 'y': y}, {'x': 0.9, 'y': y + 0.04}, {'x': 0.1, 'y': y + 0.04}]},
+        })
+    return {'data': [{'index': 0, 'text_detections': detections}]}
+
+
+def _request_rng(*parts: str) -> random.Random:
+    digest = hashlib.sha256('\0'.join((str(settings.FAKE_BACKEND_SEED), *parts)).encode('utf-8')).digest()
+    rng = random.Random(digest)
+    _simulate(random.Random(digest[::-1]))
+    return rng
+
+
+def _simulate(rng: random.Random) -> None:
+    mean = settings.FAKE_BACKEND_LATENCY_MS
+    jitter = settings.FAKE_BACKEND_LATENCY_JITTER_MS
+    delay_ms = max(0.0, rng.gauss(mean, jitter)) if jitter else mean
+    if delay_ms:
+        time.sleep(delay_ms / 1000)
+    if rng.random() < settings.FAKE_BACKEND_ERROR_RATE:
+        raise FakeBackendError('injected fake backend failure')
+
+
+def _estimate_usage(span: LLMSpan, prompt: str, output: str) -> None:
+    # ~4 characters per token, close enough to exercise the token/cost metrics.
+    span.input_tokens += len(prompt) // 4
+    span.output_tokens += len(output) // 4
+
+
+def _sentences(rng: random.Random, count: int) -> str:
+    return ' '.join(
+        ' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 12))).capitalize() + '.'
+        for _ in range(count)
+    )
+
+
+def _file_digest(file_path: str) -> str:
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+ocr_app = FastAPI(title='Fake NVIDIA NIM OCR')
+
+
+@ocr_app.post('/{path:path}')
+def fake_ocr(path: str, payload: dict = Body(...)) -> dict:
+    items = payload.get('input') or [{}]
+    return fake_ocr_payload(str(items[0].get('url', '')))
@@ -1,6 +1,5 @@
 from __future__ import annotations
 from typing import Any
-import httpx
 import json
 from pathlib import Path
 
@@ -11,6 +10,8 @@ class HospitalMCPService:
         self.base_url = settings.MCP_HOSPITAL_BASE_URL.rstrip('/')
 
     async def search(self, location: str, radius_km: int, specialty_needed: str | None, urgency: str) -> list[dict]:
+        import httpx
+
         try:
             async with httpx.AsyncClient() as client:
                 resp = await client.post(f"{self.base_url}/search", json={
@@ -27,6 +28,8 @@ class HospitalMCPService:
             return data.get('hospitals', [])
 
     async def capabilities(self, hospital_id: str) -> dict:
+        import httpx
+
         async with httpx.AsyncClient() as client:
             resp = await client.get(f"{self.base_url}/capabilities/{hospital_id}")
             resp.raise_for_status()
@@ -1,10 +1,8 @@
 import base64
 import io
 
-import requests
-import fitz  # PyMuPDF
-from PIL import Image
-
+# PyMuPDF, Pillow and requests are imported where they're used: they cost a
+# large share of API cold start and most requests never touch them.
 from app.utils.files import save_upload
 from app.core.logging import get_logger
 from app.core.config import settings
@@ -40,6 +38,8 @@ class DocumentIngestionService:
         return None
 
     def _extract_pdf_text(self, content: bytes) -> str | None:
+        import fitz  # PyMuPDF
+
         try:
             doc = fitz.open(stream=content, filetype='pdf')
         except Exception:
@@ -89,6 +89,8 @@ class DocumentIngestionService:
             "Authorization": f"Bearer {settings.NVIDIA_NIM_API_KEY}",
             "Accept": "application/json",
         }
+        import requests
+
         try:
             response = requests.post(settings.NVIDIA_NIM_PAGE_ELEMENTS_URL, headers=headers, json=payload, timeout=30)
             response.raise_for_status()
@@ -100,6 +102,8 @@ class DocumentIngestionService:
         return _extract_text_from_nvidia_response(response_payload)
 
 def _image_bytes_to_data_url(content: bytes) -> str | None:
+    from PIL import Image
+
     try:
         image = Image.open(io.BytesIO(content))
     except Exception:
@@ -0,0 +1,232 @@
+from __future__ import annotations
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+TOKEN_RE = re.compile(r'[a-z0-9]+(?:-[a-z0-9]+)*')
+DOSE_RE = re.compile(r'\b(\d+(?:\.\d+)?)\s*(mg|mcg|g|ml|iu|units?)\b', re.IGNORECASE)
+FREQUENCY_PATTERNS = [
+    (re.compile(r'\bq\s?(\d+)\s?h\b', re.IGNORECASE), 'every {}h'),
+    (re.compile(r'\b(?:qid|four times (?:a )?day)\b', re.IGNORECASE), 'four times daily'),
+    (re.compile(r'\b(?:tds|tid|thrice daily|three times (?:a )?day)\b', re.IGNORECASE), 'three times daily'),
+    (re.compile(r'\b(?:bd|bid|twice daily|twice a day)\b', re.IGNORECASE), 'twice daily'),
+    (re.compile(r'\b(?:od|qd|once daily|once a day|daily)\b', re.IGNORECASE), 'once daily'),
+    (re.compile(r'\b(?:hs|qhs|at night|at bedtime)\b', re.IGNORECASE), 'at night'),
+    (re.compile(r'\b(?:prn|sos|as needed)\b', re.IGNORECASE), 'as needed'),
+]
+ROUTES = {
+    'po': 'oral',
+    'oral': 'oral',
+    'orally': 'oral',
+    'iv': 'intravenous',
+    'im': 'intramuscular',
+    'sc': 'subcutaneous',
+    'subcut': 'subcutaneous',
+    'sl': 'sublingual',
+    'topical': 'topical',
+    'inhaled': 'inhaled',
+    'inhaler': 'inhaled',
+}
+# Dosage forms that mark a line as a medication even without a strength or sig.
+FORM_RE = re.compile(r'\b(?:tab|tabs|tablets?|caps?|capsules?|syp|syrup|susp|inj|injection|drops?|inhaler|ointment|cream|sachet)\b', re.IGNORECASE)
+FUZZY_MIN_LENGTH = 5
+_END = '$'
+
+
+class MedicationNormalizerService:
+    """Dictionary-backed medication extraction so MedReconAgent only sees leftovers."""
+
+    def __init__(self) -> None:
+        self.index = _load_index()
+
+    def canonical(self, name: str | None) -> str | None:
+        if not name:
+            return None
+        tokens = TOKEN_RE.findall(name.lower())
+        if not tokens:
+            return None
+        generic, length = self.index.longest_match(tokens, 0)
+        if generic is not None and length == len(tokens):
+            return generic
+        if len(tokens) == 1:
+            return self.index.fuzzy(tokens[0])
+        return None
+
+    def extract(self, text: str) -> tuple[list[dict], list[str]]:
+        """Return (medications, unresolved_lines) found in free text.
+
+        Unresolved lines look like a medication (a dose, a sig or a dosage form)
+        but name no known one; they are the only spans worth sending to the LLM.
+        """
+        found: list[dict] = []
+        unresolved: list[str] = []
+        for line in text.splitlines():
+            lowered = line.lower()
+            med_like = (
+                DOSE_RE.search(line) is not None
+                or FORM_RE.search(line) is not None
+                or any(pattern.search(line) for pattern, _ in FREQUENCY_PATTERNS)
+            )
+            mentions = self._mentions(lowered, fuzzy=med_like)
+            if not mentions:
+                if med_like:
+                    unresolved.append(line.strip())
+                continue
+            for i, (generic, start) in enumerate(mentions):
+                start = 0 if i == 0 else start
+                end = mentions[i + 1][1] if i + 1 < len(mentions) else len(line)
+                found.append(_with_sig(generic, line[start:end]))
+        return self.merge(found, []), unresolved
+
+    def merge(self, meds: list[dict], extra: list[dict]) -> list[dict]:
+        """Dedupe by generic name, filling gaps; entries whose dose/frequency/route disagree are kept apart."""
+        merged: list[dict] = []
+        for med in [*meds, *extra]:
+            raw_name = str(med.get('name') or '').strip()
+            if not raw_name:
+                continue
+            name = self.canonical(raw_name) or raw_name.lower()
+            current = next((m for m in merged if m['name'] == name and not _conflicts(m, med)), None)
+            if current is None:
+                current = {'name': name, 'dose': None, 'frequency': None, 'route': None}
+                merged.append(current)
+            for key, value in med.items():
+                if key != 'name' and value and not current.get(key):
+                    current[key] = value
+        return merged
+
+    def _mentions(self, lowered: str, fuzzy: bool) -> list[tuple[str, int]]:
+        matches = list(TOKEN_RE.finditer(lowered))
+        tokens = [m.group(0) for m in matches]
+        mentions: list[tuple[str, int]] = []
+        i = 0
+        while i < len(tokens):
+            generic, length = self.index.longest_match(tokens, i)
+            if generic is None and fuzzy and tokens[i].isalpha():
+                generic, length = self.index.fuzzy(tokens[i]), 1
+            if generic is not None:
+                mentions.append((generic, matches[i].start()))
+                i += length
+            else:
+                i += 1
+        return mentions
+
+
+class _MedicationIndex:
+    def __init__(self, entries: list[dict]) -> None:
+        self.trie: dict = {}
+        self.bktree = _BKTree()
+        self.single_token: dict[str, str] = {}
+        for entry in entries:
+            generic = entry['generic'].lower()
+            for name in [generic, *entry.get('aliases', [])]:
+                tokens = TOKEN_RE.findall(name.lower())
+                if not tokens:
+                    continue
+                node = self.trie
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node[_END] = generic
+                if len(tokens) == 1 and len(tokens[0]) >= FUZZY_MIN_LENGTH:
+                    self.single_token[tokens[0]] = generic
+                    self.bktree.add(tokens[0])
+
+    def longest_match(self, tokens: list[str], start: int) -> tuple[str | None, int]:
+        node = self.trie
+        best: tuple[str | None, int] = (None, 0)
+        for offset, token in enumerate(tokens[start:], start=1):
+            node = node.get(token)
+            if node is None:
+                break
+            if _END in node:
+                best = (node[_END], offset)
+        return best
+
+    def fuzzy(self, token: str) -> str | None:
+        if len(token) < FUZZY_MIN_LENGTH:
+            return None
+        max_distance = 1 if len(token) < 8 else 2
+        candidates = self.bktree.search(token, max_distance)
+        if not candidates:
+            return None
+        distance, word = min(candidates)
+        return self.single_token[word]
+
+
+class _BKTree:
+    def __init__(self) -> None:
+        self.root: tuple[str, dict] | None = None
+
+    def add(self, word: str) -> None:
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node = self.root
+        while True:
+            distance = _edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int) -> list[tuple[int, str]]:
+        if self.root is None:
+            return []
+        found: list[tuple[int, str]] = []
+        stack = [self.root]
+        while stack:
+            candidate, children = stack.pop()
+            distance = _edit_distance(word, candidate)
+            if distance <= max_distance:
+                found.append((distance, candidate))
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return found
+
+
+def _edit_distance(a: str, b: str) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def _conflicts(current: dict, med: dict) -> bool:
+    return any(
+        current.get(key) and med.get(key) and str(current[key]).lower() != str(med[key]).lower()
+        for key in ('dose', 'frequency', 'route')
+    )
+
+
+def _with_sig(generic: str, segment: str) -> dict:
+    dose_match = DOSE_RE.search(segment)
+    frequency = None
+    for pattern, label in FREQUENCY_PATTERNS:
+        match = pattern.search(segment)
+        if match:
+            frequency = label.format(*match.groups())
+            break
+    route = next((ROUTES[t] for t in TOKEN_RE.findall(segment.lower()) if t in ROUTES), None)
+    return {
+        'name': generic,
+        'dose': f"{dose_match.group(1)}{dose_match.group(2).lower()}" if dose_match else None,
+        'frequency': frequency,
+        'route': route,
+    }
+
+
+@lru_cache(maxsize=1)
+def _load_index() -> _MedicationIndex:
+    path = Path(__file__).with_name('medication_dictionary.json')
+    data = json.loads(path.read_text())
+    return _MedicationIndex(data.get('medications', []))
@@ -1,22 +1,154 @@
 from __future__ import annotations
-from datetime import datetime, timedelta
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import SessionLocal
+from app.models.medication import MedicationPlan, DoseSchedule
+from app.services.reminder_scheduler_service import LEASE_SECONDS, reminder_scheduler
+
+logger = get_logger(__name__)
+
+EXTEND_THRESHOLD_DAYS = 7
+EXTEND_BATCH_SIZE = 200
 
 class MedicationTrackerService:
-    def build_schedule(self, plan_json: dict, days: int = 1) -> list[dict]:
+    def build_schedule(self, plan_json: dict, days: int = 1, start: date | None = None) -> list[dict]:
         schedule = []
-        start_date = plan_json.get('start_date')
         meds = plan_json.get('medications', [])
-        now = datetime.utcnow()
+        start = start or datetime.utcnow().date()
+        end = _plan_end_date(plan_json)
+        zone = _plan_zone(plan_json)
         for day in range(days):
-            base = now + timedelta(days=day)
+            base = start + timedelta(days=day)
+            if end is not None and base > end:
+                break
             for med in meds:
                 times = med.get('times') or ['08:00']
                 for t in times:
-                    due_at = f"{base.date().isoformat()}T{t}:00Z"
+                    local = datetime.combine(base, time.fromisoformat(t), tzinfo=zone)
+                    due_at = local.astimezone(timezone.utc)
                     schedule.append({
                         'med_name': med.get('name'),
-                        'dose': med.get('dose'),
+                        'dose': med.get('dose') or '',
                         'due_at': due_at,
                         'status': 'pending',
                     })
         return schedule
+
+    async def create_plan(self, session: AsyncSession, patient_id: int, plan_json: dict) -> tuple[MedicationPlan, list[dict]]:
+        await session.execute(
+            update(MedicationPlan)
+            .where(MedicationPlan.patient_id == patient_id, MedicationPlan.active == True)  # noqa: E712
+            .values(active=False)
+        )
+        plan = MedicationPlan(
+            patient_id=patient_id,
+            plan_json=plan_json,
+            active=True,
+            start_date=_plan_start_date(plan_json).isoformat(),
+        )
+        session.add(plan)
+        await session.flush()
+        scheduled = await self.materialize(session, plan, _window_end())
+        await session.commit()
+        return plan, scheduled
+
+    async def materialize(self, session: AsyncSession, plan: MedicationPlan, until: date) -> list[dict]:
+        """Insert dose rows for the days between the plan's watermark and `until`; returns their ids and due times."""
+        start = max(_plan_start_date(plan.plan_json), datetime.utcnow().date())
+        if plan.materialized_until:
+            start = max(start, date.fromisoformat(plan.materialized_until) + timedelta(days=1))
+        if start > until:
+            return []
+        doses = self.build_schedule(plan.plan_json, days=(until - start).days + 1, start=start)
+        inserted: list[dict] = []
+        if doses:
+            result = await session.execute(
+                insert(DoseSchedule).returning(DoseSchedule.id, DoseSchedule.due_at),
+                [{'plan_id': plan.id, **dose} for dose in doses],
+            )
+            inserted = [{'id': dose_id, 'due_at': due_at} for dose_id, due_at in result.all()]
+        plan.materialized_until = until.isoformat()
+        return inserted
+
+    async def extend_active_plans(self, session: AsyncSession) -> int:
+        horizon = _window_end()
+        threshold = (horizon - timedelta(days=EXTEND_THRESHOLD_DAYS)).isoformat()
+        scheduled = 0
+        last_id = 0
+        while True:
+            result = await session.execute(
+                select(MedicationPlan)
+                .where(
+                    MedicationPlan.active == True,  # noqa: E712
+                    MedicationPlan.id > last_id,
+                    or_(MedicationPlan.materialized_until.is_(None), MedicationPlan.materialized_until < threshold),
+                )
+                .order_by(MedicationPlan.id)
+                .limit(EXTEND_BATCH_SIZE)
+            )
+            plans = result.scalars().all()
+            if not plans:
+                return scheduled
+            for plan in plans:
+                scheduled += len(await self.materialize(session, plan, horizon))
+            await session.commit()
+            last_id = plans[-1].id
+
+
+async def run_schedule_extender() -> None:
+    """Keep every active plan materialized `SCHEDULE_WINDOW_DAYS` ahead.
+
+    Only the worker holding the reminder scheduler's lease extends, so multiple
+    workers never materialize the same days twice.
+    """
+    loop = asyncio.get_running_loop()
+    next_run = 0.0
+    while True:
+        if reminder_scheduler.is_leader and loop.time() >= next_run:
+            try:
+                async with SessionLocal() as session:
+                    scheduled = await MedicationTrackerService().extend_active_plans(session)
+                if scheduled:
+                    logger.info('dose schedules extended', extra={'doses': scheduled})
+            except Exception:
+                logger.exception('dose schedule extension failed')
+            next_run = loop.time() + settings.SCHEDULE_EXTEND_INTERVAL_SECONDS
+        elif not reminder_scheduler.is_leader:
+            next_run = 0.0
+        await asyncio.sleep(min(LEASE_SECONDS / 2, settings.SCHEDULE_EXTEND_INTERVAL_SECONDS))
+
+
+def _window_end() -> date:
+    return datetime.utcnow().date() + timedelta(days=settings.SCHEDULE_WINDOW_DAYS - 1)
+
+
+def _plan_zone(plan_json: dict) -> ZoneInfo | timezone:
+    try:
+        return ZoneInfo(plan_json.get('timezone') or 'UTC')
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def _plan_start_date(plan_json: dict) -> date:
+    try:
+        return date.fromisoformat(plan_json.get('start_date') or '')
+    except ValueError:
+        return datetime.utcnow().date()
+
+
+def _plan_end_date(plan_json: dict) -> date | None:
+    if plan_json.get('end_date'):
+        try:
+            return date.fromisoformat(plan_json['end_date'])
+        except ValueError:
+            return None
+    if plan_json.get('duration_days'):
+        return _plan_start_date(plan_json) + timedelta(days=int(plan_json['duration_days']) - 1)
+    return None
@@ -1,23 +1,24 @@
 from __future__ import annotations
-from typing import Any
+from typing import Any, Iterator
 import json
 import re
 from pydantic import BaseModel, ValidationError
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.orchestration.tracing import LLMSpan, llm_span
 from app.utils.json_schema import schema_from_model
 
 logger = get_logger(__name__)
 
-try:
-    from openai import OpenAI
-except Exception:  # pragma: no cover
-    OpenAI = None
+TTS_CHUNK_SIZE = 64 * 1024
 
 class OpenAIClient:
     def __init__(self) -> None:
-        if OpenAI is None:
+        # Imported on first client construction: the SDK's type modules take ~0.5s to load.
+        try:
+            from openai import OpenAI
+        except Exception:  # pragma: no cover
             self.client = None
         else:
             self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
@@ -33,80 +34,118 @@ class OpenAIClient:
             {'role': 'system', 'content': prompt},
             {'role': 'user', 'content': input_data},
         ]
-        try:
-            response = self.client.responses.create(
-                model=model_name,
-                input=messages,
-                response_format={"type": "json_schema", "json_schema": schema.model_json_schema()},
-            )
-            content = response.output_text
-        except TypeError:
-            schema_hint = schema_from_model(schema)
-            response = self.client.responses.create(
-                model=model_name,
-                input=[
-                    {'role': 'system', 'content': f"{prompt}\nReturn ONLY valid JSON matching this schema:\n{schema_hint}"},
-                    {'role': 'user', 'content': input_data},
-                ],
-            )
-            content = response.output_text
-        try:
-            return schema.model_validate_json(_extract_json_text(content))
-        except ValidationError:
-            # retry once with strict fix
+        with llm_span(model_name, 'json') as span:
             try:
-                fix = self.client.responses.create(
+                response = self._create(span, 'response_format',
                     model=model_name,
-                    input=[
-                        {'role': 'system', 'content': 'Fix to valid JSON only for the provided schema.'},
-                        {'role': 'user', 'content': content},
-                    ],
+                    input=messages,
                     response_format={"type": "json_schema", "json_schema": schema.model_json_schema()},
                 )
-                return schema.model_validate_json(_extract_json_text(fix.output_text))
+                content = response.output_text
             except TypeError:
                 schema_hint = schema_from_model(schema)
-                fix = self.client.responses.create(
+                response = self._create(span, 'schema_hint',
                     model=model_name,
                     input=[
-                        {'role': 'system', 'content': f"Fix to valid JSON only for the provided schema:\n{schema_hint}"},
-                        {'role': 'user', 'content': content},
+                        {'role': 'system', 'content': f"{prompt}\nReturn ONLY valid JSON matching this schema:\n{schema_hint}"},
+                        {'role': 'user', 'content': input_data},
                     ],
                 )
+                content = response.output_text
+            try:
+                return schema.model_validate_json(_extract_json_text(content))
+            except ValidationError:
+                # retry once with strict fix
                 try:
+                    fix = self._create(span, 'fix_response_format',
+                        model=model_name,
+                        input=[
+                            {'role': 'system', 'content': 'Fix to valid JSON only for the provided schema.'},
+                            {'role': 'user', 'content': content},
+                        ],
+                        response_format={"type": "json_schema", "json_schema": schema.model_json_schema()},
+                    )
                     return schema.model_validate_json(_extract_json_text(fix.output_text))
-                except ValidationError:
-                    return schema.model_validate({})
+                except TypeError:
+                    schema_hint = schema_from_model(schema)
+                    fix = self._create(span, 'fix_schema_hint',
+                        model=model_name,
+                        input=[
+                            {'role': 'system', 'content': f"Fix to valid JSON only for the provided schema:\n{schema_hint}"},
+                            {'role': 'user', 'content': content},
+                        ],
+                    )
+                    try:
+                        return schema.model_validate_json(_extract_json_text(fix.output_text))
+                    except ValidationError:
+                        span.path = 'empty_fallback'
+                        return schema.model_validate({})
 
     def generate_text(self, prompt: str, input_data: str, model: str | None = None) -> str:
         self._require()
         model_name = model or settings.OPENAI_MODEL_TEXT
-        response = self.client.responses.create(
-            model=model_name,
-            input=[{'role': 'system', 'content': prompt}, {'role': 'user', 'content': input_data}],
-        )
+        with llm_span(model_name, 'text') as span:
+            response = self._create(span, 'direct',
+                model=model_name,
+                input=[{'role': 'system', 'content': prompt}, {'role': 'user', 'content': input_data}],
+            )
         return response.output_text
 
     def transcribe_audio(self, file_path: str) -> str:
         self._require()
-        with open(file_path, 'rb') as f:
+        with llm_span(settings.OPENAI_MODEL_STT, 'stt'), open(file_path, 'rb') as f:
             resp = self.client.audio.transcriptions.create(
                 model=settings.OPENAI_MODEL_STT,
                 file=f,
             )
         return resp.text
 
-    def tts(self, text: str, voice: str, output_path: str) -> str:
+    def transcribe_segments(self, file_path: str) -> list[dict]:
+        """Transcribe with segment timestamps (seconds from the start of this file)."""
         self._require()
-        resp = self.client.audio.speech.create(
+        with llm_span(settings.OPENAI_MODEL_STT, 'stt'), open(file_path, 'rb') as f:
+            resp = self.client.audio.transcriptions.create(
+                model=settings.OPENAI_MODEL_STT,
+                file=f,
+                response_format='verbose_json',
+            )
+        segments = getattr(resp, 'segments', None) or []
+        if not segments:
+            return [{'start': 0.0, 'end': getattr(resp, 'duration', None), 'text': (resp.text or '').strip()}]
+        return [
+            {'start': float(seg.start), 'end': float(seg.end), 'text': seg.text.strip()}
+            for seg in segments
+        ]
+
+    def tts_stream(self, text: str, voice: str) -> Iterator[bytes]:
+        self._require()
+        with llm_span(settings.OPENAI_MODEL_TTS, 'tts'), self.client.audio.speech.with_streaming_response.create(
             model=settings.OPENAI_MODEL_TTS,
             voice=voice,
             input=text,
-        )
+        ) as resp:
+            yield from resp.iter_bytes(TTS_CHUNK_SIZE)
+
+    def tts(self, text: str, voice: str, output_path: str) -> str:
         with open(output_path, 'wb') as f:
-            f.write(resp.read())
+            for chunk in self.tts_stream(text, voice):
+                f.write(chunk)
         return output_path
 
+    def _create(self, span: LLMSpan, path: str, **kwargs: Any):
+        span.path = path
+        response = self.client.responses.create(**kwargs)
+        span.record_usage(response)
+        return response
+
+
+def get_llm_client():
+    """Return the configured LLM backend (LLM_BACKEND=openai|fake)."""
+    if settings.LLM_BACKEND == 'fake':
+        from app.services.fake_backend import FakeOpenAIClient
+        return FakeOpenAIClient()
+    return OpenAIClient()
+
 
 def _extract_json_text(text: str) -> str:
     # Attempt to find a JSON object/array inside the model response.
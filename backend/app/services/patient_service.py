@@ -5,7 +5,7 @@ from app.models.patient import Patient
 from app.models.account import Account
 from app.schemas.patient import PatientCreate
 from app.utils.masking import mask_phi
-from app.utils.passwords import hash_password, normalize_mobile
+from app.utils.passwords import hash_password_async, normalize_mobile
 
 async def create_patient_with_optional_account(
     payload: PatientCreate,
@@ -41,7 +41,7 @@ async def create_patient_with_optional_account(
         account = Account(
             role="patient",
             mobile=normalized_mobile,
-            password_hash=hash_password(payload.password or ""),
+            password_hash=await hash_password_async(payload.password or ""),
             patient_id=patient.id,
         )
         session.add(account)
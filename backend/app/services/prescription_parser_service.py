@@ -0,0 +1,232 @@
+from __future__ import annotations
+import re
+from functools import lru_cache
+
+from app.core.config import settings
+from app.services.medication_normalizer_service import (
+    DOSE_RE, FREQUENCY_PATTERNS, ROUTES, TOKEN_RE, MedicationNormalizerService,
+)
+
+BULLET_RE = re.compile(r'^\s*(?:\d+\s*[.)]|[-*•]|rx\b:?)\s*', re.IGNORECASE)
+# Morning-noon-night slots, e.g. 1-0-1 or 1-1-1-1 (½ and 0.5 allowed).
+SLOT_RE = re.compile(r'(?<![\w./-])((?:\d(?:\.5)?|½)(?:\s*-\s*(?:\d(?:\.5)?|½)){2,3})(?![\w./-])')
+DURATION_RE = re.compile(r'(?:\bx|×|\bfor)\s*(\d+)\s*(days?|d|weeks?|wks?|w|months?|mo)\b', re.IGNORECASE)
+# Clinical shorthand: 5/7 days, 2/52 weeks, 3/12 months.
+FRACTION_DURATION_RE = re.compile(r'(?<![\d.])(\d+)\s*/\s*(7|52|12)\b')
+AS_NEEDED_RE = next(pattern for pattern, label in FREQUENCY_PATTERNS if label == 'as needed')
+INSTRUCTIONS = [
+    (re.compile(r'\b(?:after (?:food|meals?)|pc)\b', re.IGNORECASE), 'after food'),
+    (re.compile(r'\b(?:before (?:food|meals?)|ac)\b', re.IGNORECASE), 'before food'),
+    (re.compile(r'\bempty stomach\b', re.IGNORECASE), 'on an empty stomach'),
+    (re.compile(r'\bwith (?:food|meals?)\b', re.IGNORECASE), 'with food'),
+]
+FORM_WORDS = {
+    'tab', 'tabs', 'tablet', 'tablets', 'cap', 'caps', 'capsule', 'capsules', 'syp', 'syrup', 'susp',
+    'inj', 'injection', 'oint', 'ointment', 'cream', 'gel', 'drop', 'drops', 'sachet', 'take',
+}
+# Sig-line glue that carries no extra instruction.
+FILLER_WORDS = {'x', 'for', 'take', 'to', 'be', 'taken', 'and', 'a', 'per', 'day', 'days'}
+NEGATION_RE = re.compile(r"\b(?:don'?t|do not|avoid|stop|discontinue|hold|never|not)\b", re.IGNORECASE)
+ORAL_FORMS = {'tab', 'tabs', 'tablet', 'tablets', 'cap', 'caps', 'capsule', 'capsules', 'syp', 'syrup', 'susp', 'sachet'}
+DURATION_DAYS = {'d': 1, 'w': 7, 'm': 30}
+FRACTION_DAYS = {'7': 1, '52': 7, '12': 30}
+FREQUENCY_TIMES = {
+    'once daily': ['08:00'],
+    'twice daily': ['08:00', '20:00'],
+    'three times daily': ['08:00', '14:00', '20:00'],
+    'four times daily': ['08:00', '12:00', '16:00', '20:00'],
+    'at night': ['21:00'],
+}
+SLOT_TIMES = {3: ['08:00', '14:00', '20:00'], 4: ['08:00', '12:00', '16:00', '20:00']}
+SLOT_FREQUENCIES = {1: 'once daily', 2: 'twice daily', 3: 'three times daily', 4: 'four times daily'}
+# Confidence deductions; lines scoring below PRESCRIPTION_PARSER_MIN_CONFIDENCE go to the LLM.
+UNKNOWN_NAME_PENALTY = 0.25
+NO_DOSE_PENALTY = 0.15
+NO_DURATION_PENALTY = 0.05
+
+
+class PrescriptionParserService:
+    """Grammar-based sig parser so PrescriptionStructurerAgent only sees lines it can't read."""
+
+    def parse(self, text: str) -> tuple[list[dict], list[str], list[str]]:
+        """Return (medications, clarifications, unparsed_lines).
+
+        Lines without a drug name or sig are skipped as headings and notes. Lines
+        that look like a prescription but have no readable frequency, carry words
+        the grammar doesn't cover (tapers, exceptions, negations, a second dose),
+        or score below PRESCRIPTION_PARSER_MIN_CONFIDENCE, are returned unparsed.
+        """
+        medications: list[dict] = []
+        clarifications: list[str] = []
+        unparsed: list[str] = []
+        for raw in text.splitlines():
+            line = BULLET_RE.sub('', raw).strip()
+            if not line:
+                continue
+            parsed = self.parse_line(line)
+            if parsed is None:
+                if self._looks_like_prescription(line):
+                    unparsed.append(raw.strip())
+                continue
+            med, notes = parsed
+            if med['confidence'] < settings.PRESCRIPTION_PARSER_MIN_CONFIDENCE:
+                unparsed.append(raw.strip())
+                continue
+            medications.append(med)
+            clarifications.extend(notes)
+        return medications, clarifications, unparsed
+
+    def parse_line(self, line: str) -> tuple[dict, list[str]] | None:
+        """Parse one sig line into a medication dict and its clarifications, or None."""
+        slots = SLOT_RE.search(line)
+        frequency, every = _frequency(line)
+        as_needed = AS_NEEDED_RE.search(line) is not None
+        if slots is None and frequency is None and not as_needed:
+            return None
+        if NEGATION_RE.search(line) or self._has_leftover(line):
+            return None
+        raw_name, form = self._name_span(line)
+        if not raw_name:
+            return None
+        name = _canonical(raw_name)
+        dose_match = DOSE_RE.search(line)
+        duration_days = _duration_days(line)
+        pattern = None
+        times: list[str] = []
+        if slots is not None:
+            pattern = re.sub(r'\s+', '', slots.group(1))
+            taken = [i for i, value in enumerate(pattern.split('-')) if value != '0']
+            if not taken:
+                return None
+            slot_times = SLOT_TIMES[len(pattern.split('-'))]
+            if taken == [len(slot_times) - 1]:
+                frequency, times = 'at night', list(FREQUENCY_TIMES['at night'])
+            else:
+                frequency, times = SLOT_FREQUENCIES[len(taken)], [slot_times[i] for i in taken]
+        elif every:
+            times = _interval_times(every)
+            if not times and not as_needed:
+                # q5h, q7h... don't fit a daily clock; let the LLM or the clinician decide.
+                return None
+        elif frequency and not as_needed:
+            times = list(FREQUENCY_TIMES.get(frequency, []))
+        route = next((ROUTES[t] for t in TOKEN_RE.findall(line.lower()) if t in ROUTES), None)
+        if route is None and form in ORAL_FORMS:
+            route = 'oral'
+        if as_needed:
+            frequency = f'{frequency} as needed' if frequency else 'as needed'
+        confidence = 1.0
+        notes: list[str] = []
+        display = name or raw_name
+        if name is None:
+            confidence -= UNKNOWN_NAME_PENALTY
+            notes.append(f"Confirm the medication name '{raw_name}'.")
+        if dose_match is None:
+            confidence -= NO_DOSE_PENALTY
+            notes.append(f'Dose strength not specified for {display}.')
+        if duration_days is None and not as_needed:
+            confidence -= NO_DURATION_PENALTY
+            notes.append(f'Duration not specified for {display}.')
+        med = {
+            'name': display,
+            'dose': f'{dose_match.group(1)}{dose_match.group(2).lower()}' if dose_match else None,
+            'frequency': frequency,
+            'route': route,
+            'times': [] if as_needed else times,
+            'duration_days': duration_days,
+            'instructions': next((label for pattern_re, label in INSTRUCTIONS if pattern_re.search(line)), None),
+            'as_needed': as_needed,
+            'pattern': pattern,
+            'confidence': round(confidence, 2),
+        }
+        return med, notes
+
+    def _name_span(self, line: str) -> tuple[str, str | None]:
+        """Drug name before the first dose/sig token, without form words; plus the dosage form."""
+        form = None
+        tokens = []
+        for token in TOKEN_RE.findall(line[:_name_end(line)].lower()):
+            if token in FORM_WORDS:
+                form = form or token
+            elif token not in ROUTES:
+                tokens.append(token)
+        return ' '.join(tokens), form
+
+    def _has_leftover(self, line: str) -> bool:
+        """True when the sig has words besides one dose, one frequency, duration and instructions."""
+        frequencies = _frequency_spans(line)
+        if len(DOSE_RE.findall(line)) > 1 or len(frequencies) > 1:
+            return True
+        spans = list(frequencies)
+        for pattern in (DOSE_RE, SLOT_RE, DURATION_RE, FRACTION_DURATION_RE, AS_NEEDED_RE, *(p for p, _ in INSTRUCTIONS)):
+            spans.extend(match.span() for match in pattern.finditer(line))
+        chars = list(line)
+        for start, end in spans:
+            chars[start:end] = ' ' * (end - start)
+        rest = ''.join(chars)[_name_end(line):].lower()
+        return any(t not in FORM_WORDS and t not in ROUTES and t not in FILLER_WORDS for t in TOKEN_RE.findall(rest))
+
+    def _looks_like_prescription(self, line: str) -> bool:
+        if DOSE_RE.search(line) or SLOT_RE.search(line) or _frequency(line)[0]:
+            return True
+        raw_name, _ = self._name_span(line)
+        return bool(raw_name) and _canonical(raw_name) is not None
+
+
+@lru_cache(maxsize=4096)
+def _canonical(name: str) -> str | None:
+    # Unknown names miss the dictionary and pay for a fuzzy search; prescriptions repeat, so memoize.
+    return MedicationNormalizerService().canonical(name)
+
+
+def _name_end(line: str) -> int:
+    """Offset of the first dose/sig token; the drug name comes before it."""
+    end = len(line)
+    for match in (DOSE_RE.search(line), SLOT_RE.search(line), re.search(r'\d', line)):
+        if match is not None:
+            end = min(end, match.start())
+    for pattern, _ in FREQUENCY_PATTERNS:
+        match = pattern.search(line)
+        if match is not None:
+            end = min(end, match.start())
+    return end
+
+
+def _frequency_spans(line: str) -> list[tuple[int, int]]:
+    """Non-PRN frequency matches, overlapping ones ('twice daily' / 'daily') merged."""
+    spans = sorted(
+        match.span() for pattern, _ in FREQUENCY_PATTERNS if pattern is not AS_NEEDED_RE for match in pattern.finditer(line)
+    )
+    merged: list[tuple[int, int]] = []
+    for start, end in spans:
+        if merged and start < merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _frequency(line: str) -> tuple[str | None, int | None]:
+    """First non-PRN frequency label and, for qNh, the interval in hours."""
+    for pattern, label in FREQUENCY_PATTERNS:
+        match = pattern.search(line) if pattern is not AS_NEEDED_RE else None
+        if match:
+            every = int(match.group(1)) if match.groups() else None
+            return label.format(*match.groups()), every
+    return None, None
+
+
+def _interval_times(hours: int) -> list[str]:
+    if not 1 <= hours <= 24 or 24 % hours:
+        return []
+    return sorted(f'{(8 + i * hours) % 24:02d}:00' for i in range(24 // hours))
+
+
+def _duration_days(line: str) -> int | None:
+    match = DURATION_RE.search(line)
+    if match:
+        return int(match.group(1)) * DURATION_DAYS[match.group(2)[0].lower()]
+    match = FRACTION_DURATION_RE.search(line)
+    if match:
+        return int(match.group(1)) * FRACTION_DAYS[match.group(2)]
+    return None
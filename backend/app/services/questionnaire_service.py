@@ -0,0 +1,245 @@
+from __future__ import annotations
+import copy
+from typing import Any
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agents.questionnaire_agent import QuestionnaireAgent
+from app.core.logging import get_logger
+from app.models.profile import PatientProfile
+from app.schemas.profile import PatientProfile as ProfileSchema
+
+logger = get_logger(__name__)
+
+# Schema fields a complete profile must fill; derived so schema changes carry over.
+BOOKKEEPING_FIELDS = ('additional_info', 'answered_fields', 'missing_fields')
+REQUIRED_FIELDS = tuple(name for name in ProfileSchema.model_fields if name not in BOOKKEEPING_FIELDS)
+LIST_FIELDS = ('conditions', 'allergies', 'timeline')
+# Answers meaning "nothing to record"; they mark the field answered instead of becoming list entries.
+NONE_ANSWERS = frozenset({'none', 'no', 'nil', 'nothing', 'n/a', 'na', 'not applicable', 'none known', 'nka', 'nkda'})
+FIELD_QUESTIONS = {
+    'conditions': 'Do you have any ongoing medical conditions (for example diabetes, high blood pressure or asthma)?',
+    'allergies': 'Are you allergic to any medicines, foods or materials? If not, answer "none".',
+    'medications': 'Which medicines do you take, with dose and how often?',
+    'vitals': 'Do you have recent readings for blood pressure, heart rate, temperature or oxygen level?',
+    'timeline': 'When did your current symptoms start and how have they changed?',
+    'smoking_status': 'Do you smoke or use tobacco, now or in the past?',
+    'alcohol_use': 'How often do you drink alcohol?',
+    'family_history': 'Do any close relatives have heart disease, diabetes, cancer or other major conditions?',
+    'pregnancy_status': 'Are you currently pregnant or breastfeeding?',
+    'weight': 'What is your current weight?',
+    'height': 'What is your height?',
+}
+
+
+class QuestionnaireService:
+    """Apply questionnaire answers to the profile locally; ask the LLM only for unfamiliar gaps."""
+
+    async def latest_profile(self, session: AsyncSession, patient_id: int) -> PatientProfile | None:
+        result = await session.execute(
+            select(PatientProfile)
+            .where(PatientProfile.patient_id == patient_id)
+            .order_by(PatientProfile.created_at.desc(), PatientProfile.id.desc())
+            .limit(1)
+        )
+        return result.scalars().first()
+
+    async def answer(self, session: AsyncSession, patient_id: int, answers: dict) -> tuple[PatientProfile, list[dict], list[str]]:
+        """Merge answers into a new profile version; returns (record, changes, missing_fields).
+
+        No new version is written when the answers change nothing. Raises ValueError
+        when the merged profile no longer fits the profile schema.
+        """
+        latest = await self.latest_profile(session, patient_id)
+        before = normalize(latest.profile_json if latest else {})
+        after = apply_answers(before, answers)
+        try:
+            after = ProfileSchema.model_validate(after).model_dump()
+        except ValidationError as exc:
+            raise ValueError(exc.errors(include_url=False, include_context=False)) from exc
+        after['missing_fields'] = missing_fields(after, before.get('missing_fields') or [])
+        changes = diff_profiles(before, after)
+        if latest is not None and not changes:
+            return latest, [], after['missing_fields']
+        record = PatientProfile(patient_id=patient_id, profile_json=after, version=(latest.version if latest else 0) + 1)
+        session.add(record)
+        await session.commit()
+        await session.refresh(record)
+        return record, changes, after['missing_fields']
+
+    async def next_questions(self, session: AsyncSession, patient_id: int) -> tuple[list[str], list[str]]:
+        """Questions for the profile's missing fields, as (questions, fields)."""
+        latest = await self.latest_profile(session, patient_id)
+        profile = latest.profile_json if latest else {}
+        missing = missing_fields(profile, profile.get('missing_fields') or [])
+        questions = [FIELD_QUESTIONS[field] for field in missing if field in FIELD_QUESTIONS]
+        fields = [field for field in missing if field in FIELD_QUESTIONS]
+        unfamiliar = [field for field in missing if field not in FIELD_QUESTIONS]
+        if unfamiliar:
+            input_text = f"Missing profile fields: {unfamiliar}\nPatient profile JSON:\n{profile}"
+            try:
+                generated = QuestionnaireAgent().run(input_text).questions
+            except Exception:
+                logger.exception('questionnaire agent failed; using generic questions')
+                generated = []
+            questions += generated or [f"Can you tell us about your {field.replace('_', ' ')}?" for field in unfamiliar]
+            fields += unfamiliar
+        return questions, fields
+
+
+def apply_answers(profile: dict, answers: dict) -> dict:
+    """Return a patched copy of `profile`.
+
+    List fields take a string or list to add, or {"add": [...], "remove": [...]}.
+    `medications` entries (dicts or names) are merged by case-insensitive name and
+    removed with {"remove": [names]}. For these, "none" (see NONE_ANSWERS) or an
+    empty list is an explicit empty answer: nothing is added. `vitals` is updated
+    key by key from a dict (a null value deletes the reading); a "none" answer adds
+    nothing and free text is kept as `additional_info["vitals"]`. Any other key goes
+    to `additional_info` (null deletes). Every answered key is recorded in
+    `answered_fields`.
+    """
+    merged = copy.deepcopy(profile or {})
+    answered = list(merged.get('answered_fields') or [])
+    for raw_key, value in answers.items():
+        key = str(raw_key).strip().lower().replace(' ', '_')
+        if key in ('answered_fields', 'missing_fields'):
+            continue
+        if key in LIST_FIELDS:
+            add, remove = _add_remove(value)
+            current = [item for item in merged.get(key) or [] if not _is_none(item)]
+            merged[key] = _merge_strings(current, [item for item in add if not _is_none(item)], remove)
+        elif key == 'medications':
+            add, remove = _add_remove(value)
+            merged[key] = _merge_medications(merged.get(key) or [], [item for item in add if not _is_none(item)], remove)
+        elif key == 'vitals':
+            if not isinstance(value, dict):
+                if value not in (None, '') and not _is_none(value):
+                    info = dict(merged.get('additional_info') or {})
+                    info['vitals'] = value
+                    merged['additional_info'] = info
+                if key not in answered:
+                    answered.append(key)
+                continue
+            vitals = dict(merged.get('vitals') or {})
+            for name, reading in value.items():
+                if reading is None:
+                    vitals.pop(name, None)
+                else:
+                    vitals[name] = reading
+            merged['vitals'] = vitals
+        else:
+            info = dict(merged.get('additional_info') or {})
+            if value is None or value == '':
+                info.pop(key, None)
+            else:
+                info[key] = value
+            merged['additional_info'] = info
+        if key not in answered:
+            answered.append(key)
+    merged['answered_fields'] = answered
+    return merged
+
+
+def carry_forward(previous: dict, rebuilt: dict) -> dict:
+    """Keep questionnaire answers when a profile is rebuilt from documents.
+
+    `additional_info` and `answered_fields` come from the previous profile; for
+    answered list fields and medications the previous entries are merged into the
+    rebuilt ones, and answered vitals fill readings the rebuild lacks.
+    """
+    previous = normalize(previous or {})
+    merged = normalize(rebuilt)
+    answered = previous.get('answered_fields') or []
+    for field in answered:
+        if field in LIST_FIELDS:
+            merged[field] = _merge_strings(merged.get(field) or [], previous.get(field) or [], [])
+        elif field == 'medications':
+            merged[field] = _merge_medications(merged.get(field) or [], previous.get(field) or [], [])
+        elif field == 'vitals':
+            merged[field] = {**(previous.get(field) or {}), **(merged.get(field) or {})}
+    merged['additional_info'] = {**(merged.get('additional_info') or {}), **(previous.get('additional_info') or {})}
+    merged['answered_fields'] = list(answered)
+    merged['missing_fields'] = missing_fields(merged, merged.get('missing_fields') or [])
+    return merged
+
+
+def normalize(profile: dict) -> dict:
+    """Fill schema defaults so stored profiles and merged ones diff cleanly."""
+    try:
+        return ProfileSchema.model_validate(profile).model_dump()
+    except ValidationError:
+        return dict(profile)
+
+
+def missing_fields(profile: dict, previous: list[str]) -> list[str]:
+    """Empty required schema fields, then earlier-reported extra gaps not yet answered."""
+    answered = set(profile.get('answered_fields') or [])
+    missing = [field for field in REQUIRED_FIELDS if not profile.get(field) and field not in answered]
+    info = profile.get('additional_info') or {}
+    for field in previous:
+        key = str(field).strip().lower().replace(' ', '_')
+        if key in ProfileSchema.model_fields or key in missing or key in answered or key.startswith('no_'):
+            continue
+        if info.get(key) in (None, '', [], {}):
+            missing.append(key)
+    return missing
+
+
+def diff_profiles(before: dict, after: dict) -> list[dict]:
+    """Field-level changes between two profile dicts, in schema order."""
+    fields = list(ProfileSchema.model_fields) + sorted((set(before) | set(after)) - set(ProfileSchema.model_fields))
+    return [
+        {'field': field, 'before': before.get(field), 'after': after.get(field)}
+        for field in fields
+        if before.get(field) != after.get(field)
+    ]
+
+
+def _is_none(item: Any) -> bool:
+    return isinstance(item, str) and item.strip().lower().rstrip('.') in NONE_ANSWERS
+
+
+def _add_remove(value: Any) -> tuple[list, list]:
+    if isinstance(value, dict) and ({'add', 'remove'} & set(value)):
+        return _as_list(value.get('add')), _as_list(value.get('remove'))
+    return _as_list(value), []
+
+
+def _as_list(value: Any) -> list:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _merge_strings(current: list, add: list, remove: list) -> list:
+    removed = {str(item).strip().lower() for item in remove}
+    result = [item for item in current if str(item).strip().lower() not in removed]
+    seen = {str(item).strip().lower() for item in result}
+    for item in add:
+        if isinstance(item, str):
+            item = item.strip()
+            if not item or item.lower() in seen:
+                continue
+            seen.add(item.lower())
+        result.append(item)
+    return result
+
+
+def _merge_medications(current: list, add: list, remove: list) -> list:
+    removed = {str(name).strip().lower() for name in remove}
+    result = [dict(med) for med in current if str(med.get('name', '')).strip().lower() not in removed]
+    by_name = {str(med.get('name', '')).strip().lower(): med for med in result}
+    for item in add:
+        med = {'name': item.strip()} if isinstance(item, str) else dict(item) if isinstance(item, dict) else None
+        if not med or not str(med.get('name', '')).strip():
+            continue
+        existing = by_name.get(str(med['name']).strip().lower())
+        if existing is not None:
+            existing.update({k: v for k, v in med.items() if k != 'name' and v not in (None, '')})
+        else:
+            result.append(med)
+            by_name[str(med['name']).strip().lower()] = med
+    return result
@@ -1,6 +1,277 @@
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import os
+import socket
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import SessionLocal
+from app.models.lease import SchedulerLease
+from app.models.medication import DoseLog, DoseSchedule, MedicationPlan
+from app.services.adherence_service import AdherenceService
+from app.utils.time import as_utc, utc_now
+
+logger = get_logger(__name__)
+
+LEASE_NAME = 'reminder-scheduler'
+LEASE_SECONDS = 30
+HORIZON_HOURS = 24
+SYNC_SECONDS = 60
+SYNC_BATCH_SIZE = 5000
+FIRE_BATCH_SIZE = 500
+COACH_TIME_UTC = time(9, 0)
+
+DOSE_REMINDER = 'dose_reminder'
+DOSE_MISSED = 'dose_missed'
+DAILY_COACH = 'daily_coach'
+
+Handler = Callable[[list[int]], Awaitable[None]]
+
+
+def _lease_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+
 class ReminderSchedulerService:
+    """In-process min-heap of reminder timers, owned by one worker at a time via a DB lease.
+
+    Heap entries are (fire_at_epoch, seq, kind, ref_id). The run loop sleeps until
+    the earliest entry, the next DB sync or the next lease renewal, whichever is first.
+    Only pending doses due within HORIZON_HOURS are held in memory.
+    """
+
+    def __init__(self, session_factory=SessionLocal) -> None:
+        self.session_factory = session_factory
+        self.owner = _lease_owner()
+        self.handlers: dict[str, Handler] = {
+            DOSE_REMINDER: self._send_dose_reminders,
+            DOSE_MISSED: self._mark_missed,
+            DAILY_COACH: self._send_daily_coach,
+        }
+        self._heap: list[tuple[float, int, str, int]] = []
+        self._queued: set[tuple[str, int]] = set()
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._leader = False
+        self._horizon: datetime | None = None
+        self._last_dose_id = 0
+
     def schedule_dose_reminders(self, dose_schedule: list[dict]) -> None:
-        return None
+        """Queue freshly inserted doses (each needs 'id' and 'due_at'); other workers pick them up on sync."""
+        if not self._leader or self._horizon is None:
+            return
+        for dose in dose_schedule:
+            due_at = as_utc(dose['due_at'])
+            if due_at < self._horizon:
+                self._push_dose(dose['id'], due_at)
+        self._wakeup.set()
 
     def schedule_daily_coach(self, patient_id: int) -> None:
-        return None
+        if not self._leader:
+            return
+        now = utc_now()
+        fire_at = datetime.combine(now.date(), COACH_TIME_UTC, tzinfo=now.tzinfo)
+        if fire_at <= now:
+            fire_at += timedelta(days=1)
+        self._push(fire_at, DAILY_COACH, patient_id)
+        self._wakeup.set()
+
+    def pending(self) -> int:
+        return len(self._heap)
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader
+
+    async def run(self) -> None:
+        if f":{os.getpid()}:" not in self.owner:
+            # Created before a fork (Gunicorn preload): each worker needs its own lease identity.
+            self.owner = _lease_owner()
+        next_sync = 0.0
+        while True:
+            try:
+                if not await self._hold_lease():
+                    await asyncio.sleep(LEASE_SECONDS / 2)
+                    continue
+                now = utc_now().timestamp()
+                if now >= next_sync or self._horizon is None:
+                    await self._sync()
+                    next_sync = now + SYNC_SECONDS
+                await self._fire_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('reminder scheduler iteration failed')
+            now = utc_now().timestamp()
+            deadline = min(next_sync, now + LEASE_SECONDS / 2)
+            if self._heap:
+                deadline = min(deadline, self._heap[0][0])
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(deadline - now, 0.0))
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def release(self) -> None:
+        if not self._leader:
+            return
+        async with self.session_factory() as session:
+            await session.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == LEASE_NAME, SchedulerLease.owner == self.owner)
+                .values(expires_at=utc_now())
+            )
+            await session.commit()
+        self._reset()
+
+    def _push(self, fire_at: datetime, kind: str, ref_id: int) -> None:
+        key = (kind, ref_id)
+        if key in self._queued:
+            return
+        self._queued.add(key)
+        heapq.heappush(self._heap, (fire_at.timestamp(), next(self._seq), kind, ref_id))
+
+    def _push_dose(self, dose_id: int, due_at: datetime) -> None:
+        grace = timedelta(minutes=settings.REMINDER_MISSED_GRACE_MINUTES)
+        now = utc_now()
+        if due_at + grace > now:
+            self._push(due_at, DOSE_REMINDER, dose_id)
+        # Doses found already past due (startup, late scheduling) still get the full grace to be logged.
+        self._push(max(due_at, now) + grace, DOSE_MISSED, dose_id)
+
+    def _reset(self) -> None:
+        self._leader = False
+        self._heap.clear()
+        self._queued.clear()
+        self._horizon = None
+        self._last_dose_id = 0
+
+    async def _hold_lease(self) -> bool:
+        now = utc_now()
+        expires_at = now + timedelta(seconds=LEASE_SECONDS)
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(SchedulerLease)
+                .where(
+                    SchedulerLease.name == LEASE_NAME,
+                    or_(SchedulerLease.owner == self.owner, SchedulerLease.expires_at < now),
+                )
+                .values(owner=self.owner, expires_at=expires_at)
+            )
+            held = result.rowcount == 1
+            if not held and await session.get(SchedulerLease, LEASE_NAME) is None:
+                session.add(SchedulerLease(name=LEASE_NAME, owner=self.owner, expires_at=expires_at))
+                held = True
+            try:
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()
+                held = False
+        if held and not self._leader:
+            logger.info('reminder scheduler lease acquired', extra={'owner': self.owner})
+        if not held and self._leader:
+            logger.info('reminder scheduler lease lost', extra={'owner': self.owner})
+            self._reset()
+        self._leader = held
+        return held
+
+    async def _sync(self) -> None:
+        """Load pending doses entering the horizon plus rows inserted by other workers."""
+        horizon = utc_now() + timedelta(hours=HORIZON_HOURS)
+        async with self.session_factory() as session:
+            max_id = (await session.execute(select(func.max(DoseSchedule.id)))).scalar() or 0
+            pending = DoseSchedule.status == 'pending'
+            if self._horizon is None:
+                await self._load(session, pending, DoseSchedule.due_at < horizon)
+                patients = await session.execute(
+                    select(MedicationPlan.patient_id).where(MedicationPlan.active == True).distinct()  # noqa: E712
+                )
+                for patient_id in patients.scalars().all():
+                    self.schedule_daily_coach(patient_id)
+            else:
+                await self._load(session, pending, DoseSchedule.due_at >= self._horizon, DoseSchedule.due_at < horizon)
+                await self._load(
+                    session,
+                    pending,
+                    DoseSchedule.id > self._last_dose_id,
+                    DoseSchedule.id <= max_id,
+                    DoseSchedule.due_at < self._horizon,
+                )
+        self._horizon = horizon
+        self._last_dose_id = max_id
+
+    async def _load(self, session, *criteria) -> None:
+        last_id = 0
+        while True:
+            result = await session.execute(
+                select(DoseSchedule.id, DoseSchedule.due_at)
+                .where(DoseSchedule.id > last_id, *criteria)
+                .order_by(DoseSchedule.id)
+                .limit(SYNC_BATCH_SIZE)
+            )
+            rows = result.all()
+            if not rows:
+                return
+            for dose_id, due_at in rows:
+                self._push_dose(dose_id, as_utc(due_at))
+            last_id = rows[-1][0]
+
+    async def _fire_due(self) -> None:
+        now = utc_now().timestamp()
+        due: dict[str, list[int]] = defaultdict(list)
+        while self._heap and self._heap[0][0] <= now:
+            _, _, kind, ref_id = heapq.heappop(self._heap)
+            self._queued.discard((kind, ref_id))
+            due[kind].append(ref_id)
+        for kind, ref_ids in due.items():
+            for i in range(0, len(ref_ids), FIRE_BATCH_SIZE):
+                await self.handlers[kind](ref_ids[i:i + FIRE_BATCH_SIZE])
+
+    async def _send_dose_reminders(self, dose_ids: list[int]) -> None:
+        logger.info('dose reminders due', extra={'dose_ids': dose_ids})
+
+    async def _send_daily_coach(self, patient_ids: list[int]) -> None:
+        logger.info('daily coach due', extra={'patient_ids': patient_ids})
+        for patient_id in patient_ids:
+            self.schedule_daily_coach(patient_id)
+
+    async def _mark_missed(self, dose_ids: list[int]) -> None:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(DoseSchedule)
+                .where(DoseSchedule.id.in_(dose_ids), DoseSchedule.status == 'pending')
+                .values(status='missed')
+                .returning(DoseSchedule.id)
+            )
+            missed_ids = result.scalars().all()
+            if not missed_ids:
+                await session.commit()
+                return
+            rows = await session.execute(
+                select(DoseSchedule.due_at, MedicationPlan.patient_id)
+                .join(MedicationPlan, MedicationPlan.id == DoseSchedule.plan_id)
+                .where(DoseSchedule.id.in_(missed_ids))
+            )
+            now = utc_now()
+            await session.execute(insert(DoseLog), [
+                {'dose_id': dose_id, 'action': 'missed', 'timestamp': now, 'note': 'auto-marked by reminder scheduler'}
+                for dose_id in missed_ids
+            ])
+            per_day = Counter((patient_id, as_utc(due_at).date()) for due_at, patient_id in rows.all())
+            adherence = AdherenceService()
+            for (patient_id, day), count in per_day.items():
+                await adherence.record(session, patient_id, day, 'missed', count=count)
+            await session.commit()
+        logger.info('doses auto-marked missed', extra={'count': len(missed_ids)})
+
+
+reminder_scheduler = ReminderSchedulerService()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+import re
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.search import KIND_CODES, SEARCH_TABLE
+
+QUERY_TERM_RE = re.compile(r'\w+', re.UNICODE)
+MAX_QUERY_TERMS = 16
+SNIPPET_TOKENS = 16
+
+class SearchService:
+    """Maintain and query the full-text index (FTS5 bm25 on SQLite, ts_rank_cd on Postgres)."""
+
+    async def index(self, session: AsyncSession, kind: str, ref_id: int, patient_id: int, body: str | None) -> None:
+        """Insert or replace one document/transcript; empty text removes it. Runs in the caller's transaction."""
+        if _dialect(session) == 'postgresql':
+            await session.execute(
+                text(f"DELETE FROM {SEARCH_TABLE} WHERE kind = :kind AND ref_id = :ref_id"),
+                {'kind': kind, 'ref_id': ref_id},
+            )
+            if body and body.strip():
+                await session.execute(
+                    text(f"INSERT INTO {SEARCH_TABLE}(kind, ref_id, patient_id, body) VALUES (:kind, :ref_id, :patient_id, :body)"),
+                    {'kind': kind, 'ref_id': ref_id, 'patient_id': patient_id, 'body': body},
+                )
+            return
+        rowid = ref_id * 2 + KIND_CODES[kind]
+        await session.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :rowid"), {'rowid': rowid})
+        if body and body.strip():
+            await session.execute(
+                text(f"INSERT INTO {SEARCH_TABLE}(rowid, body, kind, ref_id, patient_id) VALUES (:rowid, :body, :kind, :ref_id, :patient_id)"),
+                {'rowid': rowid, 'body': body, 'kind': kind, 'ref_id': ref_id, 'patient_id': patient_id},
+            )
+
+    async def search(self, session: AsyncSession, query: str, patient_id: int | None = None, limit: int = 20, offset: int = 0) -> tuple[list[dict], int | None]:
+        """Return (hits, next_offset), best match first."""
+        terms = QUERY_TERM_RE.findall(query)[:MAX_QUERY_TERMS]
+        if not terms:
+            return [], None
+        params = {'limit': limit + 1, 'offset': offset, 'patient_id': patient_id}
+        patient_filter = 'AND patient_id = :patient_id' if patient_id is not None else ''
+        if _dialect(session) == 'postgresql':
+            params['query'] = ' & '.join(f'{term}:*' if i == len(terms) - 1 else term for i, term in enumerate(terms))
+            sql = (
+                "SELECT kind, ref_id, patient_id, "
+                "ts_headline('english', body, q, 'StartSel=[,StopSel=],MaxWords=24,MinWords=8') AS snippet, "
+                f"ts_rank_cd(tsv, q) AS score FROM {SEARCH_TABLE}, to_tsquery('english', :query) AS q "
+                f"WHERE tsv @@ q {patient_filter} ORDER BY score DESC, ref_id DESC LIMIT :limit OFFSET :offset"
+            )
+        else:
+            # Quote every term so user input can't inject FTS5 syntax; the last one matches as a prefix.
+            params['query'] = ' '.join(f'"{term}"' for term in terms) + '*'
+            sql = (
+                "SELECT kind, ref_id, patient_id, "
+                f"snippet({SEARCH_TABLE}, 0, '[', ']', '…', {SNIPPET_TOKENS}) AS snippet, "
+                f"-bm25({SEARCH_TABLE}) AS score FROM {SEARCH_TABLE} "
+                f"WHERE {SEARCH_TABLE} MATCH :query {patient_filter} ORDER BY rank LIMIT :limit OFFSET :offset"
+            )
+        rows = (await session.execute(text(sql), params)).mappings().all()
+        hits = [
+            {
+                'kind': row['kind'],
+                'ref_id': int(row['ref_id']),
+                'patient_id': int(row['patient_id']),
+                'snippet': row['snippet'],
+                'score': round(float(row['score']), 6),
+            }
+            for row in rows[:limit]
+        ]
+        return hits, offset + limit if len(rows) > limit else None
+
+
+def _dialect(session: AsyncSession) -> str:
+    return session.bind.dialect.name
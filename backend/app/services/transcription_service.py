@@ -1,8 +1,75 @@
-from app.services.openai_client import OpenAIClient
+from __future__ import annotations
+import asyncio
+import shutil
+from typing import Awaitable, Callable
+
+from app.core.config import settings
+from app.orchestration.tracing import queued
+from app.services.openai_client import get_llm_client
+from app.utils.audio import split_on_silence
+
+ProgressCallback = Callable[[str, list[dict]], Awaitable[None]]
 
 class TranscriptionService:
     def __init__(self) -> None:
-        self.client = OpenAIClient()
+        self.client = get_llm_client()
 
     def transcribe(self, file_path: str) -> str:
         return self.client.transcribe_audio(file_path)
+
+    async def transcribe_long(self, file_path: str, on_progress: ProgressCallback | None = None) -> tuple[str, list[dict]]:
+        """Transcribe long audio as silence-cut chunks in parallel.
+
+        Returns (text, segments) with segment timestamps relative to the whole file.
+        `on_progress` receives the contiguous prefix stitched so far each time it grows.
+        """
+        chunks, tmp_dir = await asyncio.to_thread(split_on_silence, file_path, settings.TRANSCRIBE_CHUNK_SECONDS)
+        slots = asyncio.Semaphore(settings.TRANSCRIBE_CONCURRENCY)
+        uploads: list[asyncio.Future] = []
+
+        async def run(index: int, chunk_path: str, offset: float) -> tuple[int, list[dict]]:
+            async with queued(slots, 'transcription'):
+                upload = asyncio.ensure_future(asyncio.to_thread(self.client.transcribe_segments, chunk_path))
+                uploads.append(upload)
+                segments = await asyncio.shield(upload)
+            return index, shift_segments(segments, offset)
+
+        tasks = [asyncio.create_task(run(i, path, offset)) for i, (path, offset) in enumerate(chunks)]
+        results: list[list[dict] | None] = [None] * len(chunks)
+        emitted = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, segments = await next_done
+                results[index] = segments
+                ready = emitted
+                while ready < len(results) and results[ready] is not None:
+                    ready += 1
+                if on_progress is not None and ready > emitted and ready < len(results):
+                    await on_progress(*stitch(results[:ready]))
+                emitted = ready
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # A cancelled task doesn't stop its worker thread; let in-flight uploads finish reading their chunk.
+            await asyncio.gather(*uploads, return_exceptions=True)
+            if tmp_dir is not None:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        return stitch(results)
+
+
+def shift_segments(segments: list[dict], offset: float) -> list[dict]:
+    return [
+        {
+            'start': round(seg['start'] + offset, 3),
+            'end': round(seg['end'] + offset, 3) if seg.get('end') is not None else None,
+            'text': seg['text'],
+        }
+        for seg in segments
+    ]
+
+
+def stitch(chunk_segments: list[list[dict]]) -> tuple[str, list[dict]]:
+    segments = [seg for chunk in chunk_segments for seg in chunk if seg['text']]
+    segments.sort(key=lambda seg: seg['start'])
+    return ' '.join(seg['text'] for seg in segments), segments
@@ -1,10 +1,205 @@
-from app.services.openai_client import OpenAIClient
-from app.utils.files import save_upload
+from __future__ import annotations
+import asyncio
+import hashlib
+import os
+import time
+from collections import Counter
+from datetime import datetime
+from typing import AsyncIterator, Iterator
+from uuid import uuid4
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import iterate_in_threadpool
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import SessionLocal
+from app.db.upsert import dialect_insert
+from app.models.coach import TTSAudio
+from app.orchestration.tracing import record_cache
+from app.services.openai_client import get_llm_client, TTS_CHUNK_SIZE
+
+logger = get_logger(__name__)
+
+EVICTION_GRACE_SECONDS = 3600
+DEFAULT_VOICE = 'alloy'
+# How long a concurrent first play waits for the in-flight synthesis; also when a claim counts as abandoned.
+SYNTHESIS_WAIT_SECONDS = 120
 
 class TTSService:
+    """Content-addressed TTS: identical (model, voice, text) reuses the same mp3 on disk."""
+
+    def __init__(self) -> None:
+        self.client = get_llm_client()
+
+    def synthesize(self, text: str, voice: str = DEFAULT_VOICE) -> str:
+        output_path = audio_path_for(audio_key(text, voice))
+        hit = os.path.exists(output_path)
+        record_cache('tts_audio', hit)
+        if hit:
+            # Refresh mtime so eviction treats the file as recently used.
+            os.utime(output_path)
+            return output_path
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        tmp_path = f"{output_path}.{uuid4().hex}.part"
+        try:
+            self.client.tts(text, voice, tmp_path)
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return output_path
+
+    def stream(self, text: str, voice: str = DEFAULT_VOICE) -> Iterator[bytes]:
+        """Yield audio as it is synthesized while filling the cache, or replay the cached file."""
+        output_path = audio_path_for(audio_key(text, voice))
+        hit = os.path.exists(output_path)
+        record_cache('tts_audio', hit)
+        if hit:
+            with open(output_path, 'rb') as f:
+                yield from iter(lambda: f.read(TTS_CHUNK_SIZE), b'')
+            return
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        tmp_path = f"{output_path}.{uuid4().hex}.part"
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in self.client.tts_stream(text, voice):
+                    f.write(chunk)
+                    yield chunk
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    async def stream_claimed(self, text: str, voice: str = DEFAULT_VOICE) -> AsyncIterator[bytes]:
+        """Stream a first play claimed in `synthesis_flights`, then record the file size and release the claim."""
+        key = audio_key(text, voice)
+        try:
+            async for chunk in iterate_in_threadpool(self.stream(text, voice)):
+                yield chunk
+            async with SessionLocal() as session:
+                await TTSAudioCacheService().record_size(session, audio_path_for(key))
+                await session.commit()
+        finally:
+            synthesis_flights.finish(key)
+
+
+class SynthesisFlights:
+    """Per-process single flight for first plays: one request synthesizes, the rest wait for the file."""
+
     def __init__(self) -> None:
-        self.client = OpenAIClient()
+        self._claims: dict[str, tuple[asyncio.Event, float]] = {}
+
+    def claim(self, key: str) -> bool:
+        current = self._claims.get(key)
+        if current is not None and time.monotonic() - current[1] < SYNTHESIS_WAIT_SECONDS:
+            return False
+        self._claims[key] = (asyncio.Event(), time.monotonic())
+        return True
+
+    def finish(self, key: str) -> None:
+        current = self._claims.pop(key, None)
+        if current is not None:
+            current[0].set()
+
+    async def wait(self, key: str) -> None:
+        current = self._claims.get(key)
+        if current is None:
+            return
+        try:
+            await asyncio.wait_for(current[0].wait(), SYNTHESIS_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+synthesis_flights = SynthesisFlights()
+
+
+class TTSAudioCacheService:
+    """Reference counts cached audio by the coach messages that are still "latest" and evicts the rest."""
+
+    async def retain(self, session: AsyncSession, audio_paths: list[str]) -> None:
+        now = datetime.utcnow()
+        for path, count in Counter(p for p in audio_paths if p).items():
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            stmt = dialect_insert(session)(TTSAudio).values(
+                key=_key_from_path(path), path=path, size_bytes=size, ref_count=count, last_used_at=now,
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['key'],
+                set_={
+                    'ref_count': TTSAudio.ref_count + count,
+                    'last_used_at': now,
+                    'size_bytes': size or TTSAudio.size_bytes,
+                },
+            )
+            await session.execute(stmt)
+
+    async def record_size(self, session: AsyncSession, audio_path: str) -> None:
+        """Set the size of audio written after `retain` (deferred synthesis) so eviction counts it."""
+        if os.path.exists(audio_path):
+            await session.execute(
+                update(TTSAudio).where(TTSAudio.key == _key_from_path(audio_path)).values(size_bytes=os.path.getsize(audio_path))
+            )
+
+    async def release(self, session: AsyncSession, audio_paths: list[str]) -> None:
+        for path, count in Counter(p for p in audio_paths if p).items():
+            await session.execute(
+                update(TTSAudio)
+                .where(TTSAudio.key == _key_from_path(path))
+                .values(ref_count=case((TTSAudio.ref_count > count, TTSAudio.ref_count - count), else_=0))
+            )
+
+    async def evict(self, session: AsyncSession, max_bytes: int | None = None) -> int:
+        """Delete unreferenced audio, least recently used first, until the cache fits in `max_bytes`."""
+        max_bytes = settings.TTS_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        total = (await session.execute(select(func.coalesce(func.sum(TTSAudio.size_bytes), 0)))).scalar()
+        if total <= max_bytes:
+            return 0
+        result = await session.execute(
+            select(TTSAudio).where(TTSAudio.ref_count <= 0).order_by(TTSAudio.last_used_at)
+        )
+        evicted = 0
+        cutoff = time.time() - EVICTION_GRACE_SECONDS
+        for entry in result.scalars().all():
+            if total <= max_bytes:
+                break
+            if os.path.exists(entry.path):
+                if os.path.getmtime(entry.path) > cutoff:
+                    continue
+                os.remove(entry.path)
+            total -= entry.size_bytes
+            await session.delete(entry)
+            evicted += 1
+        await session.commit()
+        logger.info('tts cache evicted', extra={'entries': evicted, 'bytes_remaining': total})
+        return evicted
+
+
+def audio_key(text: str, voice: str, model: str | None = None) -> str:
+    normalized = ' '.join(text.split())
+    payload = f"{model or settings.OPENAI_MODEL_TTS}\0{voice}\0{normalized}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def audio_path_for(key: str) -> str:
+    return os.path.join(settings.UPLOAD_DIR, 'tts', key[:2], f"{key}.mp3")
+
+
+def audio_etag(path: str) -> str:
+    # Cached paths are content-addressed, so the file name is a stable validator.
+    return f'"{_key_from_path(path)}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """RFC 9110 If-None-Match: a comma-separated list of (possibly weak) tags, or `*`."""
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == etag:
+            return True
+    return False
+
 
-    def synthesize(self, text: str, voice: str = 'alloy') -> str:
-        output_path = save_upload(b'', 'coach.mp3')
-        return self.client.tts(text, voice, output_path)
+def _key_from_path(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
@@ -0,0 +1,176 @@
+from __future__ import annotations
+import math
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import wave
+from array import array
+
+from app.core.exceptions import AudioTooLargeError
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+FFMPEG = shutil.which('ffmpeg')
+SILENCE_DB = -35
+SILENCE_MIN_SECONDS = 0.4
+WAV_WINDOW_SECONDS = 0.05
+# Whisper rejects uploads over 25 MB; leave headroom for container overhead.
+MAX_CHUNK_BYTES = 24 * 1024 * 1024
+# Without ffmpeg, WAV chunks are written as 16 kHz mono 16-bit PCM (32 kB/s, ~12.5 minutes per chunk).
+WAV_CHUNK_RATE = 16000
+WAV_CHUNK_BYTES_PER_SECOND = WAV_CHUNK_RATE * 2
+
+_DURATION_RE = re.compile(r'Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)')
+_SILENCE_START_RE = re.compile(r'silence_start:\s*(-?\d+(?:\.\d+)?)')
+_SILENCE_END_RE = re.compile(r'silence_end:\s*(\d+(?:\.\d+)?)')
+
+
+def split_on_silence(path: str, target_seconds: float) -> tuple[list[tuple[str, float]], str | None]:
+    """Split audio into ~target_seconds chunks cut inside silences.
+
+    Returns ([(chunk_path, offset_seconds), ...], tmp_dir). tmp_dir is None when the
+    file is returned whole; otherwise the caller removes it once done.
+
+    Without ffmpeg only 16-bit PCM WAV can be split; its chunks are downmixed and
+    resampled so each stays under MAX_CHUNK_BYTES. Other audio over that size
+    raises AudioTooLargeError rather than being sent whole and rejected upstream.
+    """
+    size = os.path.getsize(path)
+    if FFMPEG is not None:
+        duration, silences = _ffmpeg_silences(path)
+    elif _is_pcm16_wav(path):
+        duration, silences = _wav_silences(path)
+        target_seconds = min(target_seconds, MAX_CHUNK_BYTES / WAV_CHUNK_BYTES_PER_SECOND)
+    elif size > MAX_CHUNK_BYTES:
+        raise AudioTooLargeError(
+            f'audio is {size / 1024 / 1024:.0f} MB; install ffmpeg to split recordings over {MAX_CHUNK_BYTES // 1024 // 1024} MB'
+        )
+    else:
+        logger.warning('ffmpeg not available; transcribing audio without chunking')
+        return [(path, 0.0)], None
+    if duration <= target_seconds and size <= MAX_CHUNK_BYTES:
+        return [(path, 0.0)], None
+    cuts = choose_cuts(duration, silences, target_seconds)
+    tmp_dir = tempfile.mkdtemp(prefix='transcribe-')
+    bounds = list(zip([0.0, *cuts], [*cuts, duration]))
+    chunks = []
+    for index, (start, end) in enumerate(bounds):
+        if FFMPEG is not None:
+            chunk_path = os.path.join(tmp_dir, f'{index:04d}.mp3')
+            _ffmpeg_extract(path, start, end, chunk_path)
+        else:
+            chunk_path = os.path.join(tmp_dir, f'{index:04d}.wav')
+            _wav_extract(path, start, end, chunk_path)
+        chunks.append((chunk_path, start))
+    return chunks, tmp_dir
+
+
+def choose_cuts(duration: float, silences: list[tuple[float, float]], target_seconds: float) -> list[float]:
+    """Pick cut points at silence midpoints, as late as possible without exceeding target_seconds.
+
+    Falls back to a hard cut at target_seconds when a stretch has no silence.
+    """
+    midpoints = sorted((start + end) / 2 for start, end in silences)
+    cuts: list[float] = []
+    last = 0.0
+    while duration - last > target_seconds:
+        limit = last + target_seconds
+        candidates = [m for m in midpoints if last + target_seconds / 2 <= m <= limit]
+        cut = candidates[-1] if candidates else limit
+        cuts.append(cut)
+        last = cut
+    return cuts
+
+
+def _ffmpeg_silences(path: str) -> tuple[float, list[tuple[float, float]]]:
+    proc = subprocess.run(
+        [FFMPEG, '-hide_banner', '-nostats', '-i', path,
+         '-af', f'silencedetect=noise={SILENCE_DB}dB:d={SILENCE_MIN_SECONDS}', '-f', 'null', '-'],
+        capture_output=True, text=True, check=False,
+    )
+    duration = 0.0
+    match = _DURATION_RE.search(proc.stderr)
+    if match:
+        hours, minutes, seconds = match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    starts = [float(v) for v in _SILENCE_START_RE.findall(proc.stderr)]
+    ends = [float(v) for v in _SILENCE_END_RE.findall(proc.stderr)]
+    return duration, list(zip(starts, ends))
+
+
+def _ffmpeg_extract(path: str, start: float, end: float, output_path: str) -> None:
+    # Mono 16 kHz / 64 kbps keeps a 10 minute chunk around 5 MB, well under the API limit.
+    subprocess.run(
+        [FFMPEG, '-hide_banner', '-loglevel', 'error', '-y', '-ss', f'{start:.3f}', '-to', f'{end:.3f}',
+         '-i', path, '-ac', '1', '-ar', '16000', '-b:a', '64k', output_path],
+        check=True,
+    )
+
+
+def _wav_silences(path: str) -> tuple[float, list[tuple[float, float]]]:
+    with wave.open(path, 'rb') as wav:
+        rate, channels, width = wav.getframerate(), wav.getnchannels(), wav.getsampwidth()
+        frames_per_window = max(1, int(rate * WAV_WINDOW_SECONDS))
+        duration = wav.getnframes() / rate
+        if width != 2:
+            return duration, []
+        threshold = 32768 * 10 ** (SILENCE_DB / 20)
+        silences: list[tuple[float, float]] = []
+        run_start: float | None = None
+        position = 0.0
+        while True:
+            data = wav.readframes(frames_per_window)
+            if not data:
+                break
+            samples = array('h', data)
+            rms = math.sqrt(sum(s * s for s in samples[::channels]) / max(1, len(samples) // channels))
+            if rms < threshold:
+                run_start = position if run_start is None else run_start
+            elif run_start is not None:
+                if position - run_start >= SILENCE_MIN_SECONDS:
+                    silences.append((run_start, position))
+                run_start = None
+            position += len(samples) / channels / rate
+    return duration, silences
+
+
+def _is_pcm16_wav(path: str) -> bool:
+    if not path.lower().endswith('.wav'):
+        return False
+    try:
+        with wave.open(path, 'rb') as wav:
+            return wav.getsampwidth() == 2
+    except (wave.Error, EOFError):
+        return False
+
+
+def _wav_extract(path: str, start: float, end: float, output_path: str) -> None:
+    """Copy [start, end) as 16 kHz mono 16-bit PCM (channel average, linear resampling)."""
+    with wave.open(path, 'rb') as src, wave.open(output_path, 'wb') as dst:
+        rate, channels = src.getframerate(), src.getnchannels()
+        dst.setnchannels(1)
+        dst.setsampwidth(2)
+        dst.setframerate(WAV_CHUNK_RATE)
+        src.setpos(int(start * rate))
+        samples = array('h', src.readframes(int((end - start) * rate)))
+        if channels > 1:
+            samples = array('h', (sum(samples[i:i + channels]) // channels for i in range(0, len(samples) - channels + 1, channels)))
+        dst.writeframes(_resample(samples, rate, WAV_CHUNK_RATE).tobytes())
+
+
+def _resample(samples: array, rate: int, target_rate: int) -> array:
+    if rate == target_rate or not samples:
+        return samples
+    step = rate / target_rate
+    last = len(samples) - 1
+    out = array('h')
+    for i in range(int(len(samples) / step)):
+        position = i * step
+        left = int(position)
+        right = min(left + 1, last)
+        frac = position - left
+        out.append(int(samples[left] + (samples[right] - samples[left]) * frac))
+    return out
@@ -1,12 +1,45 @@
 import re
+from typing import Any
 
-EMAIL_RE = re.compile(r'[\\w\\.-]+@[\\w\\.-]+')
-PHONE_RE = re.compile(r'\\+?\\d[\\d\\-\\s]{7,}\\d')
+# One alternation, one pass. Quantifiers are bounded and every pattern refuses to
+# start inside a run of its own characters, so the scan stays linear in the input
+# size even for megabyte-scale extracted text. A phone is digit groups joined by
+# single spaces or hyphens, with an optional +country code and (area code); decimals,
+# ISO and d-m-Y dates are not phones, and _placeholder checks the digit count.
+PHI_RE = re.compile(
+    r'(?P<email>(?<![\w.+-])[\w.+-]{1,64}@[A-Za-z0-9-]{1,63}(?:\.[A-Za-z0-9-]{1,63}){1,8})'
+    r'|(?P<phone>(?<![\w+.-])(?!\d{4}-\d\d-\d\d(?!\d)|\d\d?-\d\d?-\d{4}(?!\d))'
+    r'(?:\+\d{1,3}[\s-]?)?(?:\(\d{2,5}\)\s?)?\d{1,12}(?:[\s-]\d{1,12}){0,5}(?!\d|\.\d))'
+)
+# E.164 numbers have at most 15 digits; national numbers with area code at least 10.
+MIN_PHONE_DIGITS = 10
+MAX_PHONE_DIGITS = 15
+SENSITIVE_KEYS = frozenset({'contact', 'email', 'mobile', 'phone', 'password', 'password_hash'})
 
 
 def mask_phi(text: str | None) -> str | None:
     if text is None:
         return None
-    text = EMAIL_RE.sub('[email]', text)
-    text = PHONE_RE.sub('[phone]', text)
-    return text
+    return PHI_RE.sub(_placeholder, text)
+
+
+def mask_json(value: Any) -> Any:
+    """Mask PHI inside decoded JSON (dicts, lists, strings) without stringifying it."""
+    if isinstance(value, str):
+        return PHI_RE.sub(_placeholder, value)
+    if isinstance(value, dict):
+        return {
+            key: '[redacted]' if isinstance(key, str) and key.lower() in SENSITIVE_KEYS and item else mask_json(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [mask_json(item) for item in value]
+    return value
+
+
+def _placeholder(match: re.Match) -> str:
+    if match.lastgroup == 'phone':
+        digits = sum(ch.isdigit() for ch in match.group())
+        if not MIN_PHONE_DIGITS <= digits <= MAX_PHONE_DIGITS:
+            return match.group()
+    return f'[{match.lastgroup}]'
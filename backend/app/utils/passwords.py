@@ -1,21 +1,80 @@
+import asyncio
 import binascii
 import hashlib
 import secrets
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import settings
 
 PBKDF2_ITERATIONS = 120_000
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+# hashlib's KDFs release the GIL, so a small thread pool keeps them off the event loop.
+_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash')
 
 def normalize_mobile(mobile: str) -> str:
     return ''.join(ch for ch in mobile if ch.isdigit() or ch == '+')
 
 def hash_password(password: str) -> str:
+    """Hash with the current scheme: `$scrypt$n=..,r=..,p=..$salt$hash` (PBKDF2 if scrypt is unavailable)."""
     salt = secrets.token_hex(16)
-    dk = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), PBKDF2_ITERATIONS)
-    return f'{salt}${binascii.hexlify(dk).decode("ascii")}'
+    if hasattr(hashlib, 'scrypt'):
+        dk = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return f'$scrypt$n={SCRYPT_N},r={SCRYPT_R},p={SCRYPT_P}${salt}${dk}'
+    dk = _pbkdf2(password, salt, PBKDF2_ITERATIONS)
+    return f'$pbkdf2-sha256$i={PBKDF2_ITERATIONS}${salt}${dk}'
 
 def verify_password(password: str, stored: str) -> bool:
+    parsed = _parse(stored)
+    if parsed is None:
+        return False
+    scheme, params, salt, expected_hex = parsed
     try:
-        salt, expected_hex = stored.split('$', 1)
-    except ValueError:
+        if scheme == 'scrypt':
+            actual = _scrypt(password, salt, params['n'], params['r'], params['p'])
+        else:
+            actual = _pbkdf2(password, salt, params['i'])
+    except (KeyError, ValueError):
         return False
-    dk = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), PBKDF2_ITERATIONS)
-    return secrets.compare_digest(binascii.hexlify(dk).decode('ascii'), expected_hex)
+    return secrets.compare_digest(actual, expected_hex)
+
+def needs_rehash(stored: str) -> bool:
+    """True when a hash was made with an older scheme or weaker parameters than hash_password uses now."""
+    parsed = _parse(stored)
+    if parsed is None:
+        return True
+    scheme, params, _, _ = parsed
+    if hasattr(hashlib, 'scrypt'):
+        return scheme != 'scrypt' or params != {'n': SCRYPT_N, 'r': SCRYPT_R, 'p': SCRYPT_P}
+    return scheme != 'pbkdf2-sha256' or params.get('i', 0) < PBKDF2_ITERATIONS
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_executor, hash_password, password)
+
+async def verify_password_async(password: str, stored: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(_executor, verify_password, password, stored)
+
+def _parse(stored: str) -> tuple[str, dict, str, str] | None:
+    if not stored:
+        return None
+    if not stored.startswith('$'):
+        # Legacy unversioned format: "<salt>$<pbkdf2 hex>".
+        salt, sep, expected_hex = stored.partition('$')
+        return ('pbkdf2-sha256', {'i': PBKDF2_ITERATIONS}, salt, expected_hex) if sep else None
+    parts = stored.split('$')
+    if len(parts) != 5 or parts[1] not in ('scrypt', 'pbkdf2-sha256'):
+        return None
+    try:
+        params = {key: int(value) for key, value in (item.split('=', 1) for item in parts[2].split(','))}
+    except ValueError:
+        return None
+    return parts[1], params, parts[3], parts[4]
+
+def _pbkdf2(password: str, salt: str, iterations: int) -> str:
+    dk = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), iterations)
+    return binascii.hexlify(dk).decode('ascii')
+
+def _scrypt(password: str, salt: str, n: int, r: int, p: int) -> str:
+    dk = hashlib.scrypt(password.encode('utf-8'), salt=salt.encode('utf-8'), n=n, r=r, p=p, maxmem=128 * r * (n + p + 2), dklen=32)
+    return binascii.hexlify(dk).decode('ascii')
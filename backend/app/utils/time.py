@@ -1,4 +1,22 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, time, timedelta, timezone
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite drops tzinfo on round-trip; stored timestamps are always UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def utc_day_range(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+def last_days_range(days: int, now: datetime | None = None) -> tuple[datetime, datetime]:
+    """Half-open [start, end) covering today and the previous `days - 1` UTC days."""
+    end = utc_day_range((now or utc_now()).date())[1]
+    return end - timedelta(days=max(days, 1)), end
@@ -0,0 +1,133 @@
+"""Cold-start profile of the API process.
+
+Each run starts a fresh interpreter under `python -X importtime`, imports
+app.main, runs the startup hooks and serves one `/health` request. The
+report gives the median import and time-to-ready, the packages with the
+highest import self time, and any heavy optional dependency that was loaded
+before the first request.
+
+    cd backend && python -m benchmarks.cold_start --runs 5 --json cold.json
+
+The run exits non-zero if median time-to-ready is over --budget-ms or if a
+module in HEAVY_MODULES was loaded at startup.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+# Only needed by uploads, OCR, model calls and retrieval, never by startup.
+HEAVY_MODULES = ('fitz', 'PIL', 'openai', 'numpy', 'requests', 'httpx')
+
+
+def child() -> None:
+    started = time.perf_counter()
+    import app.main
+
+    imported = time.perf_counter()
+    ready = asyncio.run(_serve_health(app.main.app))
+    print(json.dumps({
+        'import_ms': round((imported - started) * 1000, 1),
+        'ready_ms': round((ready - started) * 1000, 1),
+        'heavy_loaded': [name for name in HEAVY_MODULES if name in sys.modules],
+    }))
+
+
+async def _serve_health(asgi_app) -> float:
+    """Start the app, answer /health and return when the response was sent (before shutdown)."""
+    # A bare ASGI call, so no HTTP client is imported for the probe.
+    sent: list[dict] = []
+
+    async def receive() -> dict:
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': '/health', 'raw_path': b'/health', 'root_path': '', 'query_string': b'', 'headers': [],
+        'client': ('bench', 0), 'server': ('bench', 80),
+    }
+    async with asgi_app.router.lifespan_context(asgi_app):
+        await asgi_app(scope, receive, send)
+        ready = time.perf_counter()
+    status = next(m['status'] for m in sent if m['type'] == 'http.response.start')
+    if status != 200:
+        raise SystemExit(f'/health returned {status}')
+    return ready
+
+
+def run_once(work_dir: str) -> tuple[dict, Counter]:
+    env = {
+        'LLM_BACKEND': 'fake',
+        'DATABASE_URL': f'sqlite+aiosqlite:///{work_dir}/cold.db',
+        'UPLOAD_DIR': os.path.join(work_dir, 'uploads'),
+        **os.environ,
+    }
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'benchmarks.cold_start', '--child'],
+        capture_output=True, text=True, env=env, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    self_us: Counter = Counter()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        self_us[name.strip().split('.')[0]] += int(own)
+    return json.loads(proc.stdout.strip().splitlines()[-1]), self_us
+
+
+def main(args: argparse.Namespace) -> int:
+    work_dir = tempfile.mkdtemp(prefix='cold-start-')
+    results = []
+    packages: Counter = Counter()
+    for _ in range(args.runs):
+        result, self_us = run_once(work_dir)
+        results.append(result)
+        packages.update(self_us)
+    summary = {
+        'runs': args.runs,
+        'import_ms_median': statistics.median(r['import_ms'] for r in results),
+        'ready_ms_median': statistics.median(r['ready_ms'] for r in results),
+        'heavy_loaded': sorted({name for r in results for name in r['heavy_loaded']}),
+        'top_packages_ms': {name: round(us / args.runs / 1000, 1) for name, us in packages.most_common(args.top)},
+    }
+    print(f"import  {summary['import_ms_median']:>8} ms (median of {args.runs})")
+    print(f"ready   {summary['ready_ms_median']:>8} ms (budget {args.budget_ms} ms)")
+    print('top packages by import self time:')
+    for name, ms in summary['top_packages_ms'].items():
+        print(f'  {name:<24} {ms:>8} ms')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+    failures = []
+    if summary['heavy_loaded']:
+        failures.append(f"heavy modules loaded at startup: {', '.join(summary['heavy_loaded'])}")
+    if summary['ready_ms_median'] > args.budget_ms:
+        failures.append(f"time to ready {summary['ready_ms_median']} ms exceeds budget {args.budget_ms} ms")
+    for failure in failures:
+        print(f'OVER BUDGET {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Profile API cold start.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--budget-ms', type=float, default=900.0)
+    parser.add_argument('--json', help='Write the summary to this file.')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+    else:
+        sys.exit(main(args))
@@ -0,0 +1,133 @@
+"""Concurrent write throughput of the engine factory's SQLite profiles (or a Postgres URL).
+
+Writers each commit small transactions that insert a document row (as an upload
+does) while readers keep listing documents. Every profile runs against a fresh
+database built with app.db.engine.build_engine, and the run reports commits/s,
+commit latency, read throughput, failures and mean pool wait.
+
+    cd backend && python -m benchmarks.db_write_bench --writers 16 --readers 4 --commits 200
+
+Profiles: `rollback` (journal_mode=DELETE, synchronous=FULL, the SQLite
+defaults) and `tuned` (the DB_SQLITE_* settings). With --url only that database
+is measured, using the settings as configured.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import os
+import re
+import tempfile
+import time
+
+from sqlalchemy import insert, select
+
+from app.db.base import Base
+from app.db.engine import build_engine
+from app.models.document import Document
+from app.models.patient import Patient
+from app.orchestration.tracing import metrics
+
+import app.models  # noqa: F401  (register every table for create_all)
+
+PROFILES = {
+    'rollback': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+    'tuned': {},
+}
+NOTE = 'Vitals: BP 140/90, HR 88. Medications: metformin 500mg twice daily. ' * 60
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+async def run_profile(name: str, url: str, pragmas: dict, args: argparse.Namespace) -> dict:
+    metrics.reset()
+    engine = build_engine(url, pragmas=pragmas)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        patient_id = (await conn.execute(insert(Patient).values(name='Bench', age=50).returning(Patient.id))).scalar_one()
+
+    commit_ms: list[float] = []
+    failures = 0
+    reads = 0
+    writing = True
+
+    async def writer() -> None:
+        nonlocal failures
+        for _ in range(args.commits):
+            started = time.perf_counter()
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(insert(Document).values(
+                        patient_id=patient_id, file_path='bench', mime_type='text/plain', extracted_text=NOTE,
+                        has_text=True, char_count=len(NOTE), preview=NOTE[:300],
+                    ))
+            except Exception:
+                failures += 1
+                continue
+            commit_ms.append((time.perf_counter() - started) * 1000)
+
+    async def reader() -> None:
+        nonlocal reads, failures
+        while writing:
+            try:
+                async with engine.connect() as conn:
+                    await conn.execute(select(Document.id, Document.preview).where(Document.patient_id == patient_id).order_by(Document.id.desc()).limit(50))
+                reads += 1
+            except Exception:
+                failures += 1
+            await asyncio.sleep(0)
+
+    readers = [asyncio.create_task(reader()) for _ in range(args.readers)]
+    started = time.perf_counter()
+    await asyncio.gather(*(writer() for _ in range(args.writers)))
+    elapsed = time.perf_counter() - started
+    writing = False
+    await asyncio.gather(*readers)
+    await engine.dispose()
+    wait_sum, wait_count = _pool_wait()
+    return {
+        'profile': name,
+        'commits': len(commit_ms),
+        'failures': failures,
+        'commits_per_s': round(len(commit_ms) / elapsed, 1),
+        'commit_p50_ms': round(percentile(commit_ms, 50), 2),
+        'commit_p95_ms': round(percentile(commit_ms, 95), 2),
+        'reads_per_s': round(reads / elapsed, 1),
+        'pool_wait_mean_ms': round(wait_sum / wait_count * 1000, 3) if wait_count else 0.0,
+    }
+
+
+def _pool_wait() -> tuple[float, int]:
+    rendered = metrics.render()
+    total = re.search(r'^db_pool_wait_seconds_sum (\S+)$', rendered, re.M)
+    count = re.search(r'^db_pool_wait_seconds_count (\S+)$', rendered, re.M)
+    return (float(total.group(1)), int(count.group(1))) if total and count else (0.0, 0)
+
+
+async def main(args: argparse.Namespace) -> None:
+    print(f"{'profile':<10} {'commits':>8} {'fail':>5} {'commit/s':>9} {'p50':>8} {'p95':>8} {'reads/s':>8} {'wait':>8}")
+    if args.url:
+        runs = [('configured', args.url, {})]
+    else:
+        work_dir = tempfile.mkdtemp(prefix='db-write-bench-')
+        runs = [(name, f'sqlite+aiosqlite:///{os.path.join(work_dir, name)}.db', pragmas) for name, pragmas in PROFILES.items()]
+    for name, url, pragmas in runs:
+        row = await run_profile(name, url, pragmas, args)
+        print(
+            f"{row['profile']:<10} {row['commits']:>8} {row['failures']:>5} {row['commits_per_s']:>9} "
+            f"{row['commit_p50_ms']:>8} {row['commit_p95_ms']:>8} {row['reads_per_s']:>8} {row['pool_wait_mean_ms']:>8}",
+            flush=True,
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure concurrent commit throughput per engine profile.')
+    parser.add_argument('--writers', type=int, default=16)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--commits', type=int, default=200, help='Commits per writer.')
+    parser.add_argument('--url', help='Benchmark this DATABASE_URL instead of the SQLite profiles.')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,247 @@
+"""End-to-end benchmark of the patient pipeline against the fake LLM/OCR backend.
+
+Drives upload -> profile build -> triage -> summary -> hospital ranking through the
+ASGI app for synthetic corpora of increasing size and reports per stage p50/p95/p99
+latency, throughput, DB queries per request and the stage's own peak RSS
+(sampled from /proc/self/statm while the stage runs, plus the rise over its start).
+
+    cd backend && python -m benchmarks.pipeline_bench --sizes 10 100 500 --json out.json
+    python -m benchmarks.pipeline_bench --sizes 10 100 500 --baseline out.json
+
+With --baseline the run exits non-zero when any stage's p95 regresses by more
+than --max-regression (default 20%). Environment variables already set (e.g. a
+Postgres DATABASE_URL or FAKE_BACKEND_LATENCY_MS) take precedence over the
+defaults below.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+WORK_DIR = tempfile.mkdtemp(prefix='pipeline-bench-')
+os.environ.setdefault('LLM_BACKEND', 'fake')
+os.environ.setdefault('DATABASE_URL', f'sqlite+aiosqlite:///{WORK_DIR}/bench.db')
+os.environ.setdefault('UPLOAD_DIR', os.path.join(WORK_DIR, 'uploads'))
+os.environ.setdefault('MCP_HOSPITAL_BASE_URL', 'http://127.0.0.1:9')
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+STAGES = ('upload', 'profile_build', 'triage', 'summary', 'hospital_ranking')
+NOTE_LINES = (
+    'Chief complaint: chest tightness for {days} days, worse on exertion.',
+    'History of hypertension and type 2 diabetes.',
+    'Medications: metformin 500mg twice daily, amlodipine 5mg once daily, atorvastatin 20mg at night.',
+    'Allergies: penicillin (rash).',
+    'Vitals: BP {sys}/{dia}, HR {hr}, SpO2 {spo2}%.',
+    'Plan: ECG, troponin, follow up with cardiology.',
+)
+
+
+class RssSampler:
+    """Peak resident set size while a block runs, sampled on a thread so blocking work is seen too.
+
+    ru_maxrss is a process-lifetime high-water mark, so it can't separate stages.
+    Without /proc (e.g. macOS) the fields are None.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.start_mb: float | None = None
+        self.peak_mb: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> 'RssSampler':
+        self.start_mb = self.peak_mb = _current_rss_mb()
+        if self.start_mb is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        current = _current_rss_mb()
+        if current is not None and current > self.peak_mb:
+            self.peak_mb = current
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.count = 0
+        event.listen(engine.sync_engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+def synthetic_note(rng: random.Random, lines: int) -> str:
+    values = {
+        'days': rng.randint(1, 14), 'sys': rng.randint(110, 170), 'dia': rng.randint(70, 100),
+        'hr': rng.randint(55, 110), 'spo2': rng.randint(90, 99),
+    }
+    return '\n'.join(NOTE_LINES[i % len(NOTE_LINES)].format(**values) for i in range(lines))
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_stage(name: str, calls: list, concurrency: int, counter: QueryCounter) -> dict:
+    slots = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def timed(call) -> None:
+        nonlocal errors
+        async with slots:
+            started = time.perf_counter()
+            response = await call()
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    queries_before = counter.count
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        await asyncio.gather(*(timed(call) for call in calls))
+        elapsed = time.perf_counter() - started
+    return {
+        'stage': name,
+        'requests': len(calls),
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'throughput_rps': round(len(calls) / elapsed, 2) if elapsed else None,
+        'queries_per_request': round((counter.count - queries_before) / max(1, len(calls)), 2),
+        'peak_rss_mb': _round(rss.peak_mb),
+        'rss_delta_mb': _round(rss.peak_mb - rss.start_mb if rss.start_mb is not None else None),
+    }
+
+
+async def run_size(client: httpx.AsyncClient, size: int, args: argparse.Namespace, counter: QueryCounter) -> list[dict]:
+    rng = random.Random(args.seed + size)
+    patient_ids = []
+    for i in range(size):
+        response = await client.post('/api/v1/patients', json={'name': f'Bench Patient {size}-{i}', 'age': rng.randint(20, 90)})
+        patient_ids.append(response.json()['id'])
+
+    def upload(pid: int, n: int):
+        files = {'file': (f'note-{n}.txt', synthetic_note(rng, args.note_lines).encode(), 'text/plain')}
+        return lambda: client.post(f'/api/v1/patients/{pid}/uploads', files=files)
+
+    plans = {
+        'upload': [upload(pid, n) for pid in patient_ids for n in range(args.docs_per_patient)],
+        'profile_build': [lambda pid=pid: client.post(f'/api/v1/patients/{pid}/profile/build') for pid in patient_ids],
+        'triage': [lambda pid=pid: client.post(f'/api/v1/patients/{pid}/triage') for pid in patient_ids],
+        'summary': [lambda pid=pid: client.get(f'/api/v1/patients/{pid}/summary') for pid in patient_ids],
+        'hospital_ranking': [
+            lambda pid=pid: client.get(f'/api/v1/patients/{pid}/hospitals/recommendations') for pid in patient_ids
+        ],
+    }
+    results = []
+    for stage in STAGES:
+        result = await run_stage(stage, plans[stage], args.concurrency, counter)
+        results.append({'size': size, **result})
+        print(_format_row(results[-1]), flush=True)
+    return results
+
+
+async def main(args: argparse.Namespace) -> list[dict]:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    counter = QueryCounter()
+    transport = httpx.ASGITransport(app=app)
+    print(_format_header())
+    results: list[dict] = []
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+        for size in args.sizes:
+            results.extend(await run_size(client, size, args, counter))
+    await engine.dispose()
+    return results
+
+
+def compare(results: list[dict], baseline: list[dict], max_regression: float) -> list[str]:
+    previous = {(row['size'], row['stage']): row for row in baseline}
+    failures = []
+    for row in results:
+        before = previous.get((row['size'], row['stage']))
+        if before and before['p95_ms'] and row['p95_ms'] > before['p95_ms'] * (1 + max_regression):
+            failures.append(f"size={row['size']} {row['stage']}: p95 {before['p95_ms']}ms -> {row['p95_ms']}ms")
+    return failures
+
+
+def _current_rss_mb() -> float | None:
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * PAGE_SIZE / (1024 * 1024)
+
+
+def _round(value: float | None) -> float | None:
+    return round(value, 1) if value is not None else None
+
+
+def _format_header() -> str:
+    return f"{'size':>6} {'stage':<17} {'reqs':>6} {'err':>4} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>8} {'q/req':>6} {'rss':>7} {'+rss':>6}"
+
+
+def _format_row(row: dict) -> str:
+    return (
+        f"{row['size']:>6} {row['stage']:<17} {row['requests']:>6} {row['errors']:>4} "
+        f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} {row['throughput_rps']:>8} "
+        f"{row['queries_per_request']:>6} {str(row['peak_rss_mb']):>7} {str(row['rss_delta_mb']):>6}"
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the patient pipeline end to end.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 500], help='Patients per corpus (cumulative DB).')
+    parser.add_argument('--docs-per-patient', type=int, default=3)
+    parser.add_argument('--note-lines', type=int, default=30)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Write results to this file.')
+    parser.add_argument('--baseline', help='Compare p95 against a previous --json output.')
+    parser.add_argument('--max-regression', type=float, default=0.2)
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args()
+    logging.getLogger().setLevel(args.log_level)
+    results = asyncio.run(main(args))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = compare(results, json.load(f), args.max_regression)
+        for failure in failures:
+            print(f'REGRESSION {failure}')
+        sys.exit(1 if failures else 0)
@@ -0,0 +1,114 @@
+"""Serialization and compression cost of large API responses.
+
+Builds a large profile response (PatientProfileOut) and a long document listing
+(list[DocumentDetailOut]). Each payload is serialized three ways:
+- jsonable_encoder + json.dumps, which is FastAPI's path for routes without a
+  response model
+- orjson over model_dump()
+- Pydantic's TypeAdapter.dump_json, which is FastAPI's path for routes with a
+  response model
+It then compresses the JSON with gzip and (if installed) brotli at the levels
+the middleware uses.
+
+    cd backend && python -m benchmarks.serialization_bench --docs 2000 --conditions 500
+"""
+from __future__ import annotations
+import argparse
+import gzip
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.schemas.ingestion import DocumentDetailOut
+from app.schemas.patient import PatientProfileOut
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import brotli
+except Exception:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+def profile_payload(conditions: int) -> PatientProfileOut:
+    return PatientProfileOut(
+        patient_id=1,
+        version=3,
+        created_at='2026-01-31T09:00:00',
+        profile={
+            'conditions': [f'condition {i}: hypertension stage {i % 3}' for i in range(conditions)],
+            'allergies': ['penicillin', 'sulfa'],
+            'medications': [
+                {'name': f'medication-{i}', 'dose': f'{5 * (i % 20 + 1)}mg', 'frequency': 'twice daily', 'route': 'oral'}
+                for i in range(conditions)
+            ],
+            'vitals': {'bp': '140/90', 'hr': 88, 'spo2': 97},
+            'timeline': [f'day {i}: chest tightness on exertion, resolved with rest' for i in range(conditions)],
+            'missing_fields': ['smoking_status'],
+        },
+    )
+
+
+def document_payload(docs: int) -> list[DocumentDetailOut]:
+    preview = 'Chief complaint: chest tightness for 3 days, worse on exertion. History of hypertension. ' * 4
+    return [
+        DocumentDetailOut(document_id=i, mime_type='application/pdf', has_text=True, char_count=40_000 + i, text_preview=preview[:300])
+        for i in range(docs)
+    ]
+
+
+def best_of(fn, repeat: int) -> tuple[float, bytes]:
+    best = float('inf')
+    out = b''
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, out
+
+
+def run(name: str, value, adapter: TypeAdapter, repeat: int) -> list[dict]:
+    serializers = {
+        'jsonable_encoder+json': lambda: json.dumps(jsonable_encoder(value), separators=(',', ':')).encode(),
+        'pydantic dump_json': lambda: adapter.dump_json(value),
+    }
+    if orjson is not None:
+        serializers['orjson(model_dump)'] = lambda: orjson.dumps(adapter.dump_python(value, mode='json'))
+    rows = []
+    body = b''
+    for label, fn in serializers.items():
+        ms, body = best_of(fn, repeat)
+        rows.append({'payload': name, 'step': label, 'ms': round(ms, 3), 'bytes': len(body)})
+    compressors = {f'gzip-{settings.GZIP_LEVEL}': lambda: gzip.compress(body, settings.GZIP_LEVEL)}
+    if brotli is not None:
+        compressors[f'brotli-{settings.BROTLI_QUALITY}'] = lambda: brotli.compress(body, quality=settings.BROTLI_QUALITY)
+    for label, fn in compressors.items():
+        ms, out = best_of(fn, repeat)
+        rows.append({'payload': name, 'step': label, 'ms': round(ms, 3), 'bytes': len(out)})
+    return rows
+
+
+def main(args: argparse.Namespace) -> None:
+    rows = run('profile', profile_payload(args.conditions), TypeAdapter(PatientProfileOut), args.repeat)
+    rows += run('documents', document_payload(args.docs), TypeAdapter(list[DocumentDetailOut]), args.repeat)
+    print(f"{'payload':<10} {'step':<24} {'ms':>9} {'bytes':>10}")
+    for row in rows:
+        print(f"{row['payload']:<10} {row['step']:<24} {row['ms']:>9} {row['bytes']:>10}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark response serialization and compression.')
+    parser.add_argument('--docs', type=int, default=2000)
+    parser.add_argument('--conditions', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', help='Write results to this file.')
+    main(parser.parse_args())
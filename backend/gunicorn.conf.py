@@ -0,0 +1,36 @@
+"""Production server profile: Gunicorn master with preloaded app and uvicorn workers.
+
+    cd backend && gunicorn -c gunicorn.conf.py app.main:app
+
+The master creates the schema once before forking (workers skip create_all) and
+workers share /metrics through snapshots in METRICS_SHARED_DIR.
+"""
+import asyncio
+import multiprocessing
+import os
+import shutil
+
+os.environ.setdefault('DB_AUTO_CREATE', 'false')
+os.environ.setdefault('METRICS_SHARED_DIR', '/dev/shm/patient-hospital-metrics' if os.path.isdir('/dev/shm') else '/tmp/patient-hospital-metrics')
+
+bind = os.environ.get('BIND') or '0.0.0.0:8000'
+workers = int(os.environ.get('WEB_CONCURRENCY') or multiprocessing.cpu_count())
+worker_class = 'uvicorn.workers.UvicornWorker'
+preload_app = True
+# Long audio uploads transcribe inside the request.
+timeout = int(os.environ.get('GUNICORN_TIMEOUT') or 300)
+graceful_timeout = 30
+keepalive = 5
+accesslog = '-'
+
+def on_starting(server) -> None:
+    from app.db.migrate import migrate
+
+    shutil.rmtree(os.environ['METRICS_SHARED_DIR'], ignore_errors=True)
+    asyncio.run(migrate())
+
+def post_fork(server, worker) -> None:
+    from app.db.session import engine
+
+    # The preloaded engine must not share pooled connections with the master.
+    engine.sync_engine.dispose(close=False)
@@ -0,0 +1,49 @@
+import asyncio
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import app.models  # noqa: F401
+from app.db.base import Base
+from app.db.engine import build_engine
+from app.models.audit import AuditLog
+from app.orchestration.tracing import Metrics
+from app.services import audit_log_service
+from app.services.audit_log_service import AuditSink
+
+def _entry(action: str) -> dict:
+    return {'trace_id': 't', 'patient_id': None, 'actor': 'test', 'action': action}
+
+def test_audit_sink_drops_on_overflow_without_blocking_and_flushes_on_close(tmp_path, monkeypatch):
+    registry = Metrics()
+    monkeypatch.setattr(audit_log_service, 'metrics', registry)
+    monkeypatch.setattr(audit_log_service, 'FLUSH_SECONDS', 0.5)
+
+    async def scenario():
+        engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sink = AuditSink(session_factory=async_sessionmaker(engine, expire_on_commit=False), maxsize=3)
+        sink.start()
+        # On the loop thread a full queue drops instead of blocking.
+        for i in range(5):
+            sink.emit_nowait(_entry(f'loop-{i}'))
+        pending = sink.pending()
+        # Worker threads hand entries to the loop without waiting. The background task
+        # has taken one row for its batch, so one fits and the next is dropped.
+        await asyncio.to_thread(lambda: [sink.emit_nowait(_entry(f'thread-{i}')) for i in range(2)])
+        await asyncio.sleep(0)
+        await sink.close()
+        async with engine.connect() as conn:
+            actions = (await conn.execute(select(AuditLog.action).order_by(AuditLog.id))).scalars().all()
+            count = (await conn.execute(select(func.count()).select_from(AuditLog))).scalar_one()
+        await engine.dispose()
+        return pending, actions, count, sink.pending()
+
+    pending, actions, count, after_close = asyncio.run(scenario())
+    assert pending == 3
+    assert actions == ['loop-0', 'loop-1', 'loop-2', 'thread-0'] and count == 4
+    assert after_close == 0
+    text = registry.render()
+    assert 'audit_rows_dropped_total 3' in text
+    assert 'audit_rows_written_total 4' in text
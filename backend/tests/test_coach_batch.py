@@ -0,0 +1,103 @@
+import asyncio
+from datetime import date, datetime
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import app.models  # noqa: F401
+from app.db.base import Base
+from app.db.engine import build_engine
+from app.models.coach import CoachBatchRun, CoachMessage
+from app.models.medication import MedicationPlan
+from app.models.patient import Patient
+from app.orchestration import coach_batch
+
+RUN_DATE = date(2026, 1, 31)
+
+def _setup(tmp_path, monkeypatch, fail_names):
+    class FakeTTS:
+        def synthesize(self, script):
+            return str(tmp_path / f"{abs(hash(script))}.mp3")
+
+    def fake_script(input_text):
+        name = input_text.splitlines()[0].removeprefix('Patient name: ')
+        if name in fail_names:
+            raise RuntimeError('llm down')
+        return f'Hello {name}'
+
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setattr(coach_batch, 'SessionLocal', async_sessionmaker(engine, expire_on_commit=False))
+    monkeypatch.setattr(coach_batch, 'coach_script', fake_script)
+    monkeypatch.setattr(coach_batch, 'TTSService', FakeTTS)
+    return engine
+
+async def _seed(engine, names):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        ids = []
+        for name in names:
+            patient_id = (await conn.execute(insert(Patient).values(name=name).returning(Patient.id))).scalar_one()
+            await conn.execute(insert(MedicationPlan).values(
+                patient_id=patient_id, plan_json={}, active=True, start_date=RUN_DATE.isoformat(),
+            ))
+            ids.append(patient_id)
+    return ids
+
+async def _messages(engine):
+    async with engine.connect() as conn:
+        rows = await conn.execute(select(CoachMessage.patient_id, CoachMessage.created_at).order_by(CoachMessage.id))
+        return rows.all()
+
+def test_batch_chunks_and_skips_only_messages_from_the_run_date(tmp_path, monkeypatch):
+    engine = _setup(tmp_path, monkeypatch, fail_names=set())
+    loaded: list[list[int]] = []
+    load_contexts = coach_batch._load_contexts
+
+    async def record_chunks(session, patient_ids, run_date):
+        loaded.append(list(patient_ids))
+        return await load_contexts(session, patient_ids, run_date)
+
+    monkeypatch.setattr(coach_batch, '_load_contexts', record_chunks)
+
+    async def scenario():
+        ids = await _seed(engine, ['A', 'B', 'C', 'D', 'E'])
+        async with engine.begin() as conn:
+            await conn.execute(insert(CoachMessage), [
+                # Already generated on the run date: skipped.
+                {'patient_id': ids[1], 'script_text': 's', 'audio_path': 'a.mp3', 'created_at': datetime(2026, 1, 31, 23, 59)},
+                # Generated the next day (e.g. when backfilling): not a reason to skip.
+                {'patient_id': ids[2], 'script_text': 's', 'audio_path': 'b.mp3', 'created_at': datetime(2026, 2, 1, 0, 0)},
+            ])
+        stats = await coach_batch.run_coach_batch(RUN_DATE, chunk_size=2)
+        messages = await _messages(engine)
+        await engine.dispose()
+        return ids, stats, messages
+
+    ids, stats, messages = asyncio.run(scenario())
+    assert loaded == [ids[0:2], ids[2:4], ids[4:5]]
+    assert (stats['generated'], stats['skipped'], stats['failed']) == (4, 1, 0)
+    assert sorted(pid for pid, _ in messages[2:]) == [ids[0], ids[2], ids[3], ids[4]]
+
+def test_resumed_run_retries_failed_patients(tmp_path, monkeypatch):
+    fail_names = {'B'}
+    engine = _setup(tmp_path, monkeypatch, fail_names)
+
+    async def scenario():
+        ids = await _seed(engine, ['A', 'B', 'C'])
+        first = await coach_batch.run_coach_batch(RUN_DATE, chunk_size=2)
+        async with engine.connect() as conn:
+            failed_ids = (await conn.execute(select(CoachBatchRun.failed_patient_ids))).scalar_one()
+        fail_names.clear()
+        second = await coach_batch.run_coach_batch(RUN_DATE, chunk_size=2)
+        third = await coach_batch.run_coach_batch(RUN_DATE, chunk_size=2)
+        messages = await _messages(engine)
+        await engine.dispose()
+        return ids, first, failed_ids, second, third, messages
+
+    ids, first, failed_ids, second, third, messages = asyncio.run(scenario())
+    assert (first['generated'], first['failed']) == (2, 1)
+    assert failed_ids == [ids[1]]
+    assert (second['status'], second['generated'], second['failed']) == ('completed', 3, 0)
+    assert second['processed_this_invocation'] == 1
+    assert third['processed_this_invocation'] == 0
+    assert sorted(pid for pid, _ in messages) == ids
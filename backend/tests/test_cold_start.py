@@ -0,0 +1,11 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.cold_start import HEAVY_MODULES
+
+def test_app_import_does_not_load_heavy_dependencies():
+    code = f"import json, sys, app.main; print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=Path(__file__).parents[1])
+    assert json.loads(proc.stdout.strip().splitlines()[-1]) == []
@@ -0,0 +1,8 @@
+from app.core.compression import accepts_brotli
+
+def test_accepts_brotli_honours_q_zero():
+    assert accepts_brotli("gzip, deflate, br")
+    assert accepts_brotli("br;q=0.5, gzip")
+    assert not accepts_brotli("gzip, br;q=0")
+    assert not accepts_brotli("gzip, brotli")
+    assert not accepts_brotli("")
@@ -0,0 +1,70 @@
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import app.models  # noqa: F401
+from app.core.config import settings
+from app.db.base import Base
+from app.db.engine import build_engine
+from app.models.context import ContextChunk
+from app.services.context_store_service import (
+    CHUNK_CHARS, DIM, ROW_BYTES, ContextStore, chunk_text, top_k, vector_path, vectorize,
+)
+
+
+def test_chunk_text_packs_sentences_within_limit():
+    text = ' '.join(f'Sentence number {i} about chest pain.' for i in range(100))
+    chunks = chunk_text(text)
+    assert len(chunks) > 1
+    assert all(len(c) <= CHUNK_CHARS for c in chunks)
+    assert all(c.endswith('.') for c in chunks)
+    assert chunk_text('x' * (CHUNK_CHARS * 2 + 5)) == ['x' * CHUNK_CHARS, 'x' * CHUNK_CHARS, 'xxxxx']
+
+
+def test_vectorize_is_deterministic_and_normalised():
+    a = vectorize('Metformin 500 mg twice daily')
+    assert len(a) == DIM
+    assert list(a) == list(vectorize('metformin 500 MG twice daily'))
+    assert sum(v * v for v in a) == pytest.approx(1.0, rel=1e-5)
+    assert not any(vectorize(''))
+
+
+def test_top_k_ranks_relevant_chunks_first():
+    np = pytest.importorskip('numpy')
+    chunks = [
+        'Hemoglobin A1c 8.2 percent, metformin dose increased.',
+        'Patient reports knee pain after a fall.',
+        'Chest pain radiating to the left arm, troponin pending.',
+    ]
+    matrix = np.stack([np.frombuffer(vectorize(c).tobytes(), dtype=np.float32) for c in chunks])
+    query = np.frombuffer(vectorize('chest pain troponin').tobytes(), dtype=np.float32)
+    assert top_k(matrix, query, 2)[0] == 2
+
+
+def test_index_writes_vectors_only_after_commit(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'UPLOAD_DIR', str(tmp_path / 'uploads'))
+
+    async def scenario():
+        engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as session:
+            await ContextStore().index(session, 'document', 1, 1, 'Chest pain at rest.')
+            await session.rollback()
+            rolled_back = os.path.exists(vector_path())
+            await ContextStore().index(session, 'document', 2, 1, 'Metformin 500 mg twice daily.')
+            await session.commit()
+            chunk_id = (await session.execute(select(ContextChunk.id))).scalar_one()
+            count = (await session.execute(select(func.count()).select_from(ContextChunk))).scalar_one()
+        await engine.dispose()
+        return rolled_back, chunk_id, count
+
+    rolled_back, chunk_id, count = asyncio.run(scenario())
+    assert not rolled_back and count == 1
+    with open(vector_path(), 'rb') as f:
+        f.seek(chunk_id * ROW_BYTES)
+        assert f.read(ROW_BYTES) == vectorize('Metformin 500 mg twice daily.').tobytes()
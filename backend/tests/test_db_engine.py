@@ -0,0 +1,21 @@
+import asyncio
+
+from sqlalchemy import text
+
+from app.db.engine import TimedQueuePool, build_engine
+
+def test_sqlite_file_engine_applies_pragmas_and_pool(tmp_path):
+    async def pragmas():
+        engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+        async with engine.connect() as conn:
+            values = [(await conn.execute(text(f'PRAGMA {name}'))).scalar() for name in ('journal_mode', 'synchronous', 'busy_timeout')]
+        await engine.dispose()
+        return engine, values
+
+    engine, values = asyncio.run(pragmas())
+    assert isinstance(engine.sync_engine.pool, TimedQueuePool)
+    assert values == ['wal', 1, 5000]
+
+def test_sqlite_memory_engine_keeps_default_pool():
+    engine = build_engine('sqlite+aiosqlite://')
+    assert not isinstance(engine.sync_engine.pool, TimedQueuePool)
@@ -0,0 +1,53 @@
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import app.models  # noqa: F401
+from app.api.v1.routes import medications
+from app.db.base import Base
+from app.db.engine import build_engine
+from app.models.medication import DoseSchedule, MedicationPlan
+from app.models.patient import Patient
+from app.schemas.medication import DoseLogIn
+from app.services.adherence_service import AdherenceService
+from app.services.reminder_scheduler_service import ReminderSchedulerService
+from app.utils.time import utc_now
+
+def test_log_dose_races_missed_sweep_without_double_counting(tmp_path, monkeypatch):
+    async def scenario():
+        engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            patient_id = (await conn.execute(insert(Patient).values(name='P', age=60).returning(Patient.id))).scalar_one()
+            plan_id = (await conn.execute(insert(MedicationPlan).values(
+                patient_id=patient_id, plan_json={}, active=True, start_date=utc_now().date().isoformat(),
+            ).returning(MedicationPlan.id))).scalar_one()
+            dose_id = (await conn.execute(insert(DoseSchedule).values(
+                plan_id=plan_id, due_at=utc_now() - timedelta(minutes=5), med_name='metformin', dose='500mg', status='pending',
+            ).returning(DoseSchedule.id))).scalar_one()
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        scheduler = ReminderSchedulerService(session_factory=sessions)
+
+        load_dose = medications._load_dose
+        swept = False
+
+        async def load_then_sweep(session, *args):
+            # The sweep commits between the handler's read and its write.
+            nonlocal swept
+            dose = await load_dose(session, *args)
+            if not swept:
+                swept = True
+                await scheduler._mark_missed([dose_id])
+            return dose
+
+        monkeypatch.setattr(medications, '_load_dose', load_then_sweep)
+        async with sessions() as session:
+            for action in ('taken', 'skipped'):
+                await medications.log_dose(patient_id, dose_id, DoseLogIn(action=action, timestamp=utc_now()), session)
+            stats = await AdherenceService().stats(session, patient_id, 1)
+        await engine.dispose()
+        return stats
+
+    assert asyncio.run(scenario()) == {'taken': 0, 'missed': 0, 'skipped': 1}
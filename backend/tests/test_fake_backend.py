@@ -0,0 +1,16 @@
+from app.schemas.profile import PatientProfile
+from app.schemas.triage import TriageOut
+from app.services.fake_backend import FakeOpenAIClient, fake_ocr_payload
+from app.services.ingestion_service import _extract_text_from_nvidia_response
+
+def test_fake_json_is_schema_valid_and_deterministic():
+    client = FakeOpenAIClient()
+    triage = client.generate_json(TriageOut, "triage", "chest pain")
+    assert triage.level in {"GREEN", "AMBER", "RED"}
+    assert triage == client.generate_json(TriageOut, "triage", "chest pain")
+    profile = client.generate_json(PatientProfile, "profile", "notes")
+    assert profile.medications and all("name" in med for med in profile.medications)
+
+def test_fake_ocr_payload_parses_like_nim():
+    text = _extract_text_from_nvidia_response(fake_ocr_payload("data:image/png;base64,AAAA"))
+    assert text and len(text.splitlines()) >= 5
@@ -0,0 +1,19 @@
+from app.utils.masking import mask_json, mask_phi
+
+def test_mask_phi_masks_email_and_phone_in_one_pass():
+    text = "Reach jane.doe@example.org or +1 (555) 123-4567; seen 2026-01-31, BP 140/90."
+    assert mask_phi(text) == "Reach [email] or [phone]; seen 2026-01-31, BP 140/90."
+
+def test_mask_json_keeps_structure():
+    masked = mask_json({"contact": "555-123-4567", "notes": ["call 5551234567"], "age": 40})
+    assert masked == {"contact": "[redacted]", "notes": ["call [phone]"], "age": 40}
+
+def test_mask_phi_keeps_lab_ranges_and_dosing_sigs():
+    for text in ("Hb 12.5 (13.0-17.0) g/dL", "Paracetamol 500mg 1 - 0 - 1 for 5 days", "Metformin 1-0-1 x 5/7, WBC 11000 /uL"):
+        assert mask_phi(text) == text
+    assert mask_phi("+91 98765 43210 on 2026-01-31 5551234567") == "[phone] on 2026-01-31 [phone]"
+
+def test_mask_phi_leaves_adversarial_digit_runs_unchanged():
+    # Runs of short hyphenated groups are the backtracking worst case; none is a phone.
+    text = "a" * 100_000 + " " + "1-" * 20_000
+    assert mask_phi(text) == text
@@ -0,0 +1,26 @@
+from app.services.medication_normalizer_service import MedicationNormalizerService
+
+def test_extract_brand_names_and_dedupe():
+    svc = MedicationNormalizerService()
+    text = "Tab Crocin 500 mg TDS after food\nParacetamol 500mg\nLipitor 10mg at night"
+    meds, unresolved = svc.extract(text)
+    names = [m['name'] for m in meds]
+    assert names == ['paracetamol', 'atorvastatin']
+    assert meds[0]['dose'] == '500mg'
+    assert meds[0]['frequency'] == 'three times daily'
+    assert unresolved == []
+
+def test_fuzzy_match_and_unresolved_lines():
+    svc = MedicationNormalizerService()
+    meds, unresolved = svc.extract("Metfromin 500mg BD\nZorbitol 20mg daily\nStarted on Zorbitol BD\nTab Xylofen\nPatient feels better")
+    assert meds[0]['name'] == 'metformin'
+    assert unresolved == ['Zorbitol 20mg daily', 'Started on Zorbitol BD', 'Tab Xylofen']
+    assert svc.canonical('Co-Amoxiclav') == 'amoxicillin-clavulanate'
+
+def test_merge_keeps_conflicting_sigs():
+    svc = MedicationNormalizerService()
+    meds, _ = svc.extract("Crocin 500mg TDS\nParacetamol 650mg as needed\nDolo 500 mg")
+    assert [(m['name'], m['dose'], m['frequency']) for m in meds] == [
+        ('paracetamol', '500mg', 'three times daily'),
+        ('paracetamol', '650mg', 'as needed'),
+    ]
@@ -6,3 +6,27 @@ def test_build_schedule():
     schedule = svc.build_schedule(plan, days=1)
     assert len(schedule) == 2
     assert schedule[0]['med_name'] == 'amoxicillin'
+
+def test_build_schedule_multi_day_respects_end_date():
+    from datetime import date, datetime, timezone
+    svc = MedicationTrackerService()
+    plan = {"start_date": "2026-01-31", "duration_days": 3, "medications": [{"name": "amoxicillin", "dose": "500mg", "times": ["08:00", "20:00"]}]}
+    schedule = svc.build_schedule(plan, days=30, start=date(2026, 1, 31))
+    assert len(schedule) == 6
+    assert schedule[-1]['due_at'] == datetime(2026, 2, 2, 20, 0, tzinfo=timezone.utc)
+
+def test_build_schedule_converts_plan_timezone_to_utc():
+    from datetime import date, datetime, timezone
+    svc = MedicationTrackerService()
+    plan = {"timezone": "Asia/Kolkata", "medications": [{"name": "metformin", "dose": "500mg", "times": ["08:00"]}]}
+    schedule = svc.build_schedule(plan, days=1, start=date(2026, 1, 31))
+    assert schedule[0]['due_at'] == datetime(2026, 1, 31, 2, 30, tzinfo=timezone.utc)
+
+def test_plan_input_rejects_unreadable_times():
+    import pytest
+    from pydantic import ValidationError
+    from app.schemas.medication import MedicationPlanIn
+    MedicationPlanIn(plan={"medications": [{"name": "metformin", "times": ["08:00", "20:30"]}]})
+    for plan in ({"medications": [{"name": "metformin", "times": ["8am"]}]}, {"medications": [{"name": "metformin", "times": "08:00"}]}):
+        with pytest.raises(ValidationError):
+            MedicationPlanIn(plan=plan)
@@ -0,0 +1,43 @@
+from sqlalchemy import create_engine, select, text
+
+from app.core.config import settings
+from app.db.migrate import upgrade
+from app.models.context import ContextChunk
+from app.models.document import Document
+from app.models.medication import AdherenceDaily, DoseSchedule, MedicationPlan
+from app.services.context_store_service import ROW_BYTES
+
+# Tables as an earlier release created them: no listing columns, no watermark, ISO string due times.
+LEGACY_DDL = (
+    "CREATE TABLE patients (id INTEGER PRIMARY KEY, name VARCHAR(200), age INTEGER, sex VARCHAR(50), "
+    "contact_masked VARCHAR(200), created_at DATETIME)",
+    "CREATE TABLE documents (id INTEGER PRIMARY KEY, patient_id INTEGER, file_path VARCHAR(500), "
+    "mime_type VARCHAR(100), extracted_text TEXT, created_at DATETIME)",
+    "CREATE TABLE medication_plans (id INTEGER PRIMARY KEY, patient_id INTEGER, plan_json JSON, active BOOLEAN, "
+    "start_date VARCHAR(50), created_at DATETIME)",
+    "CREATE TABLE dose_schedules (id INTEGER PRIMARY KEY, plan_id INTEGER, due_at VARCHAR(50), med_name VARCHAR(200), "
+    "dose VARCHAR(100), status VARCHAR(20))",
+    "INSERT INTO patients (id, name) VALUES (1, 'A')",
+    "INSERT INTO documents (id, patient_id, file_path, mime_type, extracted_text) VALUES (1, 1, 'x', 'text/plain', 'Chest pain')",
+    "INSERT INTO medication_plans (id, patient_id, plan_json, active, start_date) VALUES (1, 1, '{}', 1, '2026-01-30')",
+    "INSERT INTO dose_schedules (plan_id, due_at, med_name, dose, status) VALUES "
+    "(1, '2026-01-31T08:00:00Z', 'm', '1', 'taken'), (1, '2026-01-31T20:00:00Z', 'm', '1', 'missed')",
+)
+
+def test_upgrade_brings_legacy_sqlite_schema_to_current_models(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'UPLOAD_DIR', str(tmp_path / 'uploads'))
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        for statement in LEGACY_DDL:
+            conn.execute(text(statement))
+    for _ in range(2):
+        with engine.begin() as conn:
+            upgrade(conn)
+    with engine.connect() as conn:
+        assert conn.execute(select(Document.has_text, Document.char_count, Document.preview)).one() == (True, 10, 'Chest pain')
+        assert conn.execute(select(MedicationPlan.materialized_until)).scalar() == '2026-01-31'
+        assert [d.hour for d in conn.execute(select(DoseSchedule.due_at).order_by(DoseSchedule.id)).scalars()] == [8, 20]
+        assert conn.execute(select(AdherenceDaily.taken, AdherenceDaily.missed)).one() == (1, 1)
+        assert conn.execute(text("SELECT count(*) FROM search_index")).scalar() == 1
+        assert conn.execute(select(ContextChunk.kind, ContextChunk.ref_id, ContextChunk.text)).all() == [('document', 1, 'Chest pain')]
+    assert (tmp_path / 'uploads' / 'vectors' / 'chunks.f32').stat().st_size == 2 * ROW_BYTES
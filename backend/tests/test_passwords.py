@@ -0,0 +1,18 @@
+import binascii
+import hashlib
+
+from app.utils.passwords import PBKDF2_ITERATIONS, hash_password, needs_rehash, verify_password
+
+def test_versioned_hash_round_trip():
+    stored = hash_password("s3cret")
+    assert stored.startswith("$")
+    assert verify_password("s3cret", stored)
+    assert not verify_password("wrong", stored)
+    assert not needs_rehash(stored)
+
+def test_legacy_hash_verifies_and_needs_rehash():
+    salt = "ab" * 16
+    dk = hashlib.pbkdf2_hmac("sha256", b"s3cret", salt.encode(), PBKDF2_ITERATIONS)
+    legacy = f"{salt}${binascii.hexlify(dk).decode()}"
+    assert verify_password("s3cret", legacy)
+    assert needs_rehash(legacy)
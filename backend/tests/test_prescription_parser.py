@@ -0,0 +1,56 @@
+from app.agents.prescription_structurer_agent import PrescriptionStructurerAgent
+from app.core.config import settings
+from app.services.prescription_parser_service import PrescriptionParserService
+
+def test_parses_common_sig_grammar():
+    meds, clarifications, unparsed = PrescriptionParserService().parse(
+        "Rx\n1. Tab Crocin 500 mg 1-0-1 x 5 days after food\n2. Amoxicillin 500mg TDS for 1 week\n"
+        "3. Ibuprofen 400mg q8h PRN\nAtorvastatin 10mg 0-0-1 x 3/12\nReview after 2 weeks"
+    )
+    assert unparsed == [] and clarifications == []
+    paracetamol, amoxicillin, ibuprofen, atorvastatin = meds
+    assert paracetamol['name'] == 'paracetamol' and paracetamol['route'] == 'oral'
+    assert paracetamol['times'] == ['08:00', '20:00'] and paracetamol['duration_days'] == 5
+    assert paracetamol['instructions'] == 'after food' and paracetamol['confidence'] == 1.0
+    assert amoxicillin['frequency'] == 'three times daily' and amoxicillin['duration_days'] == 7
+    assert ibuprofen['frequency'] == 'every 8h as needed' and ibuprofen['as_needed'] and ibuprofen['times'] == []
+    assert atorvastatin['frequency'] == 'at night' and atorvastatin['duration_days'] == 90
+
+def test_uncertain_and_unreadable_lines_are_flagged():
+    meds, clarifications, unparsed = PrescriptionParserService().parse(
+        "Tab Zorbitol 20mg OD x 10 days\nPantoprazole 40mg before food\nFoobar cream BD"
+    )
+    assert [m['name'] for m in meds] == ['zorbitol']
+    assert meds[0]['confidence'] == 0.75
+    assert clarifications == ["Confirm the medication name 'zorbitol'."]
+    assert unparsed == ['Pantoprazole 40mg before food', 'Foobar cream BD']
+
+def test_lines_with_extra_instructions_go_to_the_llm():
+    lines = [
+        "Prednisolone 40mg OD for 5 days then 20mg OD for 5 days",
+        "Warfarin 5mg OD except Sundays",
+        "Don't take Ibuprofen 400mg BD",
+        "Ibuprofen 400mg q5h x 3 days",
+    ]
+    meds, clarifications, unparsed = PrescriptionParserService().parse('\n'.join(lines))
+    assert meds == [] and clarifications == []
+    assert unparsed == lines
+
+def test_agent_skips_llm_when_every_line_parses(monkeypatch):
+    monkeypatch.setattr(settings, 'LLM_BACKEND', 'fake')
+    agent = PrescriptionStructurerAgent()
+    monkeypatch.setattr(agent.client, 'generate_json', lambda *args: (_ for _ in ()).throw(AssertionError('LLM called')))
+    out = agent.run("Metformin 500mg BID x 30 days")
+    assert out.confidence == 1.0
+    assert out.medications[0]['times'] == ['08:00', '20:00']
+
+def test_agent_sends_only_unparsed_lines_to_llm(monkeypatch):
+    monkeypatch.setattr(settings, 'LLM_BACKEND', 'fake')
+    agent = PrescriptionStructurerAgent()
+    sent = []
+    generate = agent.client.generate_json
+    monkeypatch.setattr(agent.client, 'generate_json', lambda schema, prompt, text: sent.append(text) or generate(schema, prompt, text))
+    out = agent.run("Metformin 500mg BID x 30 days\nPantoprazole 40mg before food")
+    assert sent == ['Pantoprazole 40mg before food']
+    assert out.medications[0]['name'] == 'metformin' and len(out.medications) > 1
+    assert out.confidence is None
@@ -0,0 +1,64 @@
+from app.services.questionnaire_service import apply_answers, carry_forward, diff_profiles, missing_fields, normalize
+
+PROFILE = {
+    "conditions": ["hypertension"],
+    "allergies": [],
+    "medications": [{"name": "Lisinopril", "dose": "10mg"}],
+    "vitals": {"bp": "140/90"},
+    "timeline": [],
+    "additional_info": {},
+    "missing_fields": ["allergies", "smoking_status"],
+}
+
+def test_apply_answers_patches_fields_without_touching_input():
+    merged = apply_answers(PROFILE, {
+        "allergies": "penicillin",
+        "conditions": {"add": ["Type 2 diabetes", "HYPERTENSION"]},
+        "medications": [{"name": "lisinopril", "frequency": "daily"}, "metformin"],
+        "vitals": {"bp": None, "hr": 72},
+        "Smoking Status": "never",
+    })
+    assert merged["allergies"] == ["penicillin"]
+    assert merged["conditions"] == ["hypertension", "Type 2 diabetes"]
+    assert merged["medications"] == [{"name": "Lisinopril", "dose": "10mg", "frequency": "daily"}, {"name": "metformin"}]
+    assert merged["vitals"] == {"hr": 72}
+    assert merged["additional_info"] == {"smoking_status": "never"}
+    assert PROFILE["allergies"] == [] and PROFILE["vitals"] == {"bp": "140/90"}
+
+def test_missing_fields_is_recomputed_from_schema_and_answers():
+    assert missing_fields(PROFILE, PROFILE["missing_fields"]) == ["allergies", "timeline", "smoking_status"]
+    merged = apply_answers(PROFILE, {"allergies": "none", "smoking_status": "never"})
+    assert missing_fields(merged, PROFILE["missing_fields"]) == ["timeline"]
+
+def test_diff_profiles_reports_changed_fields_only():
+    merged = apply_answers(PROFILE, {"allergies": "latex"})
+    assert diff_profiles(PROFILE, merged) == [
+        {"field": "allergies", "before": [], "after": ["latex"]},
+        {"field": "answered_fields", "before": None, "after": ["allergies"]},
+    ]
+
+def test_none_answer_marks_field_answered_without_adding_entries():
+    merged = apply_answers(PROFILE, {"allergies": "None", "medications": ["nil"], "timeline": []})
+    assert merged["allergies"] == [] and merged["medications"] == PROFILE["medications"] and merged["timeline"] == []
+    assert merged["answered_fields"] == ["allergies", "medications", "timeline"]
+    assert missing_fields(merged, PROFILE["missing_fields"]) == ["smoking_status"]
+    merged = apply_answers(merged, {"allergies": ["penicillin", "none"]})
+    assert merged["allergies"] == ["penicillin"]
+
+def test_free_text_vitals_answers_are_kept_not_rejected():
+    merged = normalize(apply_answers(PROFILE, {"vitals": "no"}))
+    assert merged["vitals"] == {"bp": "140/90"} and merged["additional_info"] == {}
+    assert "vitals" in merged["answered_fields"]
+    merged = normalize(apply_answers(PROFILE, {"vitals": "BP 120/80, HR 72"}))
+    assert merged["vitals"] == {"bp": "140/90"} and merged["additional_info"] == {"vitals": "BP 120/80, HR 72"}
+
+def test_rebuilt_profile_keeps_questionnaire_answers():
+    answered = apply_answers(PROFILE, {"allergies": "penicillin", "conditions": "asthma", "smoking_status": "never"})
+    rebuilt = {"conditions": ["hypertension"], "medications": [{"name": "Lisinopril"}], "missing_fields": ["allergies", "smoking_status"]}
+    profile = carry_forward(answered, rebuilt)
+    assert profile["allergies"] == ["penicillin"]
+    assert profile["conditions"] == ["hypertension", "asthma"]
+    assert profile["medications"] == [{"name": "Lisinopril"}]
+    assert profile["additional_info"] == {"smoking_status": "never"}
+    assert profile["answered_fields"] == ["allergies", "conditions", "smoking_status"]
+    assert profile["missing_fields"] == ["vitals", "timeline"]
@@ -0,0 +1,29 @@
+from datetime import timedelta
+from app.core.config import settings
+from app.services.reminder_scheduler_service import ReminderSchedulerService, DOSE_REMINDER, DOSE_MISSED
+from app.utils.time import utc_now
+
+def test_schedule_dose_reminders_orders_and_dedupes():
+    svc = ReminderSchedulerService()
+    now = utc_now()
+    svc._leader = True
+    svc._horizon = now + timedelta(hours=24)
+    doses = [
+        {'id': 2, 'due_at': now + timedelta(hours=2)},
+        {'id': 1, 'due_at': now + timedelta(hours=1)},
+        {'id': 3, 'due_at': now + timedelta(hours=48)},
+    ]
+    svc.schedule_dose_reminders(doses)
+    svc.schedule_dose_reminders(doses)
+    assert svc.pending() == 4
+    assert svc._heap[0][2:] == (DOSE_REMINDER, 1)
+    assert (DOSE_MISSED, 3) not in svc._queued
+
+def test_past_due_doses_get_full_grace_before_missed():
+    svc = ReminderSchedulerService()
+    now = utc_now()
+    svc._push_dose(7, now - timedelta(days=2))
+    assert svc.pending() == 1
+    fire_at, _, kind, dose_id = svc._heap[0]
+    assert (kind, dose_id) == (DOSE_MISSED, 7)
+    assert fire_at >= (now + timedelta(minutes=settings.REMINDER_MISSED_GRACE_MINUTES)).timestamp()
@@ -0,0 +1,52 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import app.models  # noqa: F401
+from app.db.base import Base
+from app.db.engine import build_engine
+from app.services.search_service import SearchService
+
+DOCUMENT = 'Chest pain near the sternum, not radiating. Hypertension noted.'
+TRANSCRIPT = 'Patient says the pain is worse and breathing is hard.'
+
+def _search(tmp_path, queries):
+    async def scenario():
+        engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        service = SearchService()
+        async with async_sessionmaker(engine)() as session:
+            await service.index(session, 'document', 1, 1, DOCUMENT)
+            await service.index(session, 'transcript', 1, 1, TRANSCRIPT)
+            await session.commit()
+            results = {}
+            for query in queries:
+                hits, _ = await service.search(session, query)
+                results[query] = [hit['kind'] for hit in hits]
+        await engine.dispose()
+        return results
+
+    return asyncio.run(scenario())
+
+def test_search_matches_stop_words_and_ignores_punctuation_only_queries(tmp_path):
+    results = _search(tmp_path, ['the', 'of the', '"', '*', '-'])
+    # The FTS5 tokenizer keeps stop words, so they are ordinary terms.
+    assert sorted(results['the']) == ['document', 'transcript']
+    assert results['of the'] == []
+    assert results['"'] == results['*'] == results['-'] == []
+
+def test_search_treats_fts_keywords_as_terms(tmp_path):
+    results = _search(tmp_path, ['NEAR', 'pain AND breathing', 'OR pain', 'NEAR(chest pain)', 'chest -pain'])
+    assert results['NEAR'] == ['document']
+    # AND is searched for as a word (only the transcript contains "and").
+    assert results['pain AND breathing'] == ['transcript']
+    assert results['OR pain'] == []
+    assert results['NEAR(chest pain)'] == ['document']
+    assert results['chest -pain'] == ['document']
+
+def test_search_prefix_matches_only_the_last_term(tmp_path):
+    results = _search(tmp_path, ['hyperten', 'pain hyperten', 'hyperten pain'])
+    assert results['hyperten'] == ['document']
+    assert results['pain hyperten'] == ['document']
+    assert results['hyperten pain'] == []
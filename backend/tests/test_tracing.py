@@ -0,0 +1,29 @@
+import json
+
+from app.orchestration.tracing import Metrics, estimate_cost
+
+def test_metrics_render_prometheus_text():
+    registry = Metrics()
+    registry.inc("llm_calls_total", {"agent": "TriageGateAgent", "path": "schema_hint"}, help="Model calls.")
+    registry.observe("agent_run_seconds", {"agent": "TriageGateAgent"}, 0.3)
+    text = registry.render()
+    assert 'llm_calls_total{agent="TriageGateAgent",path="schema_hint"} 1' in text
+    assert 'agent_run_seconds_bucket{agent="TriageGateAgent",le="0.25"} 0' in text
+    assert 'agent_run_seconds_bucket{agent="TriageGateAgent",le="0.5"} 1' in text
+    assert 'agent_run_seconds_count{agent="TriageGateAgent"} 1' in text
+
+def test_cost_uses_model_prices():
+    assert estimate_cost("gpt-4.1-mini", 1_000_000, 1_000_000) == 2.0
+    assert estimate_cost("unknown-model", 1000, 1000) == 0.0
+
+def test_metrics_snapshots_sum_across_processes():
+    first, second = Metrics(), Metrics()
+    first.inc("llm_calls_total", {"agent": "SummaryAgent"})
+    second.inc("llm_calls_total", {"agent": "SummaryAgent"}, 2)
+    second.observe("agent_run_seconds", {"agent": "SummaryAgent"}, 0.3)
+    merged = Metrics()
+    for registry in (first, second):
+        merged.merge(json.loads(json.dumps(registry.snapshot())))
+    text = merged.render()
+    assert 'llm_calls_total{agent="SummaryAgent"} 3' in text
+    assert 'agent_run_seconds_count{agent="SummaryAgent"} 1' in text
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import shutil
+import threading
+import time
+import wave
+from array import array
+
+import pytest
+
+from app.core.config import settings
+from app.core.exceptions import AudioTooLargeError
+from app.services import transcription_service
+from app.services.transcription_service import TranscriptionService, shift_segments, stitch
+from app.utils import audio
+from app.utils.audio import choose_cuts
+
+def test_cuts_land_in_silence_and_respect_target():
+    silences = [(250.0, 251.0), (560.0, 562.0), (900.0, 901.0)]
+    assert choose_cuts(1300.0, silences, 600) == [561.0, 900.5]
+    assert choose_cuts(500.0, silences, 600) == []
+
+def test_stitch_orders_segments_by_absolute_time():
+    first = shift_segments([{"start": 0.0, "end": 4.0, "text": "Take metformin"}], 0.0)
+    second = shift_segments([{"start": 1.0, "end": 3.0, "text": "twice daily."}], 561.0)
+    text, segments = stitch([second, first])
+    assert text == "Take metformin twice daily."
+    assert segments[1]["start"] == 562.0
+
+def test_wav_fallback_writes_mono_16k_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio, 'FFMPEG', None)
+    path = str(tmp_path / 'visit.wav')
+    rate = 44100
+    tone = array('h', [8000 if (i // 50) % 2 else -8000 for i in range(rate)])
+    silence = array('h', [0] * rate)
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        for block in (tone, silence, tone):
+            wav.writeframes(array('h', (s for s in block for _ in range(2))).tobytes())
+    chunks, tmp_dir = audio.split_on_silence(path, 2.0)
+    assert tmp_dir is not None and [offset for _, offset in chunks] == pytest.approx([0.0, 1.5])
+    for chunk_path, _ in chunks:
+        with wave.open(chunk_path, 'rb') as wav:
+            assert (wav.getnchannels(), wav.getframerate(), wav.getsampwidth()) == (1, 16000, 2)
+            assert abs(wav.getnframes() - 1.5 * 16000) < 10
+    shutil.rmtree(tmp_dir)
+
+def test_large_audio_without_ffmpeg_fails_clearly(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio, 'FFMPEG', None)
+    monkeypatch.setattr(audio, 'MAX_CHUNK_BYTES', 1024)
+    path = tmp_path / 'visit.m4a'
+    path.write_bytes(b'0' * 2048)
+    with pytest.raises(AudioTooLargeError):
+        audio.split_on_silence(str(path), 600)
+
+def test_failed_chunk_waits_for_inflight_uploads_before_cleanup(tmp_path, monkeypatch):
+    tmp_dir = tmp_path / 'chunks'
+    tmp_dir.mkdir()
+    paths = [str(tmp_dir / f'{i}.wav') for i in range(3)]
+    for path in paths:
+        open(path, 'wb').write(b'audio')
+    monkeypatch.setattr(settings, 'LLM_BACKEND', 'fake')
+    monkeypatch.setattr(transcription_service, 'split_on_silence', lambda path, target: ([(p, i * 600.0) for i, p in enumerate(paths)], str(tmp_dir)))
+    slow_started = threading.Event()
+    read_ok = []
+
+    def transcribe_segments(path):
+        if path == paths[0]:
+            slow_started.wait(1)
+            raise RuntimeError('upload failed')
+        slow_started.set()
+        time.sleep(0.2)
+        read_ok.append(os.path.exists(path))
+        return [{'start': 0.0, 'end': 1.0, 'text': 'ok'}]
+
+    svc = TranscriptionService()
+    monkeypatch.setattr(svc.client, 'transcribe_segments', transcribe_segments)
+    with pytest.raises(RuntimeError):
+        asyncio.run(svc.transcribe_long('visit.wav'))
+    assert read_ok and all(read_ok)
+    assert not tmp_dir.exists()
@@ -0,0 +1,28 @@
+import asyncio
+
+from app.services.tts_service import SynthesisFlights, audio_key, audio_path_for, etag_matches
+
+def test_audio_key_normalizes_whitespace_and_scopes_by_voice():
+    assert audio_key("Take your  medicine.\n", "alloy") == audio_key("Take your medicine.", "alloy")
+    assert audio_key("Take your medicine.", "alloy") != audio_key("Take your medicine.", "verse")
+    key = audio_key("Take your medicine.", "alloy")
+    assert audio_path_for(key).endswith(f"{key[:2]}/{key}.mp3")
+
+def test_etag_matches_parses_the_if_none_match_list():
+    assert etag_matches('W/"old", "abc"', '"abc"')
+    assert etag_matches('*', '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
+    assert not etag_matches('', '"abc"')
+
+def test_synthesis_flights_let_one_request_synthesize():
+    async def scenario():
+        flights = SynthesisFlights()
+        assert flights.claim('k') and not flights.claim('k')
+        waiter = asyncio.create_task(flights.wait('k'))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        flights.finish('k')
+        await waiter
+        return flights.claim('k')
+
+    assert asyncio.run(scenario())
@@ -49,6 +49,7 @@ OPENAI_MODEL_TTS=gpt-4o-mini-tts
 OPENAI_MODEL_STT=whisper-1
 DATABASE_URL=sqlite+aiosqlite:///./app.db
 REDIS_URL=
+WEB_CONCURRENCY=
 MCP_HOSPITAL_BASE_URL=http://localhost:9001
 UPLOAD_DIR=./data/uploads
 NVIDIA_NIM_API_KEY=
@@ -88,7 +89,8 @@ After=network.target
 [Service]
 WorkingDirectory=$APP_DIR
 EnvironmentFile=$BACKEND_ENV_FILE
-ExecStart=$APP_DIR/.venv/bin/uvicorn app.main:app --app-dir backend --host 0.0.0.0 --port 8000
+ExecStart=$APP_DIR/.venv/bin/gunicorn -c backend/gunicorn.conf.py --pythonpath backend app.main:app
+ExecReload=/bin/kill -HUP \$MAINPID
 Restart=on-failure
 RestartSec=5
 
@@ -112,9 +114,20 @@ RestartSec=5
 WantedBy=multi-user.target
 EOF
 
+echo "Upgrading database schema..."
+# Adds columns/indexes introduced since an existing app.db was created; a no-op on an up-to-date database.
+(
+  cd "$APP_DIR"
+  set -a
+  source "$BACKEND_ENV_FILE"
+  set +a
+  PYTHONPATH=backend "$APP_DIR/.venv/bin/python" -m app.db.migrate
+)
+
 echo "Enabling services..."
 $SUDO systemctl daemon-reload
-$SUDO systemctl enable --now patient-hospital-backend.service
+$SUDO systemctl enable patient-hospital-backend.service
+$SUDO systemctl restart patient-hospital-backend.service
 $SUDO systemctl enable --now patient-hospital-frontend.service
 
 echo "Done."
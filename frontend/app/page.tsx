@@ -54,7 +54,10 @@ type Hospital = {
 
 type Document = {
   document_id: number;
-  extracted_text?: string | null;
+  mime_type: string;
+  has_text: boolean;
+  char_count: number;
+  text_preview?: string | null;
 };
 
 type Questionnaire = {
@@ -64,6 +67,8 @@ type Questionnaire = {
 type Coach = {
   script_text: string;
   audio_path: string;
+  message_id?: number | null;
+  audio_url?: string | null;
 };
 
 type AuthRole = "patient" | "doctor" | "hospital";
@@ -76,7 +81,16 @@ type Session = {
 };
 
 async function requestJson<T>(url: string, options?: RequestInit): Promise<T> {
-  const res = await fetch(url, options);
+  return parseJson<T>(await fetch(url, options));
+}
+
+async function requestPage<T>(url: string): Promise<{ items: T[]; nextCursor: string | null }> {
+  const res = await fetch(url);
+  const items = await parseJson<T[]>(res);
+  return { items, nextCursor: res.headers.get("X-Next-Cursor") };
+}
+
+async function parseJson<T>(res: Response): Promise<T> {
   const text = await res.text();
   const data = text ? JSON.parse(text) : null;
   if (!res.ok) {
@@ -107,6 +121,7 @@ export default function HomePage() {
   const [hospitalRecs, setHospitalRecs] = useState<Hospital[] | null>(null);
   const [questionnaire, setQuestionnaire] = useState<Questionnaire | null>(null);
   const [patientsList, setPatientsList] = useState<Patient[] | null>(null);
+  const [patientsCursor, setPatientsCursor] = useState<string | null>(null);
   const [documents, setDocuments] = useState<Document[] | null>(null);
   const [coach, setCoach] = useState<Coach | null>(null);
 
@@ -147,6 +162,7 @@ export default function HomePage() {
     setPatient(null);
     setPatientIdInput("");
     setPatientsList(null);
+    setPatientsCursor(null);
     resetInsights();
   };
 
@@ -206,13 +222,20 @@ export default function HomePage() {
       setStatus(`Loaded patient #${data.id}`);
     });
 
-  const listPatients = () =>
+  const loadPatients = (after: string | null) =>
     withBusy(async () => {
-      const data = await requestJson<Patient[]>(`${apiBase}/api/v1/patients`);
-      setPatientsList(data);
-      setStatus(`Loaded ${data.length} patients.`);
+      const query = after ? `?after_id=${encodeURIComponent(after)}` : "";
+      const { items, nextCursor } = await requestPage<Patient>(`${apiBase}/api/v1/patients${query}`);
+      const all = after ? [...(patientsList ?? []), ...items] : items;
+      setPatientsList(all);
+      setPatientsCursor(nextCursor);
+      setStatus(`Loaded ${all.length} patients${nextCursor ? " (more available)" : ""}.`);
     });
 
+  const listPatients = () => loadPatients(null);
+
+  const loadMorePatients = () => loadPatients(patientsCursor);
+
   const uploadDocument = () =>
     withBusy(async () => {
       if (!activePatientId) throw new Error("Set patient ID first");
@@ -383,7 +406,7 @@ export default function HomePage() {
     withBusy(async () => {
       if (!activePatientId) throw new Error("Set patient ID first");
       const data = await requestJson<Coach>(
-        `${apiBase}/api/v1/patients/${activePatientId}/recovery-coach/generate`,
+        `${apiBase}/api/v1/patients/${activePatientId}/recovery-coach/generate?defer_audio=true`,
         { method: "POST" }
       );
       setCoach(data);
@@ -674,6 +697,11 @@ export default function HomePage() {
                   >
                     Load selected
                   </button>
+                  {patientsCursor && (
+                    <button className="ghost" onClick={loadMorePatients} disabled={busy}>
+                      Load more patients
+                    </button>
+                  )}
                 </div>
               ) : (
                 <div className="grid-2">
@@ -788,7 +816,7 @@ export default function HomePage() {
                 <div className="label">Today's guidance</div>
                 <p>{coach.script_text}</p>
                 {coach.audio_path ? (
-                  <audio controls src={buildAudioSrc(coach.audio_path)} />
+                  <audio controls src={buildAudioSrc(coach.audio_url ?? coach.audio_path)} />
                 ) : (
                   <p className="mono">No audio available.</p>
                 )}
@@ -838,8 +866,11 @@ export default function HomePage() {
               {documents.map((doc) => (
                 <li key={doc.document_id}>
                   <strong>Document #{doc.document_id}</strong>
-                  {doc.extracted_text ? (
-                    <p className="mono">{doc.extracted_text}</p>
+                  {doc.has_text ? (
+                    <p className="mono">
+                      {doc.text_preview}
+                      {doc.char_count > (doc.text_preview?.length ?? 0) ? ` … (${doc.char_count} chars)` : ""}
+                    </p>
                   ) : (
                     <p className="mono">No extracted text.</p>
                   )}